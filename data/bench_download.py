@@ -0,0 +1,208 @@
+"""
+Download benchmark and check for build_salary_data.download_file against a
+local http.server stand-in for download.bls.gov.
+
+The stand-in serves a synthetic file with ETag / Last-Modified, answers
+If-None-Match / If-Modified-Since with 304 and Range / If-Range with 206, and
+can cut a transfer short. Each scenario runs download_file and checks the
+result byte for byte:
+
+    fresh               full download; throughput and traced peak memory
+    unchanged           revalidated, 304 Not Modified, nothing transferred
+    interrupted         file updated, its download cut at 40%: the .part is kept...
+    resumed             ...and the rest fetched with a Range request (206)
+    interrupted again   another update, cut at 40%...
+    changed mid-resume  ...then replaced again: If-Range fails, so a full 200
+    changed             file replaced after a complete download: full 200
+    stale .part         a .part longer than the file: 416, restarted from zero
+
+    python3 bench_download.py             # 64 MB file
+    python3 bench_download.py --mb 512
+"""
+
+import argparse
+import contextlib
+import hashlib
+import http.server
+import io
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from functools import partial
+
+import build_salary_data as bsd
+
+FILENAME = "oe.data.0.Current"
+
+
+class StandInHandler(http.server.SimpleHTTPRequestHandler):
+    """SimpleHTTPRequestHandler with ETags, Range / If-Range and an optional cut-off."""
+
+    drop_after = None    # send only this many body bytes, then close (simulated failure)
+    rate = None          # bytes per second to send at (a simulated slow link), or unlimited
+    statuses = []        # status of each response
+    sent = 0             # body bytes sent
+
+    def log_message(self, *args):
+        pass
+
+    def send_response(self, code, message=None):
+        self.statuses.append(code)
+        super().send_response(code, message)
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        st = os.stat(path)
+        size = st.st_size
+        etag = f'"{size:x}-{st.st_mtime_ns:x}"'
+        last_modified = self.date_time_string(int(st.st_mtime))
+
+        if self.headers.get("If-None-Match") == etag or (
+                "If-None-Match" not in self.headers and self.headers.get("If-Modified-Since") == last_modified):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        start = 0
+        match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if match and self.headers.get("If-Range", etag) in (etag, last_modified):
+            start = int(match[1])
+            if start >= size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+        self.send_response(206 if start else 200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(size - start))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+        self.end_headers()
+
+        remaining = size - start if self.drop_after is None else min(self.drop_after, size - start)
+        sent, began = 0, time.perf_counter()
+        with open(path, "rb") as f:
+            f.seek(start)
+            while remaining > 0:
+                block = f.read(min(1 << 20, remaining))
+                if not block:
+                    break
+                self.wfile.write(block)
+                StandInHandler.sent += len(block)
+                remaining -= len(block)
+                sent += len(block)
+                if self.rate:
+                    time.sleep(max(0.0, sent / self.rate - (time.perf_counter() - began)))
+        self.close_connection = True
+
+
+def write_file(path, size_mb, seed):
+    """size_mb MB of pseudo-random bytes (different for each seed)."""
+    block = hashlib.blake2b(str(seed).encode()).digest() * (1 << 14)    # 1 MB
+    with open(path, "wb") as f:
+        for i in range(size_mb):
+            f.write(block[i % 64:] + block[:i % 64])
+
+
+def digest(path):
+    h = hashlib.blake2b()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mb", type=int, default=64, help="size of the served file")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  SalaryLens — Download Benchmark (local stand-in server)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        served, raw = os.path.join(tmp, "served"), os.path.join(tmp, "raw")
+        os.makedirs(served)
+        os.makedirs(raw)
+        remote, local = os.path.join(served, FILENAME), os.path.join(raw, FILENAME)
+        write_file(remote, args.mb, seed=1)
+
+        server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(StandInHandler, directory=served))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+        print(f"\n  Serving a {args.mb} MB {FILENAME} at {base_url}\n")
+
+        def replace_remote(seed):
+            write_file(remote, args.mb, seed)
+            os.utime(remote, ns=(time.time_ns(), time.time_ns() + 10**9))   # a new Last-Modified
+
+        def stale_part():
+            with open(local + ".part", "wb") as f:
+                f.write(b"\0" * (os.path.getsize(remote) + 10))
+            meta = bsd._read_json(local + ".http.json")
+            meta["partial"] = {"etag": meta["etag"], "last_modified": meta["last_modified"]}
+            bsd._write_json(local + ".http.json", meta)
+
+        cut = int(args.mb * 0.4) << 20
+        # (name, setup before the run, byte cut-off, expected status, expect a complete copy)
+        scenarios = [
+            ("fresh", None, None, 200, True),
+            ("unchanged", None, None, 304, True),
+            ("interrupted", lambda: replace_remote(2), cut, 200, False),
+            ("resumed", None, None, 206, True),
+            ("interrupted again", lambda: replace_remote(3), cut, 200, False),
+            ("changed mid-resume", lambda: replace_remote(4), None, 200, True),
+            ("changed", lambda: replace_remote(5), None, 200, True),
+            ("stale .part", stale_part, None, 416, True),
+        ]
+        failures = 0
+        print(f"  {'scenario':<20}{'status':>8}{'time':>9}{'MB/s':>9}{'peak':>10}  result")
+        for name, setup, drop_after, status, complete in scenarios:
+            if setup:
+                setup()
+            StandInHandler.drop_after = drop_after
+            StandInHandler.statuses = []
+            StandInHandler.sent = 0
+            out = io.StringIO()
+            tracemalloc.start()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(out):
+                path = bsd.download_file(FILENAME, base_url, raw)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            ok = status in StandInHandler.statuses and path == local
+            if complete:
+                ok = ok and not os.path.exists(local + ".part") and digest(local) == digest(remote)
+            else:
+                ok = ok and os.path.exists(local + ".part")
+            failures += not ok
+            statuses = "/".join(map(str, StandInHandler.statuses))
+            print(f"  {name:<20}{statuses:>8}{elapsed:>8.2f}s{StandInHandler.sent / (1 << 20) / elapsed:>9.0f}"
+                  f"{peak / (1 << 20):>8.1f}MB  {'ok' if ok else 'FAILED'}")
+            for line in out.getvalue().strip().splitlines():
+                print(f"  {'':<20}{line.strip()}")
+
+        server.shutdown()
+
+    print(f"\n  {'All scenarios passed' if not failures else f'{failures} scenario(s) FAILED'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
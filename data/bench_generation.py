@@ -0,0 +1,101 @@
+"""
+Benchmark the scalar and numpy record generators in generate_full_data.py.
+
+Grids larger than today's are synthesized by cloning the real occupation and
+metro tuples with suffixed slugs, so the salary model stays the same.
+
+    python3 bench_generation.py                      # 1x and 10x grids
+    python3 bench_generation.py --grid 5000x400      # a custom grid
+"""
+
+import argparse
+import random
+import time
+
+import generate_full_data as gfd
+
+
+def synthetic_grid(n_occupations, n_metros):
+    """Return (occupations, metros) lists of the requested size."""
+    occupations = []
+    for i in range(n_occupations):
+        slug, soc, name, median = gfd.OCCUPATIONS[i % len(gfd.OCCUPATIONS)]
+        copy = i // len(gfd.OCCUPATIONS)
+        if copy:
+            slug, name = f"{slug}-{copy}", f"{name} {copy}"
+        occupations.append((slug, soc, name, median))
+
+    metros = []
+    for i in range(n_metros):
+        m_slug, m_code, m_full, m_short, m_state, col, emp = gfd.US_METROS[i % len(gfd.US_METROS)]
+        copy = i // len(gfd.US_METROS)
+        if copy:
+            m_slug, m_code, m_short = f"{m_slug}-{copy}", f"{m_code}{copy}", f"{m_short} {copy}"
+        metros.append((m_slug, m_code, m_full, m_short, m_state, col, emp))
+    return occupations, metros
+
+
+def time_it(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(n_occupations, n_metros, repeat):
+    occupations, metros = synthetic_grid(n_occupations, n_metros)
+    cells = n_occupations * n_metros
+
+    def scalar():
+        random.seed(42)
+        gfd.generate_records(occupations, metros, "US", "scalar")
+
+    def numpy_grid():
+        gfd.generate_grid(occupations, metros, "US", gfd.np.random.default_rng(42))
+
+    def numpy_records():
+        gfd.generate_records(occupations, metros, "US", "numpy", gfd.np.random.default_rng(42))
+
+    results = [
+        ("scalar records", time_it(scalar, repeat)),
+        ("numpy grid", time_it(numpy_grid, repeat)),
+        ("numpy records", time_it(numpy_records, repeat)),
+    ]
+
+    print(f"\n  Grid {n_occupations:,} x {n_metros:,} = {cells:,} records (best of {repeat})")
+    baseline = results[0][1]
+    for label, seconds in results:
+        rate = cells / seconds if seconds else float("inf")
+        print(f"    {label:<16} {seconds * 1000:>10.1f} ms  {rate:>14,.0f} rec/s  {baseline / seconds:>6.1f}x")
+
+
+def parse_grid(text):
+    occ, metro = text.lower().split("x")
+    return int(occ), int(metro)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--grid", action="append", type=parse_grid,
+                        help="OCCUPATIONSxMETROS, may be repeated (default: 1x and 10x today's grid)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if gfd.np is None:
+        parser.error("numpy is required to benchmark the batch engine")
+
+    n_occ, n_metro = len(gfd.OCCUPATIONS), len(gfd.US_METROS)
+    grids = args.grid or [(n_occ, n_metro), (n_occ * 10, n_metro)]
+
+    print("=" * 60)
+    print("  SalaryLens — Generation Engine Benchmark")
+    print("=" * 60)
+    for n_occupations, n_metros in grids:
+        run(n_occupations, n_metros, args.repeat)
+    print()
+
+
+if __name__ == "__main__":
+    main()
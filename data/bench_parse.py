@@ -0,0 +1,193 @@
+"""
+Throughput benchmark for build_salary_data.parse_data_file on a synthetic
+oe.data.0.Current.
+
+The fake file mimics the real one's selectivity: series for ~600 areas x
+~830 occupations x 17 data types, cross-industry and industry-specific, of
+which 25 areas x 44 occupations x 8 data types are targets. Three parsers run
+on it, and each must produce exactly the records of the first:
+
+    line by line    the text-mode parser build_salary_data used before (below)
+    bytes           chunked binary scan, byte-prefix test per line (pure Python)
+    bytes + numpy   chunked binary scan, prefixes tested for a whole chunk at once
+    N workers       the fastest scan over N line-aligned byte ranges in N processes
+    parse cache     selecting the targets from the warm parse cache (<file>.parsed.bin)
+
+The parallel runs are also checked record for record against the serial
+parse (same rows, same order, same values).
+
+    python3 bench_parse.py                    # 2,000,000 lines; 2 and 4 workers
+    python3 bench_parse.py --lines 10000000 --repeat 1 --workers 4 --workers 8
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+import build_salary_data as bsd
+from build_from_api import build_series_id
+from salary_table import SalaryTable
+
+N_AREAS, N_OCCUPATIONS = 600, 830
+N_TARGET_AREAS, N_TARGET_OCCUPATIONS = 25, 44
+INDUSTRIES = ["000000"] * 6 + [f"{i:06d}" for i in range(111100, 999999, 29017)]
+
+
+def synthetic_targets(seed=1):
+    """(areas, occupations, TARGET_AREAS, TARGET_OCCUPATIONS) for the fake file."""
+    rng = random.Random(seed)
+    areas = [f"M{i:07d}" for i in range(N_AREAS)]
+    occupations = sorted({f"{rng.randint(11, 53):02d}-{rng.randint(1000, 9999):04d}"
+                          for _ in range(N_OCCUPATIONS)})
+    target_areas = {a: {"name": f"Metro {a}", "short": f"Metro {a}", "state": "XX", "msa": a[1:]}
+                    for a in rng.sample(areas, N_TARGET_AREAS)}
+    target_occupations = {o: {"name": f"Occupation {o}", "slug": f"occupation-{o}"}
+                          for o in rng.sample(occupations, N_TARGET_OCCUPATIONS)}
+    return areas, occupations, target_areas, target_occupations
+
+
+def write_fake_file(path, n_lines, seed=1):
+    """A fake oe.data.0.Current of n_lines random series; ~0.2% are target cells, as in the real file."""
+    rng = random.Random(seed)
+    areas, occupations, target_areas, target_occupations = synthetic_targets(seed)
+    target_areas, target_occupations = list(target_areas), list(target_occupations)
+    dtypes = [f"{i:02d}" for i in range(1, 18)]
+    with open(path, "w") as f:
+        f.write("series_id\tyear\tperiod\tvalue\tfootnote_codes\n")
+        for _ in range(n_lines):
+            if rng.random() < 0.002:
+                area, occ, industry = rng.choice(target_areas), rng.choice(target_occupations), "000000"
+            else:
+                area, occ, industry = rng.choice(areas), rng.choice(occupations), rng.choice(INDUSTRIES)
+            value = rng.choice(("-", "*", str(rng.randint(1000, 250000)), f"{rng.uniform(10, 120):.2f}"))
+            series_id = build_series_id(area[1:], occ, rng.choice(dtypes))
+            f.write(f"{series_id[:11]}{industry}{series_id[17:]}\t2024\tA01\t{value}\t\n")
+
+
+def parse_data_file_lines(filepath):
+    """build_salary_data.parse_data_file as it was: text mode, split and filter every line."""
+    target_occ_set = set()
+    for occ_code in bsd.TARGET_OCCUPATIONS:
+        target_occ_set.add(occ_code.replace("-", ""))
+    target_area_set = set(bsd.TARGET_AREAS.keys())
+
+    records = SalaryTable()
+    with open(filepath, "r") as f:
+        f.readline()
+        for line in f:
+            parts = line.strip().split("\t")
+            if len(parts) < 4:
+                continue
+            series_id = parts[0].strip()
+            value = parts[3].strip()
+            if len(series_id) < 25 or not series_id.startswith("OEU"):
+                continue
+            area_code = series_id[3:11]
+            industry = series_id[11:17]
+            occ_code = series_id[17:23]
+            dtype = series_id[23:25]
+            if industry != "000000":
+                continue
+            if area_code not in target_area_set:
+                continue
+            if occ_code not in target_occ_set:
+                continue
+            if dtype not in bsd.DTYPE_MAP:
+                continue
+            try:
+                if value in ("-", "*", "#", "**"):
+                    continue
+                numeric_val = float(value.replace(",", ""))
+            except ValueError:
+                continue
+            bsd.add_data_point(records, area_code, occ_code, dtype, numeric_val)
+    return records
+
+
+@contextlib.contextmanager
+def without_numpy():
+    np, bsd.np = bsd.np, None
+    try:
+        yield
+    finally:
+        bsd.np = np
+
+
+def rows(table):
+    return [table.row(i) for i in range(len(table))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per parser; the fastest counts")
+    parser.add_argument("--workers", type=int, action="append",
+                        help="worker count for a parallel run (repeatable; default 2 and 4)")
+    args = parser.parse_args()
+    workers = args.workers or [2, 4]
+
+    print("=" * 60)
+    print("  SalaryLens — oe.data.0.Current Parser Benchmark")
+    print("=" * 60)
+
+    _, _, bsd.TARGET_AREAS, bsd.TARGET_OCCUPATIONS = synthetic_targets()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "oe.data.0.Current")
+        start = time.perf_counter()
+        write_fake_file(path, args.lines)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"\n  Fake file: {args.lines:,} lines, {size_mb:.0f} MB "
+              f"(written in {time.perf_counter() - start:.1f}s)\n")
+
+        cases = [("line by line", parse_data_file_lines, contextlib.nullcontext)]
+        cases.append(("bytes", bsd.parse_data_file, without_numpy))
+        if bsd.np is not None:
+            cases.append(("bytes + numpy", bsd.parse_data_file, contextlib.nullcontext))
+        for n in workers:
+            cases.append((f"{n} workers", functools.partial(bsd.parse_data_file, workers=n),
+                          contextlib.nullcontext))
+        with contextlib.redirect_stdout(io.StringIO()):
+            bsd.build_parse_cache(path)
+        cases.append(("parse cache", functools.partial(bsd.parse_data_file, cache=True),
+                      contextlib.nullcontext))
+
+        print(f"  CPUs: {os.cpu_count()}\n")
+        print(f"  {'parser':<16}{'time':>9}{'lines/s':>14}{'MB/s':>9}{'speedup':>10}  records")
+        baseline = reference = serial = None
+        mismatches = 0
+        for label, parse, context in cases:
+            elapsed = float("inf")
+            for _ in range(args.repeat):
+                with context(), contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    records = parse(path)
+                    elapsed = min(elapsed, time.perf_counter() - start)
+            if reference is None:
+                baseline, reference = elapsed, rows(records)
+                check = ""
+            else:
+                same = rows(records) == reference
+                mismatches += not same
+                check = "identical" if same else "MISMATCH"
+            if label.endswith("workers"):
+                check += f", {serial / elapsed:.1f}x serial"
+            else:
+                serial = elapsed
+            print(f"  {label:<16}{elapsed:>8.2f}s{args.lines / elapsed:>14,.0f}{size_mb / elapsed:>9.0f}"
+                  f"{baseline / elapsed:>9.1f}x  {len(records):,} {check}")
+
+    if bsd.np is None:
+        print("\n  (numpy not installed: bytes + numpy skipped)")
+    if mismatches:
+        print(f"\n  {mismatches} parser(s) did not match the line-by-line records")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
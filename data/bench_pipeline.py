@@ -0,0 +1,367 @@
+"""
+End-to-end benchmark suite for the data pipeline.
+
+Times and memory-profiles each pipeline stage on synthetic inputs scaled
+from today's grid (occupations x metros):
+
+    generate_record              one call per US grid cell
+    generate_full_data.main      the whole generator, written to a temp dir
+    generate_occupation_content  content for a scaled occupation catalog
+    parse_data_file              a fake oe.data.0.Current, 8 data types per cell
+    build_salary_data.coverage   build_salary_data.main --coverage full on the same file:
+                                 parse cache, every metro x detailed occupation, outputs
+    _build_output                merging fetched BLS values into a generated dataset
+
+Every (stage, scale) runs in its own subprocess, so peak RSS is that case
+alone; input setup is done before the clock starts. Results are written as
+JSON, and --compare flags cases slower or larger than a stored baseline.
+
+    python3 bench_pipeline.py                                # 1x, 10x, 100x -> bench_results.json
+    python3 bench_pipeline.py --scale 1 --scale 10 --stage parse_data_file
+    cp bench_results.json bench_baseline.json                # keep a baseline
+    python3 bench_pipeline.py --compare bench_baseline.json  # exit 1 on regressions
+    python3 bench_pipeline.py --compare bench_baseline.json --results bench_results.json   # no run
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DATA_DIR)
+import generate_full_data as gfd
+from bench_generation import synthetic_grid
+from bench_related import synthetic_catalog
+from build_from_api import build_series_id
+from profiling import peak_rss_mb
+from salary_io import output_path
+
+RESULTS_FILE = os.path.join(DATA_DIR, "bench_results.json")
+RESULTS_VERSION = 1
+
+SCALES = (1, 10, 100)
+TOLERANCE = 0.10          # relative slowdown / growth flagged as a regression
+MIN_SECONDS = 0.05        # ...if it is also at least this much slower
+MIN_RSS_MB = 5.0          # ...or at least this much larger
+
+# Data type codes written to the fake oe.data.0.Current, with a value per code
+FAKE_DTYPES = {"01": 12000, "03": 40.5, "04": 86000, "11": 45000, "12": 60000,
+               "13": 82000, "14": 104000, "15": 131000}
+
+
+# =============================================================================
+# STAGES
+# Each setup(scale, fixtures) returns (run, items): run() is the timed call,
+# items the number of records (or lines, occupations) it processes.
+# =============================================================================
+
+def setup_generate_record(scale, fixtures):
+    occupations, metros = synthetic_grid(len(gfd.OCCUPATIONS) * scale, len(gfd.US_METROS))
+
+    def run():
+        random.seed(gfd.SEED)
+        for occ in occupations:
+            for metro in metros:
+                gfd.generate_record(occ, metro, "US")
+    return run, len(occupations) * len(metros)
+
+
+def main_output_dir(scale, fixtures):
+    return os.path.join(fixtures, f"main-{scale}x")
+
+
+def setup_main(scale, fixtures):
+    occupations, _ = synthetic_grid(len(gfd.OCCUPATIONS) * scale, len(gfd.US_METROS))
+    gfd.OCCUPATIONS = occupations
+    gfd.OUTPUT_DIR = main_output_dir(scale, fixtures)
+    os.makedirs(gfd.OUTPUT_DIR, exist_ok=True)
+
+    def run():
+        gfd.main([])
+    return run, len(occupations) * (len(gfd.US_METROS) + len(gfd.CA_METROS))
+
+
+def setup_content(scale, fixtures):
+    from generate_content import generate_occupation_content
+    catalog = synthetic_catalog(len(gfd.OCCUPATIONS) * scale)
+    return (lambda: generate_occupation_content(catalog)), len(catalog)
+
+
+def fake_targets(scale):
+    """Synthetic TARGET_AREAS / TARGET_OCCUPATIONS: the US metros keyed by MSA code, unique SOC codes."""
+    areas = {}
+    for _, m_code, m_full, m_short, m_state, _, _ in gfd.US_METROS:
+        areas[f"M{m_code.zfill(7)}"] = {"name": m_full, "short": m_short, "state": m_state, "msa": m_code}
+    occupations = {}
+    for i, (slug, _, name, _) in enumerate(synthetic_grid(len(gfd.OCCUPATIONS) * scale, 0)[0]):
+        occupations[f"{11 + i // 10000:02d}-{i % 10000:04d}"] = {"name": name, "slug": slug}
+    return areas, occupations
+
+
+def fake_data_file(scale, fixtures):
+    """
+    Write (once per scale) a fake oe.data.0.Current: every target cell with
+    each FAKE_DTYPES code, plus an industry-specific row per cell that the
+    parser filters out. Returns (path, line count).
+    """
+    path = os.path.join(fixtures, f"oe.data.0.Current.{scale}x")
+    areas, occupations = fake_targets(scale)
+    lines = len(areas) * len(occupations) * (len(FAKE_DTYPES) + 1)
+    if os.path.exists(path):
+        return path, lines
+    with open(path + ".tmp", "w") as f:
+        f.write("series_id\tyear\tperiod\tvalue\tfootnote_codes\n")
+        for occ_code in occupations:
+            for area in areas.values():
+                for dtype, value in FAKE_DTYPES.items():
+                    f.write(f"{build_series_id(area['msa'], occ_code, dtype)}\t2024\tA01\t{value}\t\n")
+                series_id = build_series_id(area["msa"], occ_code, "01")
+                f.write(f"{series_id[:11]}541500{series_id[17:]}\t2024\tA01\t250\t\n")
+    os.replace(path + ".tmp", path)
+    return path, lines
+
+
+def setup_parse(scale, fixtures):
+    import build_salary_data as bsd
+    path, lines = fake_data_file(scale, fixtures)
+    bsd.TARGET_AREAS, bsd.TARGET_OCCUPATIONS = fake_targets(scale)
+    return (lambda: bsd.parse_data_file(path)), lines
+
+
+def setup_coverage(scale, fixtures):
+    import build_salary_data as bsd
+    path, _ = fake_data_file(scale, fixtures)
+    areas, occupations = fake_targets(scale)
+    raw = os.path.join(fixtures, f"raw-{scale}x")
+    os.makedirs(raw, exist_ok=True)
+    data_file = os.path.join(raw, "oe.data.0.Current")
+    if not os.path.exists(data_file):
+        os.link(path, data_file)
+    with open(os.path.join(raw, "oe.area"), "w") as f:
+        f.write("area_code\tareatype_code\tarea_name\n")
+        for code, info in areas.items():
+            f.write(f"{code[1:]}\t{code[0]}\t{info['name']}\n")
+    with open(os.path.join(raw, "oe.occupation"), "w") as f:
+        f.write("occupation_code\toccupation_name\n")
+        for code, info in occupations.items():
+            f.write(f"{code.replace('-', '')}\t{info['name']}\n")
+    bsd.RAW_DIR = raw
+    bsd.OUTPUT_DIR = os.path.join(fixtures, f"coverage-{scale}x")
+
+    def run():
+        for cache_file in bsd.parse_cache_paths(data_file):   # a cold run: the cache is built too
+            if os.path.exists(cache_file):
+                os.remove(cache_file)
+        bsd.main(["--coverage", "full", "--offline"])
+    detailed = sum(bsd.is_detailed(code.replace("-", "")) for code in occupations)
+    return run, len(areas) * detailed
+
+
+def setup_build_output(scale, fixtures):
+    import build_from_api as bfa
+    out_dir = main_output_dir(scale, fixtures)
+    if not os.path.exists(output_path(out_dir)):
+        setup_main(scale, fixtures)[0]()      # the merge needs a generated dataset
+    bfa.OUTPUT_DIR = out_dir
+    bfa.SALARY_DATA_FILE = output_path(out_dir)
+
+    occupations, _ = synthetic_grid(len(gfd.OCCUPATIONS) * scale, len(gfd.US_METROS))
+    combos, fetched = {}, {}
+    for slug, soc_code, name, median in occupations:
+        for _, m_code, m_full, m_short, m_state, col, _ in gfd.US_METROS:
+            key = f"{m_code}_{soc_code}_{slug}"
+            combos[key] = {"occ_slug": slug, "occ_code": soc_code, "occ_name": name,
+                           "area_code": m_code, "area_name": m_full,
+                           "city_short": m_short, "state": m_state}
+            med = int(median * col)
+            fetched[key] = {"employment": 5000, "mean_annual": int(med * 1.05),
+                            "median_annual": med, "pct10_annual": int(med * 0.6),
+                            "pct25_annual": int(med * 0.8), "pct75_annual": int(med * 1.2),
+                            "pct90_annual": int(med * 1.5)}
+    return (lambda: bfa._build_output(fetched, combos)), len(combos)
+
+
+STAGES = {
+    "generate_record": setup_generate_record,
+    "generate_full_data.main": setup_main,
+    "generate_occupation_content": setup_content,
+    "parse_data_file": setup_parse,
+    "build_salary_data.coverage": setup_coverage,
+    "_build_output": setup_build_output,
+}
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def run_case(stage, scale, fixtures, repeat):
+    """Run one case in this process; returns its result dict."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        run, items = STAGES[stage](scale, fixtures)
+        rss_before = peak_rss_mb()
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+    return {
+        "stage": stage,
+        "scale": scale,
+        "items": items,
+        "seconds": round(best, 4),
+        "items_per_s": round(items / best) if best else None,
+        "rss_before_mb": rss_before and round(rss_before, 1),
+        "peak_rss_mb": peak_rss_mb() and round(peak_rss_mb(), 1),
+    }
+
+
+def run_isolated(stage, scale, fixtures, repeat):
+    """Run one case in a fresh interpreter, so its peak RSS is its own."""
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", stage, str(scale), fixtures,
+         "--repeat", str(repeat)],
+        check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+# =============================================================================
+# RESULTS
+# =============================================================================
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "numpy": gfd.np.__version__ if gfd.np is not None else None,
+    }
+
+
+def load_results(path):
+    with open(path) as f:
+        results = json.load(f)
+    if results.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path}: results version {results.get('version')}, expected {RESULTS_VERSION}")
+    return results
+
+
+def compare(baseline, current, tolerance=TOLERANCE):
+    """
+    [(case, metric, base, now, change)] for every case and metric in both
+    result sets, change relative; and the list of regressions among them.
+    """
+    base_cases = {(c["stage"], c["scale"]): c for c in baseline["cases"]}
+    rows, regressions = [], []
+    for case in current["cases"]:
+        key = (case["stage"], case["scale"])
+        base = base_cases.get(key)
+        if base is None:
+            continue
+        for metric, floor in (("seconds", MIN_SECONDS), ("peak_rss_mb", MIN_RSS_MB)):
+            old, new = base.get(metric), case.get(metric)
+            if not old or new is None:
+                continue
+            change = new / old - 1
+            row = (key, metric, old, new, change)
+            rows.append(row)
+            if change > tolerance and new - old >= floor:
+                regressions.append(row)
+    return rows, regressions
+
+
+def print_cases(cases):
+    print(f"\n  {'stage':<30}{'scale':>6}{'items':>12}{'time':>10}{'items/s':>12}{'peak RSS':>11}")
+    for c in cases:
+        rss = f"{c['peak_rss_mb']:>9.0f}MB" if c["peak_rss_mb"] is not None else f"{'-':>11}"
+        print(f"  {c['stage']:<30}{c['scale']:>5}x{c['items']:>12,}{c['seconds']:>9.2f}s"
+              f"{c['items_per_s'] or 0:>12,}{rss}")
+
+
+def print_comparison(rows, regressions, tolerance):
+    flagged = set(id(r) for r in regressions)
+    print(f"\n  Compared with baseline (tolerance {tolerance:.0%}):\n")
+    print(f"  {'stage':<30}{'scale':>6}  {'metric':<12}{'baseline':>10}{'now':>10}{'change':>9}")
+    for row in rows:
+        (stage, scale), metric, old, new, change = row
+        flag = "  REGRESSION" if id(row) in flagged else ""
+        print(f"  {stage:<30}{scale:>5}x  {metric:<12}{old:>10.2f}{new:>10.2f}{change:>+8.0%}{flag}")
+    print(f"\n  {len(regressions)} regression(s)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", action="append", type=int,
+                        help="grid multiple, may be repeated (default: 1, 10, 100)")
+    parser.add_argument("--stage", action="append", choices=list(STAGES),
+                        help="stage to run, may be repeated (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="best of N runs per case (default: 1)")
+    parser.add_argument("--out", default=RESULTS_FILE, help="results file (default: data/bench_results.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag regressions against a results file")
+    parser.add_argument("--results", metavar="FILE", help="with --compare: compare this file instead of running")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help=f"relative change flagged as a regression (default: {TOLERANCE})")
+    parser.add_argument("--fixtures", help="keep generated inputs in this directory (default: a temp dir)")
+    parser.add_argument("--child", nargs=3, metavar=("STAGE", "SCALE", "FIXTURES"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.child:
+        stage, scale, fixtures = args.child
+        print(json.dumps(run_case(stage, int(scale), fixtures, args.repeat)))
+        return 0
+
+    print("=" * 60)
+    print("  SalaryLens — Pipeline Benchmark")
+    print("=" * 60)
+
+    if args.results:
+        if not args.compare:
+            print("  --results needs --compare")
+            return 2
+        current = load_results(args.results)
+    else:
+        fixtures = args.fixtures or tempfile.mkdtemp(prefix="bench_pipeline_")
+        os.makedirs(fixtures, exist_ok=True)
+        current = {"version": RESULTS_VERSION, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                   "environment": environment(), "repeat": args.repeat, "cases": []}
+        try:
+            for scale in args.scale or SCALES:
+                for stage in args.stage or STAGES:
+                    print(f"  {stage} at {scale}x...", flush=True)
+                    current["cases"].append(run_isolated(stage, scale, fixtures, args.repeat))
+        finally:
+            if not args.fixtures:
+                shutil.rmtree(fixtures, ignore_errors=True)
+        tmp_path = args.out + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(current, f, indent=2)
+        os.replace(tmp_path, args.out)
+
+    print_cases(current["cases"])
+    if not args.results:
+        print(f"\n  Results: {args.out}")
+
+    status = 0
+    if args.compare:
+        rows, regressions = compare(load_results(args.compare), current, args.tolerance)
+        print_comparison(rows, regressions, args.tolerance)
+        status = 1 if regressions else 0
+    print("=" * 60)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
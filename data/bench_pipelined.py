@@ -0,0 +1,119 @@
+"""
+Benchmark for build_salary_data --pipelined: downloading oe.data.0.Current
+and parsing it at once, against one after the other.
+
+A synthetic oe.data.0.Current (bench_parse.write_fake_file) and small lookup
+files are served by bench_download's stand-in server over a throttled link
+(40 MB/s unless --rate says otherwise). Both parse modes are measured, the
+target-only parse and the parse-cache build:
+
+    download     download_file for each of FILES_TO_DOWNLOAD, one after the other
+    parse        parse_data_file on the downloaded copy
+    sequential   the two in a row, as build_salary_data runs by default
+    pipelined    download_and_parse: the data file parsed as it arrives,
+                 the lookup files downloaded alongside
+
+The pipelined records must match the sequential ones row for row. Expect
+the pipelined time near max(download, parse). An unthrottled local link
+makes the download CPU-bound itself; with few cores there is then little
+left to overlap.
+
+    python3 bench_pipelined.py                            # 2,000,000 lines
+    python3 bench_pipelined.py --lines 5000000 --rate 10  # a 10 MB/s link
+"""
+
+import argparse
+import contextlib
+import http.server
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+
+import build_salary_data as bsd
+from bench_download import StandInHandler
+from bench_parse import rows, synthetic_targets, write_fake_file
+
+LOOKUPS = {
+    "oe.area": "area_code\tarea_name\n0000001\tMetro 1\n",
+    "oe.occupation": "occupation_code\toccupation_name\n151252\tSoftware Developers\n",
+    "oe.datatype": "datatype_code\tdatatype_name\n13\tAnnual median wage\n",
+}
+
+
+def run(base_url, raw, pipelined, cache):
+    """(seconds downloading, seconds parsing, total seconds, records) for one build from an empty raw dir."""
+    shutil.rmtree(raw, ignore_errors=True)
+    os.makedirs(raw)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        if pipelined:
+            _, records = bsd.download_and_parse(base_url, raw, cache=cache)
+            total = time.perf_counter() - start
+            return None, None, total, records
+        for filename in bsd.FILES_TO_DOWNLOAD:
+            bsd.download_file(filename, base_url, raw)
+        downloaded = time.perf_counter()
+        records = bsd.parse_data_file(os.path.join(raw, bsd.DATA_FILE), cache=cache)
+        end = time.perf_counter()
+    return downloaded - start, end - downloaded, end - start, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2_000_000)
+    parser.add_argument("--rate", type=float, default=40, help="link speed in MB/s")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  SalaryLens — Pipelined Download + Parse Benchmark")
+    print("=" * 60)
+
+    _, _, bsd.TARGET_AREAS, bsd.TARGET_OCCUPATIONS = synthetic_targets()
+    with tempfile.TemporaryDirectory() as tmp:
+        served, raw = os.path.join(tmp, "served"), os.path.join(tmp, "raw")
+        os.makedirs(served)
+        remote = os.path.join(served, bsd.DATA_FILE)
+        write_fake_file(remote, args.lines)
+        for filename, text in LOOKUPS.items():
+            with open(os.path.join(served, filename), "w") as f:
+                f.write(text)
+        size_mb = os.path.getsize(remote) / (1024 * 1024)
+
+        server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(StandInHandler, directory=served))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+        print(f"\n  Serving a {args.lines:,}-line, {size_mb:.0f} MB {bsd.DATA_FILE} at {base_url}, "
+              f"{args.rate:g} MB/s")
+        print(f"  CPUs: {os.cpu_count()}\n")
+
+        failures = 0
+        StandInHandler.rate = args.rate * 1024 * 1024
+        print(f"  {'parse':<14}{'download':>10}{'parse':>9}{'sequential':>12}"
+              f"{'pipelined':>11}{'max(d, p)':>11}  records")
+        for label, cache in (("targets only", False), ("parse cache", True)):
+            download, parse, sequential, expected = run(base_url, raw, False, cache)
+            _, _, pipelined, records = run(base_url, raw, True, cache)
+
+            same = records is not None and rows(records) == rows(expected)
+            failures += not same
+            print(f"  {label:<14}{download:>9.2f}s{parse:>8.2f}s{sequential:>11.2f}s"
+                  f"{pipelined:>10.2f}s{max(download, parse):>10.2f}s  "
+                  f"{len(expected):,} {'identical' if same else 'MISMATCH'}")
+            print(f"  {'':<14}pipelined saves {sequential - pipelined:.2f}s "
+                  f"({(sequential - pipelined) / min(download, parse):.0%} of the shorter phase)")
+
+        server.shutdown()
+
+    if failures:
+        print(f"\n  {failures} pipelined run(s) did not match the sequential records")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
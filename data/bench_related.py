@@ -0,0 +1,76 @@
+"""
+Benchmark related_occupations() in generate_content.py.
+
+Catalogs larger than today's are synthesized from the real occupations: each
+copy keeps the SOC major and minor group but gets fresh broad/detailed
+digits and a jittered median, so bucket sizes grow like a real catalog.
+The old per-occupation rescan (first three in the same major group) is
+timed alongside for catalogs small enough to finish quickly.
+
+    python3 bench_related.py                      # today's catalog and 10,000
+    python3 bench_related.py --size 50000
+"""
+
+import argparse
+import random
+import time
+
+from generate_content import related_occupations
+from registry import OCCUPATIONS
+
+RESCAN_LIMIT = 3000   # the O(n^2) rescan is only timed up to this size
+
+
+def synthetic_catalog(size, seed=11):
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(size):
+        slug, soc_code, name, median = OCCUPATIONS[i % len(OCCUPATIONS)]
+        copy = i // len(OCCUPATIONS)
+        if copy:
+            slug = f"{slug}-{copy}"
+            soc_code = f"{soc_code[:4]}{rng.randrange(1000):03d}"
+            median = int(median * rng.uniform(0.8, 1.2))
+        catalog.append((slug, soc_code, name, median))
+    return catalog
+
+
+def rescan(occupations):
+    """The previous algorithm: a full scan per occupation."""
+    related = {}
+    for slug, soc_code, _, _ in occupations:
+        group = soc_code[:2]
+        found = []
+        for s, code, _, _ in occupations:
+            if s != slug and code[:2] == group and len(found) < 3:
+                found.append(s)
+        related[slug] = found
+    return related
+
+
+def time_it(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", action="append", type=int,
+                        help="catalog size, may be repeated (default: today's and 10,000)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  SalaryLens — Related Occupations Benchmark")
+    print("=" * 60)
+    print(f"\n  {'occupations':>12}{'indexed':>12}{'rescan':>12}")
+    for size in args.size or [len(OCCUPATIONS), 10000]:
+        catalog = synthetic_catalog(size)
+        indexed = time_it(related_occupations, catalog)
+        old = f"{time_it(rescan, catalog) * 1000:>10.0f}ms" if size <= RESCAN_LIMIT else f"{'-':>12}"
+        print(f"  {size:>12,}{indexed * 1000:>10.0f}ms{old}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
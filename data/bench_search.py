@@ -0,0 +1,166 @@
+"""
+Benchmark the prebuilt search index against the old substring scan.
+
+Queries are synthesized from the data: prefixes of job and city names,
+job + city combinations, alias terms, mid-word fragments and misses. The
+substring scan is a Python port of the pre-index /api/search route.
+
+    python3 bench_search.py                  # 20,000 queries
+    python3 bench_search.py --queries 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+
+import build_search_index as bsi
+from salary_io import city_slug, output_path, page_slug, read_records
+
+
+def load_records(path):
+    if os.path.exists(path):
+        return list(read_records(path))
+    # No generated data yet: build the default grid in memory
+    import generate_full_data as gfd
+    records = gfd.generate_records(gfd.OCCUPATIONS, gfd.US_METROS, "US", seed_mode="hash")
+    records += gfd.generate_records(gfd.OCCUPATIONS, gfd.CA_METROS, "CA", seed_mode="hash")
+    for r in records:
+        r["city_slug"] = city_slug(r["city_short"])
+    return records
+
+
+def synthetic_queries(records, n, seed=7):
+    rng = random.Random(seed)
+    jobs = sorted({r["occ_name"] for r in records})
+    cities = sorted({r["city_short"] for r in records})
+    aliases = list(bsi.ALIASES)
+
+    def prefix(text):
+        return text[:rng.randint(2, max(2, len(text)))]
+
+    makers = [
+        lambda: prefix(rng.choice(jobs)).lower(),
+        lambda: prefix(rng.choice(cities)).lower(),
+        lambda: f"{rng.choice(jobs)} in {prefix(rng.choice(cities))}".lower(),
+        lambda: f"{rng.choice(aliases)} {rng.choice(cities)}".lower(),
+        lambda: rng.choice(aliases),
+        lambda: (lambda w: w[rng.randint(0, max(0, len(w) - 3)):][:rng.randint(3, 6)])(rng.choice(jobs).lower()),
+        lambda: "".join(rng.choice("qxzjkv") for _ in range(rng.randint(2, 6))),
+    ]
+    return [rng.choice(makers)() for _ in range(n)]
+
+
+def substring_scan(query, occupations, cities, records, limit=bsi.RESULT_LIMIT):
+    """The pre-index route: three linear substring scans."""
+    results = []
+    for slug, name in occupations:
+        if len(results) >= limit:
+            break
+        if query in name.lower():
+            results.append(("job", slug, name))
+    for slug, name, state in cities:
+        if len(results) >= limit:
+            break
+        if query in f"{name}, {state}".lower():
+            results.append(("city", slug, f"{name}, {state}"))
+    if len(results) < limit:
+        for r in records:
+            if len(results) >= limit:
+                break
+            text = f"{r['occ_name']} in {r['city_short']}".lower()
+            if query in text:
+                results.append(("salary", f"{r['occ_slug']}-in-{r['city_slug']}", text))
+    return results
+
+
+def record_pages(records):
+    """(doc type, slug) -> [(position, page slug, label)] for SearchIndex.search(pages=...)."""
+    pages = {}
+    for i, r in enumerate(records):
+        page = (i, page_slug(r), f"{r['occ_name']} in {r['city_short']}")
+        pages.setdefault(("job", r["occ_slug"]), []).append(page)
+        pages.setdefault(("city", r["city_slug"]), []).append(page)
+    return pages
+
+
+def one_word_queries(records):
+    """One-word city names and the first word of each job title, lowercased."""
+    words = {r["city_short"].lower() for r in records if " " not in r["city_short"]}
+    words.update(r["occ_name"].split()[0].lower().strip(",") for r in records)
+    return sorted(w for w in words if len(w) >= 2)
+
+
+def time_queries(fn, queries):
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "mean_us": statistics.fmean(latencies) * 1e6,
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+        "qps": len(latencies) / sum(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--scan-queries", type=int, default=2000,
+                        help="queries to run through the (slow) substring scan")
+    parser.add_argument("--data", default=output_path(bsi.OUTPUT_DIR))
+    args = parser.parse_args()
+
+    records = load_records(args.data)
+    start = time.perf_counter()
+    index = bsi.SearchIndex(json.loads(json.dumps(bsi.build_index(records))))
+    build_s = time.perf_counter() - start
+
+    occupations = sorted({(r["occ_slug"], r["occ_name"]) for r in records}, key=lambda o: o[1])
+    cities = sorted({(r["city_slug"], r["city_short"], r["state"]) for r in records}, key=lambda c: c[1])
+    pages = {page_slug(r) for r in records}
+    by_doc = record_pages(records)
+    queries = synthetic_queries(records, args.queries)
+
+    def search(q):
+        return index.search(q, has_page=pages.__contains__, pages=lambda t, s: by_doc.get((t, s), ()))
+
+    print("=" * 60)
+    print("  SalaryLens — Search Benchmark")
+    print("=" * 60)
+    print(f"\n  Records:          {len(records):,}")
+    print(f"  Index build:      {build_s * 1000:.0f} ms")
+    print(f"  Queries:          {len(queries):,}")
+
+    # One-word queries ("toronto", "software") that match the same jobs and
+    # cities as the scan must get the scan's salary results too
+    same, differ = 0, []
+    for word in one_word_queries(records):
+        new, old = search(word), substring_scan(word, occupations, cities, records)
+        if {r[:2] for r in new if r[0] != "salary"} != {r[:2] for r in old if r[0] != "salary"}:
+            continue
+        same += 1
+        if [r[1] for r in new if r[0] == "salary"] != [r[1] for r in old if r[0] == "salary"]:
+            differ.append(word)
+    print(f"  One-word queries: {same - len(differ):,} of {same:,} with the scan's jobs and cities "
+          f"get its salary results" + (f" (differ: {', '.join(differ[:5])})" if differ else ""))
+    print()
+
+    rows = [
+        ("index", time_queries(search, queries)),
+        ("substring scan", time_queries(
+            lambda q: substring_scan(q, occupations, cities, records), queries[:args.scan_queries])),
+    ]
+    print(f"  {'':<16}{'mean':>10}{'p50':>10}{'p99':>10}{'queries/s':>14}")
+    for label, r in rows:
+        print(f"  {label:<16}{r['mean_us']:>8.0f}us{r['p50_us']:>8.0f}us{r['p99_us']:>8.0f}us{r['qps']:>14,.0f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
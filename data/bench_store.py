@@ -0,0 +1,90 @@
+"""
+Benchmark the columnar store (salary_store.py) against salary_data.json.
+
+Datasets are synthetic grids scaled from today's occupation x metro grid (see
+bench_generation.synthetic_grid). For each scale it reports file sizes, the
+time to open the store vs json.load() the JSON, a full column scan, and
+(occupation, city) lookups.
+
+    python3 bench_store.py                   # 1x and 10x
+    python3 bench_store.py --scale 100 --skip-json
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import generate_full_data as gfd
+from bench_generation import synthetic_grid
+from salary_io import city_slug, write_records
+from salary_store import SalaryStore, write_store
+
+
+def iter_dataset(scale):
+    occupations, metros = synthetic_grid(len(gfd.OCCUPATIONS) * scale, len(gfd.US_METROS))
+    engine = "numpy" if gfd.np is not None else "scalar"
+    for record in gfd.iter_records(occupations, metros, "US", engine, seed_mode="hash"):
+        record["city_slug"] = city_slug(record["city_short"])
+        yield record
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(scale, work_dir, skip_json, lookups):
+    store_file = os.path.join(work_dir, f"salary_{scale}x.bin")
+    json_file = os.path.join(work_dir, f"salary_{scale}x.json")
+
+    rows, write_s = timed(lambda: write_store(iter_dataset(scale), store_file))
+    if not skip_json:
+        write_records(iter_dataset(scale), json_file, presorted=True)
+
+    store, open_s = timed(lambda: SalaryStore(store_file))
+    _, scan_s = timed(lambda: sum(store.column("median_annual")))
+    occs, cities = store.dictionary("occ_slug"), store.dictionary("city_slug")
+    rng = random.Random(scale)
+    keys = [(rng.choice(occs), rng.choice(cities)) for _ in range(lookups)]
+    _, find_s = timed(lambda: [store.row(store.find(o, c)) for o, c in keys])
+    store.close()
+
+    print(f"\n  {scale}x: {rows:,} rows")
+    print(f"    store write           {write_s:>9.2f} s   {os.path.getsize(store_file) / 2**20:>9.1f} MB")
+    print(f"    store open            {open_s * 1000:>9.2f} ms")
+    print(f"    median column sum     {scan_s * 1000:>9.2f} ms")
+    print(f"    find + row            {find_s / lookups * 1e6:>9.2f} us")
+    if not skip_json:
+        _, load_s = timed(lambda: json.load(open(json_file)))
+        print(f"    json.load             {load_s * 1000:>9.2f} ms   {os.path.getsize(json_file) / 2**20:>9.1f} MB")
+        os.remove(json_file)
+    os.remove(store_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", action="append", type=int,
+                        help="multiple of today's occupation count, may be repeated (default: 1 and 10)")
+    parser.add_argument("--skip-json", action="store_true", help="don't write or load the JSON file")
+    parser.add_argument("--lookups", type=int, default=10000)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  SalaryLens — Columnar Store Benchmark")
+    print("=" * 60)
+    work_dir = tempfile.mkdtemp(prefix="salary-store-bench-")
+    try:
+        for scale in args.scale or [1, 10]:
+            run(scale, work_dir, args.skip_json, args.lookups)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Memory benchmark: list of record dicts vs SalaryTable, measured with tracemalloc.
+
+Rows come from a synthetic grid (bench_generation.synthetic_grid) generated
+in small chunks, so the traced memory is what each container retains.
+
+    python3 bench_table.py                 # 1,000,000 rows
+    python3 bench_table.py --rows 200000
+"""
+
+import argparse
+import gc
+import itertools
+import math
+import time
+import tracemalloc
+
+import generate_full_data as gfd
+from bench_generation import synthetic_grid
+from salary_io import city_slug
+from salary_table import SalaryTable
+
+
+def iter_rows(n_rows, chunk=20):
+    n_metros = len(gfd.US_METROS)
+    occupations, metros = synthetic_grid(math.ceil(n_rows / n_metros), n_metros)
+    engine = "numpy" if gfd.np is not None else "scalar"
+    # Small occupation chunks keep the numpy grids out of the peak figure
+    records = itertools.chain.from_iterable(
+        gfd.iter_records(occupations[i:i + chunk], metros, "US", engine, seed_mode="hash")
+        for i in range(0, len(occupations), chunk))
+    for record in itertools.islice(records, n_rows):
+        record["city_slug"] = city_slug(record["city_short"])
+        yield record
+
+
+def measure(build, n_rows):
+    """Return (container, retained bytes, peak bytes, seconds)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    container = build(iter_rows(n_rows))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return container, current, peak, elapsed
+
+
+def build_table(records):
+    table = SalaryTable()
+    for record in records:
+        table.append(record)
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  SalaryLens — SalaryTable Memory Benchmark")
+    print("=" * 60)
+    print(f"\n  Rows: {args.rows:,}\n")
+    print(f"  {'':<14}{'retained':>12}{'peak':>12}{'bytes/row':>12}{'build':>10}")
+
+    results = {}
+    for label, build in [("list of dicts", list), ("SalaryTable", build_table)]:
+        container, current, peak, elapsed = measure(build, args.rows)
+        results[label] = container
+        print(f"  {label:<14}{current / 2**20:>10.1f}MB{peak / 2**20:>10.1f}MB"
+              f"{current / args.rows:>12,.0f}{elapsed:>9.1f}s")
+        if label == "list of dicts":
+            del container, results[label]
+            gc.collect()
+
+    table = results["SalaryTable"]
+    probes = [(table.get(i, "area_code"), table.get(i, "occ_slug")) for i in range(0, len(table), 997)]
+    tracemalloc.start()
+    start = time.perf_counter()
+    table.lookup(*probes[0])   # builds the key index
+    index_s = time.perf_counter() - start
+    index_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for area_code, occ_slug in probes:
+        table.lookup(area_code, occ_slug)
+    lookup_us = (time.perf_counter() - start) / len(probes) * 1e6
+    start = time.perf_counter()
+    table.sort("median_annual", reverse=True)
+    sort_s = time.perf_counter() - start
+
+    print(f"\n  SalaryTable index:    {index_bytes / 2**20:.1f} MB, built on first lookup in {index_s:.2f} s (traced)")
+    print(f"  SalaryTable lookup:   {lookup_us:.2f} us")
+    print(f"  SalaryTable sort:     {sort_s:.2f} s (median_annual, descending)")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Precompute city-vs-city comparison summaries for the /compare pages.
+
+Reads salary_data.json, builds one occupation x city median matrix, and
+computes the city pairs in vectorized blocks of PAIR_BLOCK pairs:
+  - aligned rows (occupations present in both cities, by city A median)
+  - win counts for each side and ties
+  - average medians and the mean / median percentage gap
+
+Each block's artifacts are written before the next block is computed, so
+memory is one block (n_occupations x PAIR_BLOCK per array) whatever the
+number of cities.
+
+Writes next-app/src/lib/comparisons/:
+  - index.json            occupation table + the summary of every pair
+  - <a>-vs-<b>.json       one compact artifact per pair
+
+Pair slugs follow getComparisonSlugs() in lib/data.ts: cities ordered by
+name, first city first. The compare page (app/compare/[slug]) reads a
+pair's artifact through lib/comparisons.ts, flipping it for the reverse
+slug (an artifact also lists its rows in city B's order for that).
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from salary_io import output_path, read_records, source_path
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "next-app", "src", "lib")
+COMPARISON_DIR = "comparisons"
+COMPARISON_VERSION = 3
+PAIR_BLOCK = 2048                    # pairs compared per vectorized pass
+
+
+def js_round(x):
+    """Math.round(): halves round up, unlike numpy's round-half-even."""
+    return np.floor(x + 0.5)
+
+
+def load_median_matrix(records):
+    """
+    Build the occupation x city median matrix from a record stream.
+
+    Returns (matrix, positions, occupations, cities): matrix is float64 with
+    NaN where a city has no record for an occupation; positions holds each
+    cell's record position in the file (for tie-breaking like the frontend);
+    occupations is a list of (slug, name) in first-seen order; cities is a
+    list of dicts with slug, name, state, currency and records (the city's
+    record count).
+    """
+    occ_index, city_index = {}, {}
+    occupations, cities = [], []
+    occ_col, city_col, median_col = array("i"), array("i"), array("d")
+
+    for r in records:
+        oi = occ_index.get(r["occ_slug"])
+        if oi is None:
+            oi = occ_index[r["occ_slug"]] = len(occupations)
+            occupations.append((r["occ_slug"], r["occ_name"]))
+        ci = city_index.get(r["city_slug"])
+        if ci is None:
+            ci = city_index[r["city_slug"]] = len(cities)
+            cities.append({
+                "slug": r["city_slug"],
+                "name": r["city_short"],
+                "state": r["state"],
+                "currency": r["currency"],
+                "records": 0,
+            })
+        cities[ci]["records"] += 1
+        occ_col.append(oi)
+        city_col.append(ci)
+        median_col.append(r["median_annual"])
+
+    shape = (len(occupations), len(cities))
+    cells = (np.frombuffer(occ_col, dtype=np.int32), np.frombuffer(city_col, dtype=np.int32))
+    matrix = np.full(shape, np.nan)
+    matrix[cells] = np.frombuffer(median_col, dtype=np.float64)
+    positions = np.full(shape, len(median_col), dtype=np.int64)
+    positions[cells] = np.arange(len(median_col))
+    return matrix, positions, occupations, cities
+
+
+def city_pairs(cities):
+    """(i, j) index arrays for every pair, in getComparisonSlugs() order."""
+    order = sorted(range(len(cities)), key=lambda c: cities[c]["name"].lower())
+    first, second = np.triu_indices(len(order), k=1)
+    order = np.array(order, dtype=np.intp)
+    return order[first], order[second]
+
+
+def compare_all(matrix, positions, first, second):
+    """
+    Comparison stats for the pairs (first[k], second[k]) at once.
+
+    Columns of the (n_occupations, n_pairs) slices are pairs. Returns a dict
+    of per-pair arrays plus `order`, the row order of each pair's aligned
+    occupations (shared rows first, by city A median descending, ties in
+    city A's file order — the same order the compare page produces), and
+    `order_b`, the same for city B.
+    """
+    a = matrix[:, first]
+    b = matrix[:, second]
+    common = ~(np.isnan(a) | np.isnan(b))
+    n = common.sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gap = np.where(common, (a - b) / b * 100, np.nan)
+        safe_n = np.maximum(n, 1)
+        stats = {
+            "occupations": n,
+            "wins_a": (common & (a > b)).sum(axis=0),
+            "wins_b": (common & (b > a)).sum(axis=0),
+            "ties": (common & (a == b)).sum(axis=0),
+            "avg_a": js_round(np.where(common, a, 0).sum(axis=0) / safe_n),
+            "avg_b": js_round(np.where(common, b, 0).sum(axis=0) / safe_n),
+            "mean_gap_pct": np.round(np.nansum(gap, axis=0) / safe_n, 1),
+            "median_gap_pct": np.round(_nanmedian(gap), 1),
+        }
+
+    stats["order"] = np.lexsort((positions[:, first], np.where(common, -a, np.inf)), axis=0)
+    stats["order_b"] = np.lexsort((positions[:, second], np.where(common, -b, np.inf)), axis=0)
+    stats["a"], stats["b"] = a, b
+    return stats
+
+
+def _nanmedian(values):
+    """Column medians ignoring NaN; all-NaN columns give 0."""
+    filled = np.sort(values, axis=0)  # NaNs sort last
+    n = (~np.isnan(values)).sum(axis=0)
+    cols = np.arange(values.shape[1])
+    lo = filled[np.maximum((n - 1) // 2, 0), cols]
+    hi = filled[np.maximum(n // 2, 0), cols]
+    return np.where(n > 0, (lo + hi) / 2, 0.0)
+
+
+def build_comparisons(records, block=PAIR_BLOCK):
+    """
+    Return (index, artifacts): the summary index and an iterator of
+    (pair_slug, artifact), computed `block` pairs at a time. index["pairs"]
+    is filled in as the artifacts are consumed.
+    """
+    matrix, positions, occupations, cities = load_median_matrix(records)
+    first, second = city_pairs(cities)
+    index = {
+        "version": COMPARISON_VERSION,
+        "occupations": [list(o) for o in occupations],
+        "pairs": {},
+    }
+    return index, _iter_artifacts(index, matrix, positions, cities, first, second, block)
+
+
+def _iter_artifacts(index, matrix, positions, cities, first, second, block):
+    rank = np.empty(len(matrix), dtype=np.int64)
+    for start in range(0, len(first), block):
+        firsts, seconds = first[start:start + block], second[start:start + block]
+        stats = compare_all(matrix, positions, firsts, seconds)
+        for p, (i, j) in enumerate(zip(firsts.tolist(), seconds.tolist())):
+            slug = f"{cities[i]['slug']}-vs-{cities[j]['slug']}"
+            n = int(stats["occupations"][p])
+            summary = {
+                "occupations": n,
+                "wins_a": int(stats["wins_a"][p]),
+                "wins_b": int(stats["wins_b"][p]),
+                "ties": int(stats["ties"][p]),
+                "avg_a": int(stats["avg_a"][p]),
+                "avg_b": int(stats["avg_b"][p]),
+                "mean_gap_pct": float(stats["mean_gap_pct"][p]),
+                "median_gap_pct": float(stats["median_gap_pct"][p]),
+            }
+            rows = stats["order"][:n, p]
+            rank[rows] = np.arange(n)
+            index["pairs"][slug] = summary
+            yield slug, {
+                "version": COMPARISON_VERSION,
+                "city_a": cities[i],
+                "city_b": cities[j],
+                "summary": summary,
+                # [occupation index into index.json, median A, median B]
+                "rows": np.column_stack([rows, stats["a"][rows, p], stats["b"][rows, p]])
+                          .astype(np.int64).tolist(),
+                # Indexes into rows in city B's order (by median B, ties in
+                # city B's file order), for the reversed page
+                "rows_b": rank[stats["order_b"][:n, p]].tolist(),
+            }
+
+
+def write_comparisons(index, artifacts, out_dir):
+    """
+    Write every (slug, artifact) to a fresh directory as it is produced,
+    then the index, and swap the directory in.
+    """
+    build_dir = tempfile.mkdtemp(prefix="comparisons-", dir=os.path.dirname(out_dir))
+    try:
+        for slug, artifact in artifacts:
+            with open(os.path.join(build_dir, f"{slug}.json"), "w") as f:
+                json.dump(artifact, f, separators=(",", ":"))
+        with open(os.path.join(build_dir, "index.json"), "w") as f:
+            json.dump(index, f, separators=(",", ":"))
+        if os.path.exists(out_dir):
+            shutil.rmtree(out_dir)
+        os.replace(build_dir, out_dir)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+
+def main():
+    print("=" * 60)
+    print("  SalaryLens — City Comparison Summaries")
+    print("=" * 60)
+
+    data_path = output_path(OUTPUT_DIR)
+    if not os.path.exists(data_path):
+        print("  ERROR: salary_data.json not found. Run generate_full_data.py first!")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    out_dir = os.path.join(OUTPUT_DIR, COMPARISON_DIR)
+    index, artifacts = build_comparisons(read_records(source_path(OUTPUT_DIR)))
+    write_comparisons(index, artifacts, out_dir)
+    elapsed = time.perf_counter() - start
+    total_kb = sum(os.path.getsize(os.path.join(out_dir, f)) for f in os.listdir(out_dir)) / 1024
+
+    print(f"\n  Occupations:      {len(index['occupations']):,}")
+    print(f"  City pairs:       {len(index['pairs']):,}")
+    print(f"  Build time:       {elapsed:.2f} s")
+    print(f"  Output size:      {total_kb:,.0f} KB")
+    print(f"  Output:           {out_dir}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ Progress is saved between runs. Just re-run each day until complete.
 Real BLS data replaces generated estimates in salary_data.json.
 """
 
+import argparse
 import json
 import os
 import sys
@@ -18,7 +19,10 @@ import ssl
 
 # Add this directory to path so we can import occupation/metro lists
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from generate_full_data import OCCUPATIONS, US_METROS
+import profiling
+from registry import OCCUPATIONS, US_METROS
+from salary_io import index_path, read_records, shard_dir, source_path, store_path, write_records
+from salary_table import SalaryTable
 
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(DATA_DIR, "..", "next-app", "src", "lib")
@@ -85,7 +89,19 @@ def save_progress(progress):
         json.dump(progress, f)
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch real BLS OES data and merge it into salary_data.json.")
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    profiler = profiling.Profiler.from_args(args, "build_from_api")
+    try:
+        fetch_all(profiler)
+    finally:
+        profiler.finish()
+
+
+def fetch_all(profiler):
+    """Fetch the remaining series within today's limit, then merge everything fetched so far."""
     print("=" * 60)
     print("  SalaryLens — BLS Real Data Fetcher")
     print("=" * 60)
@@ -152,7 +168,7 @@ def main():
         remaining_requests = DAILY_LIMIT - requests_today
         if remaining_requests <= 0:
             print(f"\n  Daily limit already reached. Run again tomorrow!")
-            _build_output(fetched, combos)
+            _build_output(fetched, combos, profiler)
             return
 
         # Batch the remaining series
@@ -179,7 +195,8 @@ def main():
             print(f"  [{batch_idx + 1}/{batches_to_run}] {pct:.0f}%  Fetching {len(sids)} series...", end=" ", flush=True)
 
             try:
-                response = fetch_batch(sids)
+                with profiler.stage("download"):
+                    response = fetch_batch(sids)
                 requests_today += 1
 
                 if response.get("status") == "REQUEST_SUCCEEDED":
@@ -221,7 +238,7 @@ def main():
                             progress["fetched_keys"] = fetched
                             progress["requests_today"] = requests_today
                             save_progress(progress)
-                            _build_output(fetched, combos)
+                            _build_output(fetched, combos, profiler)
                             return
                     errors += 1
                     print(f"FAILED: {msgs[0] if msgs else 'unknown'}")
@@ -260,38 +277,25 @@ def main():
             print(f"\n  ~{remaining_batches:,} batches remaining (~{remaining_days} more days)")
             print(f"  Run this script again tomorrow to continue!")
 
-    _build_output(fetched, combos)
+    _build_output(fetched, combos, profiler)
 
 
-def _build_output(fetched, combos):
+def _build_output(fetched, combos, profiler=None):
     """Merge real BLS data into salary_data.json, keeping generated data as fallback."""
+    profiler = profiler or profiling.Profiler()
     print(f"\n{'=' * 60}")
     print("  Merging real data into salary_data.json...")
 
-    # Load existing data
+    # Check existing data
     if not os.path.exists(SALARY_DATA_FILE):
         print("  ERROR: salary_data.json not found. Run generate_full_data.py first!")
         return
 
-    with open(SALARY_DATA_FILE) as f:
-        records = json.load(f)
-
-    # Build lookup for existing records: (area_code, occ_slug) -> index
-    record_index = {}
-    for i, r in enumerate(records):
-        key = f"{r['area_code']}_{r['occ_slug']}"
-        record_index[key] = i
-
-    # Map combo_key (area_code_occ_code) -> occ_slug for cross-referencing
-    combo_to_slug = {}
-    for combo_key, info in combos.items():
-        combo_to_slug[combo_key] = info["occ_slug"]
-        combo_to_slug[f"{info['area_code']}_{info['occ_slug']}"] = info["occ_slug"]
-
-    updated = 0
     required = ["employment", "mean_annual", "median_annual",
                  "pct10_annual", "pct25_annual", "pct75_annual", "pct90_annual"]
 
+    # Collect complete, valid real data, one row per (area_code, occ_slug)
+    real_by_record = SalaryTable()
     for combo_key, values in fetched.items():
         # Check if we have all required fields with real data
         real_vals = {k: v for k, v in values.items() if v is not None}
@@ -307,32 +311,35 @@ def _build_output(fetched, combos):
         if not (p10 <= p25 <= med <= p75 <= p90):
             continue
 
-        # Find matching record in salary_data.json
         info = combos.get(combo_key)
         if not info:
             continue
 
-        record_key = f"{info['area_code']}_{info['occ_slug']}"
-        idx = record_index.get(record_key)
-        if idx is None:
-            continue
+        real_by_record.put({"area_code": info["area_code"], "occ_slug": info["occ_slug"],
+                            **{f: real_vals[f] for f in required}})
 
-        # Update with real data
-        for field in required:
-            records[idx][field] = real_vals[field]
-        updated += 1
+    counts = {"updated": 0}
 
-    # Re-sort by median
-    records.sort(key=lambda r: r["median_annual"], reverse=True)
+    def merged_records():
+        # Stream the existing records, updating matches with real data
+        for r in read_records(source_path(OUTPUT_DIR)):
+            row = real_by_record.lookup(r["area_code"], r["occ_slug"])
+            if row is not None:
+                for field in required:
+                    r[field] = real_by_record.get(row, field)
+                counts["updated"] += 1
+            yield r
 
-    # Write
-    with open(SALARY_DATA_FILE, "w") as f:
-        json.dump(records, f, indent=2)
+    # Re-sort by median and write (streamed, renamed into place)
+    result = write_records(profiler.iter("merge", merged_records()), SALARY_DATA_FILE,
+                           index_file=index_path(OUTPUT_DIR), shards=shard_dir(OUTPUT_DIR),
+                           store_file=store_path(OUTPUT_DIR), profiler=profiler)
+    updated = counts["updated"]
 
     file_size = os.path.getsize(SALARY_DATA_FILE) / (1024 * 1024)
 
     print(f"  Updated {updated:,} records with real BLS data")
-    print(f"  Total records: {len(records):,}")
+    print(f"  Total records: {result.count:,}")
     print(f"  File size: {file_size:.1f} MB")
 
     if updated > 0:
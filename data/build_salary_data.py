@@ -5,18 +5,49 @@ and build the salary_data.json used by the Next.js frontend.
 No API key needed — uses BLS public flat files.
 """
 
+import http.client
+import urllib.error
 import urllib.request
+import argparse
+import hashlib
 import json
 import os
 import ssl
 import csv
 import io
+import itertools
+import queue
+import re
 import sys
+import threading
+import time
+import unicodedata
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # numpy only speeds up the data-file scan
+    np = None
+
+import profiling
+from salary_io import (
+    FORMATS, RecordStats, city_slug, index_path, output_path, shard_dir, slugify, store_path,
+    write_records,
+)
+from salary_store import Column, SalaryStore, write_columns
+from salary_table import SalaryTable
 
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 RAW_DIR = os.path.join(DATA_DIR, "raw")
 OUTPUT_DIR = os.path.join(DATA_DIR, "..", "next-app", "src", "lib")
 
+# oe.data.0.Current is read in binary chunks of this many bytes
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# Downloads are streamed to disk in chunks of this many bytes
+DOWNLOAD_CHUNK = 1024 * 1024
+
 # BLS flat file base URL
 BLS_BASE = "https://download.bls.gov/pub/time.series/oe/"
 
@@ -29,33 +60,34 @@ FILES_TO_DOWNLOAD = [
 ]
 
 # ─── Target Metros ───────────────────────────────────────────────────────
-# Top 30 US metros by population + relevance
+# Top 30 US metros by population + relevance, keyed as a series ID carries
+# them: area type letter + 7-digit area code (the MSA code zero-padded)
 TARGET_AREAS = {
-    "M0000001": {"name": "New York-Newark-Jersey City, NY-NJ-PA", "short": "New York", "state": "NY", "msa": "35620"},
-    "M0000002": {"name": "Los Angeles-Long Beach-Anaheim, CA", "short": "Los Angeles", "state": "CA", "msa": "31080"},
-    "M0000003": {"name": "Chicago-Naperville-Elgin, IL-IN-WI", "short": "Chicago", "state": "IL", "msa": "16980"},
-    "M0000004": {"name": "Dallas-Fort Worth-Arlington, TX", "short": "Dallas", "state": "TX", "msa": "19100"},
-    "M0000005": {"name": "Houston-The Woodlands-Sugar Land, TX", "short": "Houston", "state": "TX", "msa": "26420"},
-    "M0000006": {"name": "Washington-Arlington-Alexandria, DC-VA-MD-WV", "short": "Washington DC", "state": "DC", "msa": "47900"},
-    "M0000007": {"name": "Miami-Fort Lauderdale-Pompano Beach, FL", "short": "Miami", "state": "FL", "msa": "33100"},
-    "M0000008": {"name": "Philadelphia-Camden-Wilmington, PA-NJ-DE-MD", "short": "Philadelphia", "state": "PA", "msa": "37980"},
-    "M0000009": {"name": "Atlanta-Sandy Springs-Alpharetta, GA", "short": "Atlanta", "state": "GA", "msa": "12060"},
-    "M0000010": {"name": "Boston-Cambridge-Nashua, MA-NH", "short": "Boston", "state": "MA", "msa": "14460"},
-    "M0000011": {"name": "Phoenix-Mesa-Chandler, AZ", "short": "Phoenix", "state": "AZ", "msa": "38060"},
-    "M0000012": {"name": "San Francisco-Oakland-Berkeley, CA", "short": "San Francisco", "state": "CA", "msa": "41860"},
-    "M0000014": {"name": "Detroit-Warren-Dearborn, MI", "short": "Detroit", "state": "MI", "msa": "19820"},
-    "M0000015": {"name": "Seattle-Tacoma-Bellevue, WA", "short": "Seattle", "state": "WA", "msa": "42660"},
-    "M0000016": {"name": "Minneapolis-St. Paul-Bloomington, MN-WI", "short": "Minneapolis", "state": "MN", "msa": "33460"},
-    "M0000017": {"name": "San Diego-Chula Vista-Carlsbad, CA", "short": "San Diego", "state": "CA", "msa": "41740"},
-    "M0000019": {"name": "Denver-Aurora-Lakewood, CO", "short": "Denver", "state": "CO", "msa": "19740"},
-    "M0000022": {"name": "Charlotte-Concord-Gastonia, NC-SC", "short": "Charlotte", "state": "NC", "msa": "16740"},
-    "M0000026": {"name": "Portland-Vancouver-Hillsboro, OR-WA", "short": "Portland", "state": "OR", "msa": "38900"},
-    "M0000030": {"name": "Austin-Round Rock-Georgetown, TX", "short": "Austin", "state": "TX", "msa": "12420"},
-    "M0000031": {"name": "Las Vegas-Henderson-Paradise, NV", "short": "Las Vegas", "state": "NV", "msa": "29820"},
-    "M0000036": {"name": "San Jose-Sunnyvale-Santa Clara, CA", "short": "San Jose", "state": "CA", "msa": "41940"},
-    "M0000039": {"name": "Nashville-Davidson-Murfreesboro-Franklin, TN", "short": "Nashville", "state": "TN", "msa": "34980"},
-    "M0000041": {"name": "Raleigh-Cary, NC", "short": "Raleigh", "state": "NC", "msa": "39580"},
-    "M0000045": {"name": "Salt Lake City, UT", "short": "Salt Lake City", "state": "UT", "msa": "41620"},
+    "M0035620": {"name": "New York-Newark-Jersey City, NY-NJ-PA", "short": "New York", "state": "NY", "msa": "35620"},
+    "M0031080": {"name": "Los Angeles-Long Beach-Anaheim, CA", "short": "Los Angeles", "state": "CA", "msa": "31080"},
+    "M0016980": {"name": "Chicago-Naperville-Elgin, IL-IN-WI", "short": "Chicago", "state": "IL", "msa": "16980"},
+    "M0019100": {"name": "Dallas-Fort Worth-Arlington, TX", "short": "Dallas", "state": "TX", "msa": "19100"},
+    "M0026420": {"name": "Houston-The Woodlands-Sugar Land, TX", "short": "Houston", "state": "TX", "msa": "26420"},
+    "M0047900": {"name": "Washington-Arlington-Alexandria, DC-VA-MD-WV", "short": "Washington DC", "state": "DC", "msa": "47900"},
+    "M0033100": {"name": "Miami-Fort Lauderdale-Pompano Beach, FL", "short": "Miami", "state": "FL", "msa": "33100"},
+    "M0037980": {"name": "Philadelphia-Camden-Wilmington, PA-NJ-DE-MD", "short": "Philadelphia", "state": "PA", "msa": "37980"},
+    "M0012060": {"name": "Atlanta-Sandy Springs-Alpharetta, GA", "short": "Atlanta", "state": "GA", "msa": "12060"},
+    "M0014460": {"name": "Boston-Cambridge-Nashua, MA-NH", "short": "Boston", "state": "MA", "msa": "14460"},
+    "M0038060": {"name": "Phoenix-Mesa-Chandler, AZ", "short": "Phoenix", "state": "AZ", "msa": "38060"},
+    "M0041860": {"name": "San Francisco-Oakland-Berkeley, CA", "short": "San Francisco", "state": "CA", "msa": "41860"},
+    "M0019820": {"name": "Detroit-Warren-Dearborn, MI", "short": "Detroit", "state": "MI", "msa": "19820"},
+    "M0042660": {"name": "Seattle-Tacoma-Bellevue, WA", "short": "Seattle", "state": "WA", "msa": "42660"},
+    "M0033460": {"name": "Minneapolis-St. Paul-Bloomington, MN-WI", "short": "Minneapolis", "state": "MN", "msa": "33460"},
+    "M0041740": {"name": "San Diego-Chula Vista-Carlsbad, CA", "short": "San Diego", "state": "CA", "msa": "41740"},
+    "M0019740": {"name": "Denver-Aurora-Lakewood, CO", "short": "Denver", "state": "CO", "msa": "19740"},
+    "M0016740": {"name": "Charlotte-Concord-Gastonia, NC-SC", "short": "Charlotte", "state": "NC", "msa": "16740"},
+    "M0038900": {"name": "Portland-Vancouver-Hillsboro, OR-WA", "short": "Portland", "state": "OR", "msa": "38900"},
+    "M0012420": {"name": "Austin-Round Rock-Georgetown, TX", "short": "Austin", "state": "TX", "msa": "12420"},
+    "M0029820": {"name": "Las Vegas-Henderson-Paradise, NV", "short": "Las Vegas", "state": "NV", "msa": "29820"},
+    "M0041940": {"name": "San Jose-Sunnyvale-Santa Clara, CA", "short": "San Jose", "state": "CA", "msa": "41940"},
+    "M0034980": {"name": "Nashville-Davidson-Murfreesboro-Franklin, TN", "short": "Nashville", "state": "TN", "msa": "34980"},
+    "M0039580": {"name": "Raleigh-Cary, NC", "short": "Raleigh", "state": "NC", "msa": "39580"},
+    "M0041620": {"name": "Salt Lake City, UT", "short": "Salt Lake City", "state": "UT", "msa": "41620"},
 }
 
 # ─── Target Occupations ──────────────────────────────────────────────────
@@ -109,7 +141,7 @@ TARGET_OCCUPATIONS = {
 
 # ─── BLS Data Type Codes ─────────────────────────────────────────────────
 # In the OES flat file, the series ID encodes the data type:
-# Format: OEU + area_code + industry_code + occupation_code + datatype
+# Format: OEU + area type + area_code + industry_code + occupation_code + datatype
 # But we'll parse by looking at the datatype column directly
 DTYPE_MAP = {
     "01": "employment",     # Employment
@@ -123,146 +155,959 @@ DTYPE_MAP = {
 }
 
 
-def download_file(filename):
-    """Download a BLS flat file."""
-    url = BLS_BASE + filename
-    filepath = os.path.join(RAW_DIR, filename)
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-    if os.path.exists(filepath):
-        print(f"  {filename} — already downloaded")
-        return filepath
 
-    print(f"  {filename} — downloading...", end=" ", flush=True)
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp_path, path)
 
-    ctx = ssl.create_default_context()
-    req = urllib.request.Request(url, headers={
-        "User-Agent": "SalaryLens/1.0 (salary data research project)",
-    })
 
+def _say(filename, message):
+    # One write per line, so downloads in several threads don't interleave mid-line
+    sys.stdout.write(f"  {filename} — {message}\n")
+    sys.stdout.flush()
+
+
+def download_file(filename, base_url=BLS_BASE, raw_dir=RAW_DIR, chunk_size=DOWNLOAD_CHUNK, timeout=60,
+                  tee=None):
+    """
+    Download a BLS flat file, streamed in chunks to <file>.part and renamed
+    into place once complete.
+
+    <file>.http.json keeps the server's ETag / Last-Modified, so a file
+    downloaded before is revalidated (If-None-Match / If-Modified-Since) and
+    kept on 304 Not Modified. An interrupted transfer leaves its .part file,
+    and the next run resumes it with a Range request; If-Range makes the
+    server send the whole file instead if it changed in between.
+
+    tee, if given, is called with the file's bytes in order as they are
+    written: when resuming, the .part already on disk first, then each
+    chunk received. It sees nothing on 304. Messages are whole lines, so
+    downloads can run in several threads at once.
+
+    Returns the local path (the previous copy if a refresh fails), or None.
+    """
+    url = base_url + filename
+    filepath = os.path.join(raw_dir, filename)
+    part_path = filepath + ".part"
+    meta_path = filepath + ".http.json"
+    meta = _read_json(meta_path)
+    fallback = filepath if os.path.exists(filepath) else None
+
+    headers = {"User-Agent": "SalaryLens/1.0 (salary data research project)"}
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    partial = meta.get("partial") or {}
+    validator = partial.get("etag") or partial.get("last_modified")
+    if offset and validator:
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = validator
+    else:
+        offset = 0  # a .part we can't safely resume is overwritten
+        if fallback and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if fallback and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    action = f"resuming at {offset / (1024 * 1024):.1f} MB" if offset else (
+        "checking for updates" if fallback else "downloading")
+    _say(filename, f"{action}...")
+
+    ctx = ssl.create_default_context()
+    req = urllib.request.Request(url, headers=headers)
     try:
-        with urllib.request.urlopen(req, context=ctx, timeout=60) as response:
-            data = response.read()
-        with open(filepath, "wb") as f:
-            f.write(data)
-        size_mb = len(data) / (1024 * 1024)
-        print(f"OK ({size_mb:.1f} MB)")
-        return filepath
-    except Exception as e:
-        print(f"FAILED: {e}")
-        return None
+        response = urllib.request.urlopen(req, context=ctx, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            _say(filename, "not modified")
+            return filepath
+        if e.code == 416 and offset:
+            # The .part is no prefix of the current file: start again
+            _say(filename, "can't resume, restarting")
+            os.remove(part_path)
+            meta.pop("partial", None)
+            _write_json(meta_path, meta)
+            return download_file(filename, base_url, raw_dir, chunk_size, timeout, tee)
+        _say(filename, f"FAILED: HTTP {e.code}")
+        return fallback
+    except (urllib.error.URLError, OSError) as e:
+        _say(filename, f"FAILED: {e}")
+        return fallback
+
+    with response:
+        if response.status == 206:
+            content_range = response.headers.get("Content-Range", "")
+            if not content_range.startswith(f"bytes {offset}-"):
+                _say(filename, f"FAILED: unexpected Content-Range {content_range!r}")
+                return fallback
+            mode = "ab"
+        else:
+            if offset:
+                _say(filename, "server sent the whole file, starting over...")
+            offset, mode = 0, "wb"
+        length = response.headers.get("Content-Length")
+        expected = offset + int(length) if length is not None else None
+        etag = response.headers.get("ETag") or (partial.get("etag") if offset else None)
+        last_modified = response.headers.get("Last-Modified") or (
+            partial.get("last_modified") if offset else None)
+        meta["partial"] = {"etag": etag, "last_modified": last_modified}
+        _write_json(meta_path, meta)
 
+        received = 0
+        start = time.perf_counter()
+        try:
+            if tee is not None and offset:
+                with open(part_path, "rb") as f:
+                    for block in iter(lambda: f.read(chunk_size), b""):
+                        tee(block)
+            with open(part_path, mode) as f:
+                while True:
+                    chunk = response.read(chunk_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    received += len(chunk)
+                    if tee is not None:
+                        tee(chunk)
+        except (OSError, http.client.HTTPException) as e:
+            _say(filename, f"interrupted after {received / (1024 * 1024):.1f} MB ({e}); rerun to resume")
+            return fallback
+        elapsed = time.perf_counter() - start
 
-def parse_area_codes(filepath):
-    """Parse the oe.area file to build a lookup of BLS area codes."""
-    areas = {}
+    size = offset + received
+    if expected is not None and size != expected:
+        _say(filename, f"incomplete ({size:,} of {expected:,} bytes); rerun to resume")
+        return fallback
+    os.replace(part_path, filepath)
+    _write_json(meta_path, {"url": url, "etag": etag, "last_modified": last_modified, "size": size})
+
+    size_mb = size / (1024 * 1024)
+    rate = received / (1024 * 1024) / elapsed if elapsed > 0 else float("inf")
+    _say(filename, f"OK ({size_mb:.1f} MB, {received / (1024 * 1024):.1f} MB in {elapsed:.1f}s at {rate:.1f} MB/s)")
+    return filepath
+
+
+def _lookup_rows(filepath, *fields):
+    """
+    Rows of a BLS lookup file (tab-separated, with a header) as tuples of the
+    named fields. Columns are found by header name, falling back to the
+    first len(fields) columns in order; a field missing either way is "".
+    """
     with open(filepath, "r") as f:
         reader = csv.reader(f, delimiter="\t")
-        header = next(reader)
+        header = [h.strip() for h in next(reader, [])]
+        if all(field in header for field in fields[:2]):
+            cols = [header.index(field) if field in header else None for field in fields]
+        else:  # no header names we know: code and name are the first two columns
+            cols = [0, 1] + [None] * (len(fields) - 2)
         for row in reader:
             if len(row) >= 2:
-                code = row[0].strip()
-                name = row[1].strip()
-                areas[code] = name
-    return areas
+                yield tuple(row[c].strip() if c is not None and c < len(row) else "" for c in cols)
+
+
+def parse_area_codes(filepath):
+    """Parse the oe.area file: {7-digit area code: name}."""
+    return {code: name for code, name in _lookup_rows(filepath, "area_code", "area_name")}
+
+
+def parse_occupation_codes(filepath):
+    """Parse the oe.occupation file: {6-digit occupation code (no hyphen): name}."""
+    return {code.replace("-", ""): name
+            for code, name in _lookup_rows(filepath, "occupation_code", "occupation_name")}
+
+
+def parse_series_line(line, target_area_set, target_occ_set):
+    """
+    Filter one decoded data-file line: (area, occ_code, dtype, value) for a
+    data point we want, or None. area is the area type letter + 7-digit area
+    code, as TARGET_AREAS is keyed. A target set of None accepts any code.
+    """
+    parts = line.strip().split("\t")
+    if len(parts) < 4:
+        return None
+
+    series_id = parts[0].strip()
+    value = parts[3].strip()
+
+    # Series ID must be 25 chars and start with "OEU"
+    if len(series_id) < 25 or not series_id.startswith("OEU"):
+        return None
+
+    # Extract components
+    area_type = series_id[3]      # 1 char - M (metro / nonmetro), S (state), N (national)
+    area_code = series_id[4:11]   # 7 chars
+    industry = series_id[11:17]   # 6 chars - we want "000000" (all industries)
+    occ_code = series_id[17:23]   # 6 chars
+    dtype = series_id[23:25]      # 2 chars
+    area = area_type + area_code
+
+    # Filter: only cross-industry data
+    if industry != "000000":
+        return None
+
+    # Filter: only our target areas
+    if target_area_set is not None and area not in target_area_set:
+        return None
+
+    # Filter: only our target occupations
+    if target_occ_set is not None and occ_code not in target_occ_set:
+        return None
+
+    # Filter: only data types we care about
+    if dtype not in DTYPE_MAP:
+        return None
+
+    # Parse the value
+    try:
+        if value in ("-", "*", "#", "**"):
+            return None
+        numeric_val = float(value.replace(",", ""))
+    except ValueError:
+        return None
+
+    return area, occ_code, dtype, numeric_val
 
 
-def parse_data_file(filepath):
+def _word(chunk, at=0):
+    """Little-endian uint64 of 8 bytes with `chunk` placed at byte offset `at`."""
+    return int.from_bytes(b"\0" * at + chunk + b"\0" * (8 - at - len(chunk)), "little")
+
+
+class SeriesFilter:
+    """
+    The target areas / occupations as byte prefixes of the series IDs we keep.
+
+    A wanted line starts with one of `prefixes`: "OEU" + area type + area +
+    "000000" + occupation + data type, 25 bytes at fixed offsets. With numpy,
+    `words` holds bytes 1-24 of the same prefixes as three little-endian
+    uint64 columns (bytes 1-8, 9-16, 17-24; every line tested already starts
+    with "O") so a whole chunk of line starts is tested at once.
+
+    SeriesFilter.every_area() keeps every area and occupation instead (still
+    cross-industry, wanted data types only); its area_set / occ_set are None.
+    """
+
+    def __init__(self, areas=None, occupations=None):
+        areas = TARGET_AREAS if areas is None else areas
+        occupations = TARGET_OCCUPATIONS if occupations is None else occupations
+        self.area_set = set(areas)
+        self.occ_set = {occ_code.replace("-", "") for occ_code in occupations}
+        self.dtypes = frozenset(self._fields(DTYPE_MAP, 2))
+
+        self.prefixes = frozenset(
+            b"OEU" + area + b"000000" + occ + dtype
+            for area in self._fields(self.area_set, 8)
+            for occ in self._fields(self.occ_set, 6)
+            for dtype in self.dtypes
+        )
+        # (byte offset, mask or None, sorted wanted uint64 values) per word
+        self.words = None
+        if np is not None and self.prefixes:
+            packed = np.frombuffer(b"".join(p[1:] for p in sorted(self.prefixes)), dtype="<u8").reshape(-1, 3)
+            self.words = [(1 + 8 * i, None, np.unique(packed[:, i])) for i in range(3)]
+
+    @staticmethod
+    def _fields(codes, width):
+        # Only ASCII codes of the sliced widths can ever match a series ID
+        return [c.encode() for c in codes if len(c) == width and c.isascii()]
+
+    @classmethod
+    def every_area(cls):
+        self = cls({}, {})
+        self.area_set = self.occ_set = None
+        self.prefixes = None
+        if np is not None:
+            self.words = [
+                (1, _word(b"\xff" * 2), np.array([_word(b"EU")], dtype=np.uint64)),
+                (9, _word(b"\xff" * 6, 2), np.array([_word(b"000000", 2)], dtype=np.uint64)),
+                (17, _word(b"\xff" * 2, 6), np.unique([_word(d, 6) for d in self.dtypes]).astype(np.uint64)),
+            ]
+        return self
+
+    def wanted(self, lines):
+        """The byte lines whose series-ID prefix passes the filter (pure Python)."""
+        if self.prefixes is not None:
+            prefixes = self.prefixes
+            return [line for line in lines if line[:25] in prefixes]
+        dtypes = self.dtypes
+        return [line for line in lines
+                if line[23:25] in dtypes and line[11:17] == b"000000" and line.startswith(b"OEU")]
+
+
+def iter_line_blocks(f, chunk_size=CHUNK_SIZE, end=None):
+    """
+    Read a binary file from its current position, up to `end` (a line
+    boundary) if given, in chunks of about chunk_size bytes, each ending on a
+    line boundary.
+    """
+    while True:
+        size = chunk_size if end is None else min(chunk_size, end - f.tell())
+        if size <= 0:
+            return
+        block = f.read(size)
+        if not block:
+            return
+        if not block.endswith(b"\n"):
+            block += f.readline()            # finish the last line
+            if not block.endswith(b"\n"):   # end of file without a newline
+                block += b"\n"
+        yield block
+
+
+def byte_ranges(filepath, parts, start=0):
+    """Split filepath from `start` into up to `parts` (start, end) ranges cut at line boundaries."""
+    size = os.path.getsize(filepath)
+    cuts = [start]
+    with open(filepath, "rb") as f:
+        for k in range(1, parts):
+            f.seek(max(start + (size - start) * k // parts, cuts[-1]))
+            f.readline()
+            if f.tell() >= size:
+                break
+            if f.tell() > cuts[-1]:
+                cuts.append(f.tell())
+    cuts.append(size)
+    return [(a, b) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def parse_range(filepath, start, end, series_filter, chunk_size=CHUNK_SIZE):
+    """Worker task: (lines, data points) for the lines of filepath in [start, end)."""
+    lines_read = 0
+    points = []
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        for block in iter_line_blocks(f, chunk_size, end):
+            lines, block_points = scan_block(block, series_filter)
+            lines_read += lines
+            points.extend(block_points)
+    return lines_read, points
+
+
+def _candidate_lines(block, series_filter):
+    """
+    (number of lines in block, lines whose first 25 bytes are a wanted series
+    prefix), or (number of lines, None) if some line doesn't start with "O".
+    """
+    if series_filter.words is None or len(block) < 32:
+        lines = block.split(b"\n")
+        lines.pop()
+        if len(lines) != block.startswith(b"O") + block.count(b"\nO"):
+            return len(lines), None
+        return len(lines), series_filter.wanted(lines)
+
+    data = np.frombuffer(block, dtype=np.uint8)
+    ends = np.flatnonzero(data == 10)
+    starts = np.empty(len(ends), dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    if not (data[starts] == ord("O")).all():
+        return len(ends), None
+    # words[i] is the 8 bytes at offset i (an unaligned, overlapping view);
+    # a wanted line has at least 25 bytes before its newline
+    words = np.ndarray((len(block) - 7,), dtype="<u8", buffer=block, strides=(1,))
+    starts = starts[:np.searchsorted(starts, len(block) - 26, side="right")]
+    for offset, mask, wanted in series_filter.words:
+        values = words[starts + offset]
+        if mask is not None:
+            values &= np.uint64(mask)
+        starts = starts[np.isin(values, wanted)]
+        if not len(starts):
+            return len(ends), []
+    return len(ends), [block[p:block.index(b"\n", p)] for p in starts.tolist()]
+
+
+def scan_block(block, series_filter):
+    """
+    Parse a block of whole lines of oe.data.0.Current.
+    Returns (lines in the block, [(area_code, occ_code, dtype, value), ...]).
+
+    Series IDs are tested against the filter's byte prefixes before any line
+    is split, and only matching lines are decoded and parsed. A block with a
+    line that doesn't start with the series ID (blank or indented lines)
+    is parsed line by line instead, so the result is always the same as
+    parse_series_line() over every line.
+    """
+    if b"\r" in block:  # as text mode reads it
+        block = block.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    lines, candidates = _candidate_lines(block, series_filter)
+    if candidates is None:
+        candidates = block.decode().split("\n")[:-1]
+    else:
+        candidates = [line.decode() for line in candidates]
+
+    area_set, occ_set = series_filter.area_set, series_filter.occ_set
+    points = []
+    for line in candidates:
+        point = parse_series_line(line, area_set, occ_set)
+        if point is not None:
+            points.append(point)
+    return lines, points
+
+
+def add_data_point(records, area_code, occ_code, dtype, numeric_val):
+    """Set one parsed data point on its (area, occupation) row, creating the row on first sight."""
+    # Build a proper occ code with hyphen for lookup
+    occ_with_hyphen = f"{occ_code[:2]}-{occ_code[2:]}"
+
+    area_info = TARGET_AREAS.get(area_code, {})
+    occ_info = TARGET_OCCUPATIONS.get(occ_with_hyphen, {})
+    msa = area_info.get("msa", area_code)
+    occ_slug = occ_info.get("slug", occ_with_hyphen)
+    row = records.lookup(msa, occ_slug)
+    if row is None:
+        row = records.append({
+            "area_code": msa,
+            "area_name": area_info.get("name", "Unknown"),
+            "city_short": area_info.get("short", "Unknown"),
+            "state": area_info.get("state", ""),
+            "country": "US",
+            "currency": "USD",
+            "occ_code": occ_with_hyphen,
+            "occ_name": occ_info.get("name", "Unknown"),
+            "occ_slug": occ_slug,
+        })
+
+    field_name = DTYPE_MAP[dtype]
+    records.set(row, field_name, int(numeric_val) if numeric_val == int(numeric_val) else numeric_val)
+
+
+def scan_data_file(filepath, series_filter, chunk_size=CHUNK_SIZE, workers=1):
+    """
+    Yield (lines, data points) for successive parts of oe.data.0.Current, in
+    file order: blocks of about chunk_size bytes, or with workers > 1 one
+    line-aligned byte range per worker process.
+    """
+    with open(filepath, "rb") as f:
+        f.readline()  # Skip header
+        header_end = f.tell()
+
+    if workers > 1:
+        ranges = byte_ranges(filepath, workers, header_end)
+        print(f"    {len(ranges)} byte ranges in {workers} worker processes", flush=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(parse_range, [filepath] * len(ranges), *zip(*ranges),
+                                [series_filter] * len(ranges), [chunk_size] * len(ranges))
+    else:
+        with open(filepath, "rb") as f:
+            f.seek(header_end)
+            for block in iter_line_blocks(f, chunk_size):
+                yield scan_block(block, series_filter)
+
+
+def parse_data_file(filepath, chunk_size=CHUNK_SIZE, workers=1, cache=False):
     """
     Parse oe.data.0.Current — the big one.
     Each row: series_id  year  period  value  footnote_codes
 
-    Series ID format (26 chars):
-    OE U MMMMMMM IIIIII OOOOOO DD
-    prefix(2) seasonal(1) area(7) industry(6) occupation(6) datatype(2)
+    Series ID format (25 chars):
+    OE U T AAAAAAA IIIIII OOOOOO DD
+    prefix(2) seasonal(1) area type(1) area(7) industry(6) occupation(6) datatype(2)
+
+    The file is read in binary chunks and filtered on series-ID byte
+    prefixes (see scan_block); only the rows we keep are decoded. With
+    workers > 1 the file is split into line-aligned byte ranges parsed in
+    separate processes; their data points are applied in file order, so the
+    records are the same as a serial parse. With cache=True the data points
+    come from the parse cache next to the file (built on first use).
     """
     print("  Parsing data file (this may take a moment)...", flush=True)
 
-    # Build a set of target occupation codes (no hyphens)
-    target_occ_set = set()
-    for occ_code in TARGET_OCCUPATIONS:
-        target_occ_set.add(occ_code.replace("-", ""))
-
-    # Build set of target area codes
-    target_area_set = set(TARGET_AREAS.keys())
+    records = SalaryTable()  # one row per (area_code, occ_slug)
+    if cache:
+        points = cached_data_points(filepath, SeriesFilter(), chunk_size, workers)
+        for point in points:
+            add_data_point(records, *point)
+        print(f"    Done! {len(points)} data points, {len(records)} records")
+        return records
 
-    records = {}  # key: (area_code, occ_code) -> dict of values
     lines_read = 0
     matches = 0
+    next_report = 500000
+    for lines, points in scan_data_file(filepath, SeriesFilter(), chunk_size, workers):
+        lines_read += lines
+        for point in points:
+            add_data_point(records, *point)
+        matches += len(points)
+        if lines_read >= next_report:
+            print(f"    {lines_read:,} lines processed, {matches} matches...", flush=True)
+            next_report = (lines_read // 500000 + 1) * 500000
+
+    print(f"    Done! {lines_read:,} lines, {matches} data points, {len(records)} records")
+    return records
+
+
+# =============================================================================
+# PARSE CACHE
+# Every cross-industry observation of a DTYPE_MAP data type in
+# oe.data.0.Current — all areas and occupations, not just the targets — kept
+# next to it as <file>.parsed.bin, a salary_store column file (area,
+# occupation and data type dictionary-coded, value as float64, file order).
+# <file>.parsed.json records the file's size, mtime and content hash. A
+# repeat run maps the store and selects the target cells; changing
+# TARGET_AREAS / TARGET_OCCUPATIONS only changes that selection.
+# =============================================================================
+
+PARSE_CACHE_VERSION = 2
+OBSERVATION_FIELDS = ("area", "occ", "dtype")
 
-    with open(filepath, "r") as f:
-        header = f.readline()  # Skip header
 
-        for line in f:
-            lines_read += 1
-            if lines_read % 500000 == 0:
-                print(f"    {lines_read:,} lines processed, {matches} matches...", flush=True)
+def parse_cache_paths(filepath):
+    """(observation store, metadata JSON) paths of the parse cache for filepath."""
+    return filepath + ".parsed.bin", filepath + ".parsed.json"
 
-            parts = line.strip().split("\t")
-            if len(parts) < 4:
-                continue
 
-            series_id = parts[0].strip()
-            value = parts[3].strip()
+def file_digest(filepath):
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
 
-            # Series ID must be 26 chars and start with "OEU"
-            if len(series_id) < 26 or not series_id.startswith("OEU"):
-                continue
 
-            # Extract components
-            area_code = series_id[3:10]   # 7 chars
-            industry = series_id[10:16]   # 6 chars - we want "000000" (all industries)
-            occ_code = series_id[16:22]   # 6 chars
-            dtype = series_id[22:24]      # 2 chars
+class Observations:
+    """Data points held column-wise, ready to write as a salary_store file."""
 
-            # Filter: only cross-industry data
-            if industry != "000000":
-                continue
+    def __init__(self):
+        self.columns = {name: Column("dict") for name in OBSERVATION_FIELDS}
+        self.columns["value"] = Column("num")
+        self.columns["value"].data = array("d")
 
-            # Filter: only our target areas
-            if area_code not in target_area_set:
-                continue
+    def __len__(self):
+        return len(self.columns["value"].data)
 
-            # Filter: only our target occupations
-            if occ_code not in target_occ_set:
-                continue
+    def extend(self, points):
+        area, occ, dtype = (self.columns[name] for name in OBSERVATION_FIELDS)
+        values = self.columns["value"].data
+        for point in points:
+            for column, text in ((area, point[0]), (occ, point[1]), (dtype, point[2])):
+                code = column.codes.get(text)
+                if code is None:
+                    code = column.codes[text] = len(column.strings)
+                    column.strings.append(text)
+                column.data.append(code)
+            values.append(point[3])
 
-            # Filter: only data types we care about
-            if dtype not in DTYPE_MAP:
-                continue
+    def save(self, path):
+        return write_columns(path, self.columns, len(self))
 
-            # Parse the value
+
+def _cache_meta(filepath, stat, digest):
+    return {"version": PARSE_CACHE_VERSION, "dtypes": sorted(DTYPE_MAP),
+            "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}
+
+
+def load_parse_cache(filepath):
+    """
+    Path of the parse cache for filepath if it is current, else None. The
+    file's size and mtime are trusted when they match; if only the mtime
+    changed (a re-download, say) the content hash decides.
+    """
+    store_file, meta_file = parse_cache_paths(filepath)
+    try:
+        with open(meta_file) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    stat = os.stat(filepath)
+    if (not os.path.exists(store_file) or meta.get("version") != PARSE_CACHE_VERSION
+            or meta.get("dtypes") != sorted(DTYPE_MAP) or meta.get("size") != stat.st_size):
+        return None
+    if meta.get("mtime_ns") != stat.st_mtime_ns:
+        if meta.get("digest") != file_digest(filepath):
+            return None
+        meta["mtime_ns"] = stat.st_mtime_ns
+        with open(meta_file, "w") as f:
+            json.dump(meta, f)
+    return store_file
+
+
+def build_parse_cache(filepath, chunk_size=CHUNK_SIZE, workers=1):
+    """Scan filepath for every cross-industry observation and write the parse cache."""
+    stat = os.stat(filepath)
+    observations = Observations()
+    lines_read = 0
+    for lines, points in scan_data_file(filepath, SeriesFilter.every_area(), chunk_size, workers):
+        lines_read += lines
+        observations.extend(points)
+    return save_parse_cache(filepath, observations, stat, file_digest(filepath), lines_read)
+
+
+def save_parse_cache(filepath, observations, stat, digest, lines_read):
+    """Write observations as the parse cache of filepath, whose stat and content hash they came from."""
+    store_file, meta_file = parse_cache_paths(filepath)
+    observations.save(store_file)
+    with open(meta_file, "w") as f:
+        json.dump(_cache_meta(filepath, stat, digest), f)
+    print(f"    Cached {len(observations):,} observations from {lines_read:,} lines "
+          f"-> {os.path.basename(store_file)}")
+    return store_file
+
+
+def ensure_parse_cache(filepath, chunk_size=CHUNK_SIZE, workers=1):
+    """Path of the parse cache for filepath, built first if it is missing or stale."""
+    store_file = load_parse_cache(filepath)
+    if store_file is None:
+        print("    Parse cache missing or stale; scanning the whole file once...", flush=True)
+        store_file = build_parse_cache(filepath, chunk_size, workers)
+    return store_file
+
+
+def cached_data_points(filepath, series_filter, chunk_size=CHUNK_SIZE, workers=1):
+    """The filter's data points in file order, read from the parse cache (built if stale)."""
+    start = time.perf_counter()
+    store_file = ensure_parse_cache(filepath, chunk_size, workers)
+    with SalaryStore(store_file) as store:
+        names = {name: store.dictionary(name) for name in OBSERVATION_FIELDS}
+        area_codes = [i for i, a in enumerate(names["area"]) if a in series_filter.area_set]
+        occ_codes = [i for i, o in enumerate(names["occ"]) if o in series_filter.occ_set]
+        area, occ, dtype, value = (store.column(name) for name in OBSERVATION_FIELDS + ("value",))
+        if np is not None:
+            rows = np.flatnonzero(np.isin(np.asarray(area), area_codes)
+                                  & np.isin(np.asarray(occ), occ_codes)).tolist()
+        else:
+            area_codes, occ_codes = set(area_codes), set(occ_codes)
+            rows = [i for i, (a, o) in enumerate(zip(area, occ)) if a in area_codes and o in occ_codes]
+        points = [(names["area"][area[i]], names["occ"][occ[i]], names["dtype"][dtype[i]], value[i])
+                  for i in rows]
+        cached = len(store)
+        del area, occ, dtype, value
+
+    print(f"    {len(points)} of {cached:,} cached observations selected "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return points
+
+
+# =============================================================================
+# PIPELINED DOWNLOAD + PARSE
+# oe.data.0.Current parsed while it downloads: download_file runs in a
+# producer thread and hands each chunk to a bounded queue; the main thread
+# cuts the stream into blocks of whole lines and scans them as they complete.
+# The lookup files download alongside, so the wall time is about
+# max(download, parse) rather than their sum.
+# =============================================================================
+
+DATA_FILE = "oe.data.0.Current"
+
+# Chunks (of DOWNLOAD_CHUNK bytes) in flight between the download and the parser
+PIPELINE_QUEUE = 32
+
+
+class StreamParser:
+    """
+    Parse oe.data.0.Current from successive chunks of its bytes. The header
+    line is skipped; complete lines are scanned (scan_block) in blocks of
+    about chunk_size bytes and each block's data points passed to on_points,
+    in file order. With digest=True the bytes are also hashed on the way
+    through (file_digest() of the whole file, for the parse cache).
+    """
+
+    def __init__(self, series_filter, on_points, chunk_size=CHUNK_SIZE, digest=False):
+        self.series_filter = series_filter
+        self.on_points = on_points
+        self.chunk_size = chunk_size
+        self.pending = bytearray()
+        self.in_header = True
+        self.digest = hashlib.blake2b(digest_size=16) if digest else None
+        self.size = self.lines = self.points = 0
+
+    def feed(self, chunk):
+        if self.digest is not None:
+            self.digest.update(chunk)
+        self.size += len(chunk)
+        self.pending += chunk
+        if self.in_header:
+            newline = self.pending.find(b"\n")
+            if newline < 0:
+                return
+            del self.pending[:newline + 1]
+            self.in_header = False
+        if len(self.pending) >= self.chunk_size:
+            cut = self.pending.rfind(b"\n") + 1
+            if cut:
+                block = bytes(self.pending[:cut])
+                del self.pending[:cut]
+                self._scan(block)
+
+    def close(self):
+        """Scan what is left (a last line without a newline included)."""
+        if self.pending and not self.in_header:
+            if not self.pending.endswith(b"\n"):
+                self.pending += b"\n"
+            self._scan(bytes(self.pending))
+        self.pending = bytearray()
+
+    def _scan(self, block):
+        lines, points = scan_block(block, self.series_filter)
+        self.lines += lines
+        self.points += len(points)
+        self.on_points(points)
+
+
+def download_and_parse(base_url=BLS_BASE, raw_dir=RAW_DIR, cache=True, chunk_size=CHUNK_SIZE):
+    """
+    Download FILES_TO_DOWNLOAD concurrently, parsing oe.data.0.Current as its
+    chunks arrive (at most PIPELINE_QUEUE chunks are held between the two).
+
+    With cache=True every cross-industry observation is kept, written as the
+    parse cache and the targets selected from it, as parse_data_file(cache=True)
+    does; otherwise only the target cells are parsed.
+
+    Returns ({filename: path} of the files we have, records). records is None
+    when oe.data.0.Current wasn't freshly downloaded in full (not modified, or
+    a failed refresh kept the previous copy): parse the local file instead.
+    """
+    filepath = os.path.join(raw_dir, DATA_FILE)
+    before = os.stat(filepath) if os.path.exists(filepath) else None
+
+    records = SalaryTable()
+    if cache:
+        observations = Observations()
+        parser = StreamParser(SeriesFilter.every_area(), observations.extend, chunk_size, digest=True)
+    else:
+        def add_points(points):
+            for point in points:
+                add_data_point(records, *point)
+        parser = StreamParser(SeriesFilter(), add_points, chunk_size)
+
+    chunks = queue.Queue(maxsize=PIPELINE_QUEUE)
+    stop = threading.Event()
+
+    def put(chunk):
+        # Blocks while the parser is behind; gives up if it has failed
+        while not stop.is_set():
             try:
-                if value in ("-", "*", "#", "**"):
-                    continue
-                numeric_val = float(value.replace(",", ""))
-            except ValueError:
-                continue
-
-            # Build a proper occ code with hyphen for lookup
-            occ_with_hyphen = f"{occ_code[:2]}-{occ_code[2:]}"
-
-            key = (area_code, occ_with_hyphen)
-            if key not in records:
-                area_info = TARGET_AREAS.get(area_code, {})
-                occ_info = TARGET_OCCUPATIONS.get(occ_with_hyphen, {})
-                records[key] = {
-                    "area_code": area_info.get("msa", area_code),
-                    "area_name": area_info.get("name", "Unknown"),
-                    "city_short": area_info.get("short", "Unknown"),
-                    "state": area_info.get("state", ""),
-                    "country": "US",
-                    "currency": "USD",
-                    "occ_code": occ_with_hyphen,
-                    "occ_name": occ_info.get("name", "Unknown"),
-                    "occ_slug": occ_info.get("slug", occ_with_hyphen),
-                }
-
-            field_name = DTYPE_MAP[dtype]
-            records[key][field_name] = int(numeric_val) if numeric_val == int(numeric_val) else numeric_val
-            matches += 1
+                chunks.put(chunk, timeout=0.5)
+                return
+            except queue.Full:
+                pass
+        if chunk is not None:
+            raise RuntimeError("parser stopped, download abandoned")
 
-    print(f"    Done! {lines_read:,} lines, {matches} data points, {len(records)} records")
-    return records
+    def produce():
+        try:
+            return download_file(DATA_FILE, base_url, raw_dir, tee=put)
+        finally:
+            put(None)
+
+    lookups = [filename for filename in FILES_TO_DOWNLOAD if filename != DATA_FILE]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1 + len(lookups)) as pool:
+        producer = pool.submit(produce)
+        others = {filename: pool.submit(download_file, filename, base_url, raw_dir) for filename in lookups}
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    break
+                parser.feed(chunk)
+            parser.close()
+        except BaseException:
+            stop.set()
+            raise
+        paths = {DATA_FILE: producer.result()}
+        paths.update((filename, future.result()) for filename, future in others.items())
+    downloaded = {filename: path for filename, path in paths.items() if path}
+
+    after = os.stat(filepath) if paths[DATA_FILE] else None
+    if (after is None or after.st_size != parser.size
+            or (before is not None and (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns))):
+        return downloaded, None
+    print(f"    Parsed {parser.lines:,} lines as they arrived, {parser.points:,} data points "
+          f"({time.perf_counter() - start:.1f}s)")
+
+    if cache:
+        save_parse_cache(filepath, observations, after, parser.digest.hexdigest(), parser.lines)
+        del observations
+        for point in cached_data_points(filepath, SeriesFilter()):
+            add_data_point(records, *point)
+    print(f"    Done! {len(records)} records")
+    return downloaded, records
+
+
+# =============================================================================
+# FULL COVERAGE
+# Every metro area x detailed occupation in oe.data.0.Current, not just
+# TARGET_AREAS x TARGET_OCCUPATIONS: the parse cache's observations grouped
+# into one record per (area, occupation) and streamed, so only the
+# memory-mapped cache, a row order and the write_records run are in memory.
+# =============================================================================
+
+# Rows of the sorted observation order turned into Python ints at a time
+COVERAGE_BATCH = 65536
+
+# Principal cities whose own name has a hyphen. Area titles separate their
+# principal cities with "-", or with "--" when one of them is hyphenated;
+# these are the hyphenated ones that also lead single-hyphen titles.
+HYPHENATED_CITIES = ("Winston-Salem", "Wilkes-Barre", "Nashville-Davidson")
+
+_CITY_WORD = re.compile(r"[A-Za-z0-9]+(?:-[A-Za-z0-9]+)*")
+
+
+def is_msa(area, name=""):
+    """
+    Metropolitan statistical areas: area type M and a zero-padded 5-digit
+    CBSA code. BLS nonmetropolitan areas share type M but lead with a state
+    code; metropolitan divisions are told apart by name.
+    """
+    return (area.startswith("M00") and len(area) == 8
+            and "nonmetropolitan" not in name.lower() and "Metropolitan Division" not in name)
+
+
+def principal_city(area_name):
+    """
+    Short city name of an area title, e.g. "Winston-Salem" for
+    "Winston-Salem, NC" and "Louisville" for "Louisville/Jefferson County,
+    KY-IN": the first principal city, ASCII letters, digits, hyphens and
+    spaces only, so its city_slug is URL-safe.
+    """
+    cities = area_name.partition(", ")[0]
+    if "--" in cities:
+        city = cities.split("--")[0]
+    else:
+        city = next((c for c in HYPHENATED_CITIES if cities == c or cities.startswith(c + "-")),
+                    cities.split("-")[0])
+    city = unicodedata.normalize("NFKD", city.split("/")[0]).encode("ascii", "ignore").decode()
+    return " ".join(_CITY_WORD.findall(city.replace("'", "").replace(".", "")))
+
+
+def is_detailed(occ_code):
+    """Detailed SOC occupations: broad groups and above end in 0 (15-1250, 15-1200, 15-0000)."""
+    return len(occ_code) == 6 and occ_code.isdigit() and not occ_code.endswith("0")
+
+
+def coverage_dimensions(area_codes, occ_codes, area_names, occ_names):
+    """
+    TARGET_AREAS- and TARGET_OCCUPATIONS-style info for every area (type
+    letter + area code) and unhyphenated occupation code. Targets keep their
+    entries; the rest are named from the oe.area / oe.occupation lookups, with
+    the 7-digit area code as their area_code. The short city name is
+    principal_city(), with the state added where two areas share one, so
+    city and occupation slugs stay unique.
+    """
+    areas = {}
+    for code in area_codes:
+        info = TARGET_AREAS.get(code)
+        if info is None:
+            name = area_names.get(code[1:])
+            states = (name or "").partition(", ")[2]
+            info = {"name": name or "Unknown", "short": principal_city(name or "") or code[1:],
+                    "state": states[:2], "msa": code[1:]}
+        areas[code] = info
+    shared = {}
+    for info in areas.values():
+        slug = city_slug(info["short"])
+        shared[slug] = shared.get(slug, 0) + 1
+    taken = set()
+    for code, info in areas.items():
+        short = info["short"]
+        if code not in TARGET_AREAS and shared[city_slug(short)] > 1:
+            short = f"{short} {info['state']}".strip()
+        if city_slug(short) in taken:
+            short = f"{short} {code[1:]}"
+        taken.add(city_slug(short))
+        if short != info["short"]:
+            areas[code] = dict(info, short=short)
+
+    occupations = {}
+    taken = {info["slug"] for info in TARGET_OCCUPATIONS.values()}
+    for code in occ_codes:
+        hyphenated = f"{code[:2]}-{code[2:]}"
+        info = TARGET_OCCUPATIONS.get(hyphenated)
+        if info is None:
+            name = occ_names.get(code)
+            slug = slugify(name) if name else hyphenated
+            if slug in taken:
+                slug = f"{slug}-{hyphenated}"
+            taken.add(slug)
+            info = {"name": name or "Unknown", "slug": slug}
+        occupations[code] = info
+    return areas, occupations
+
+
+def _grouped_rows(area, occ, area_ok, occ_ok):
+    """
+    (area code, occ code, [rows]) for each wanted (area, occupation) pair of
+    the observation columns, ordered by area then occupation code, rows in
+    file order. With numpy the order is one argsort; without, rows are
+    bucketed by area (compact arrays) and each bucket sorted.
+    """
+    if np is not None:
+        a, o = np.asarray(area), np.asarray(occ)
+        rows = np.flatnonzero(np.isin(a, sorted(area_ok)) & np.isin(o, sorted(occ_ok)))
+        keys = a[rows].astype(np.int64) * (int(o.max()) + 1) + o[rows] if len(rows) else rows
+        rows = rows[np.argsort(keys, kind="stable")]
+        del a, o, keys
+        batches = (rows[i:i + COVERAGE_BATCH].tolist() for i in range(0, len(rows), COVERAGE_BATCH))
+    else:
+        buckets = {}
+        for i, (a, o) in enumerate(zip(area, occ)):
+            if a in area_ok and o in occ_ok:
+                bucket = buckets.get(a)
+                if bucket is None:
+                    bucket = buckets[a] = array("q")
+                bucket.append(i)
+        batches = (sorted(buckets.pop(a), key=occ.__getitem__) for a in sorted(buckets))
+
+    key, group = None, []
+    for batch in batches:
+        for i in batch:
+            if (area[i], occ[i]) != key:
+                if group:
+                    yield key[0], key[1], group
+                key, group = (area[i], occ[i]), []
+            group.append(i)
+    if group:
+        yield key[0], key[1], group
+
+
+def iter_coverage_records(store_file, area_names=None, occ_names=None):
+    """
+    Yield one record per metropolitan statistical area (is_msa) x detailed
+    occupation in the parse cache, with the fields add_data_point() gives a
+    target cell; a data type seen twice keeps its last value, as there.
+    area_names / occ_names are the oe.area / oe.occupation lookups.
+    """
+    with SalaryStore(store_file) as store:
+        names = {name: store.dictionary(name) for name in OBSERVATION_FIELDS}
+        area_names = area_names or {}
+        area_ok = {i for i, a in enumerate(names["area"]) if is_msa(a, area_names.get(a[1:], ""))}
+        occ_ok = {i for i, o in enumerate(names["occ"]) if is_detailed(o)}
+        areas, occupations = coverage_dimensions(
+            [names["area"][i] for i in sorted(area_ok)], [names["occ"][i] for i in sorted(occ_ok)],
+            area_names, occ_names or {})
+        print(f"    Full coverage: {len(area_ok)} metro areas x {len(occ_ok)} detailed occupations "
+              f"in the parse cache", flush=True)
+
+        area_fields = {}
+        for i in area_ok:
+            info = areas[names["area"][i]]
+            area_fields[i] = {"area_code": info["msa"], "area_name": info["name"], "city_short": info["short"],
+                              "state": info["state"], "country": "US", "currency": "USD"}
+        occ_fields = {}
+        for i in occ_ok:
+            code = names["occ"][i]
+            info = occupations[code]
+            occ_fields[i] = {"occ_code": f"{code[:2]}-{code[2:]}", "occ_name": info["name"],
+                             "occ_slug": info["slug"]}
+        field_names = [DTYPE_MAP[d] for d in names["dtype"]]
+
+        area, occ, dtype, value = (store.column(name) for name in OBSERVATION_FIELDS + ("value",))
+        try:
+            for a, o, rows in _grouped_rows(area, occ, area_ok, occ_ok):
+                record = {**area_fields[a], **occ_fields[o]}
+                for i in rows:
+                    v = value[i]
+                    record[field_names[dtype[i]]] = int(v) if v == int(v) else v
+                yield record
+        finally:
+            del area, occ, dtype, value
 
 
 def add_canadian_data(records):
@@ -347,20 +1192,19 @@ def add_canadian_data(records):
         },
     }
 
+    occ_by_slug = {}
+    for info in TARGET_OCCUPATIONS.values():
+        occ_by_slug.setdefault(info["slug"], info)   # first match wins, as before
+
     count = 0
     for occ_slug, city_data in ca_salaries.items():
-        occ_info = None
-        for code, info in TARGET_OCCUPATIONS.items():
-            if info["slug"] == occ_slug:
-                occ_info = info
-                break
+        occ_info = occ_by_slug.get(occ_slug)
         if not occ_info:
             occ_info = {"name": occ_slug.replace("-", " ").title(), "slug": occ_slug}
 
         for city_key, salary in city_data.items():
             city = ca_cities[city_key]
-            key = (city["code"], occ_slug)
-            records[key] = {
+            records.put({
                 "area_code": city["code"],
                 "area_name": city["name"],
                 "city_short": city["short"],
@@ -377,7 +1221,7 @@ def add_canadian_data(records):
                 "pct25_annual": salary["p25"],
                 "pct75_annual": salary["p75"],
                 "pct90_annual": salary["p90"],
-            }
+            })
             count += 1
 
     print(f"    Added {count} Canadian records")
@@ -399,7 +1243,43 @@ def validate_record(record):
     return True
 
 
-def main():
+def iter_valid_records(records, counts):
+    """Yield records that pass validate_record(), tallying valid/invalid in counts."""
+    for record in records:
+        if validate_record(record):
+            counts["valid"] += 1
+            yield record
+        else:
+            counts["invalid"] += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build salary_data.json from BLS flat files.")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="json",
+                        help="json: salary_data.json array; ndjson: salary_data.ndjson, one record per line; "
+                             "normalized: salary_data.normalized.json, dimension tables + integer facts")
+    parser.add_argument("--base-url", default=BLS_BASE,
+                        help="where to download the flat files from (a mirror or local stand-in)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="parse oe.data.0.Current as N line-aligned byte ranges in N processes")
+    parser.add_argument("--no-parse-cache", dest="parse_cache", action="store_false",
+                        help="re-scan oe.data.0.Current instead of using its parse cache")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="parse oe.data.0.Current while it downloads, lookup files alongside "
+                             "(--workers then only applies if the local copy is reparsed)")
+    parser.add_argument("--coverage", choices=["targets", "full"], default="targets",
+                        help="targets: TARGET_AREAS x TARGET_OCCUPATIONS; full: every metro area x "
+                             "every detailed occupation in the file (needs the parse cache)")
+    parser.add_argument("--offline", action="store_true",
+                        help="use the files already in data/raw/ instead of downloading")
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.coverage == "full" and not args.parse_cache:
+        parser.error("--coverage full reads the parse cache; drop --no-parse-cache")
+    if args.offline and args.pipelined:
+        parser.error("--offline and --pipelined don't combine")
+    profiler = profiling.Profiler.from_args(args, "build_salary_data")
+
     print("=" * 60)
     print("  SalaryLens Data Builder")
     print("  Downloads BLS OES data + adds Canadian data")
@@ -410,72 +1290,95 @@ def main():
     os.makedirs(RAW_DIR, exist_ok=True)
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    # Step 1: Download BLS files
-    print("Step 1: Downloading BLS flat files...")
-    downloaded = {}
+    # Step 1: Download BLS files (and, pipelined, parse the data file as it arrives)
+    records = None
+    if args.pipelined:
+        print("Step 1: Downloading BLS flat files, parsing oe.data.0.Current as it arrives...")
+        print(f"  Target: {len(TARGET_AREAS)} US metros x {len(TARGET_OCCUPATIONS)} occupations")
+        with profiler.stage("download+parse"):
+            downloaded, records = download_and_parse(args.base_url, cache=args.parse_cache)
+    elif args.offline:
+        print("Step 1: Using the BLS flat files in data/raw/ (--offline)...")
+        downloaded = {filename: os.path.join(RAW_DIR, filename) for filename in FILES_TO_DOWNLOAD
+                      if os.path.exists(os.path.join(RAW_DIR, filename))}
+    else:
+        print("Step 1: Downloading BLS flat files...")
+        downloaded = {}
+        for filename in FILES_TO_DOWNLOAD:
+            with profiler.stage("download"):
+                path = download_file(filename, args.base_url)
+            if path:
+                downloaded[filename] = path
     for filename in FILES_TO_DOWNLOAD:
-        path = download_file(filename)
-        if path:
-            downloaded[filename] = path
-        else:
-            print(f"  WARNING: Could not download {filename}")
+        if filename not in downloaded:
+            print(f"  WARNING: {filename} not in data/raw/" if args.offline
+                  else f"  WARNING: Could not download {filename}")
 
     if "oe.data.0.Current" not in downloaded:
         print("\nERROR: Could not download the main data file. Exiting.")
         sys.exit(1)
 
-    # Step 2: Parse the data
-    print(f"\nStep 2: Parsing BLS data...")
-    print(f"  Target: {len(TARGET_AREAS)} US metros x {len(TARGET_OCCUPATIONS)} occupations")
-    records = parse_data_file(downloaded["oe.data.0.Current"])
+    # Step 2: Parse the data (unless it was parsed as it downloaded)
+    if args.coverage == "full":
+        print(f"\nStep 2: Parsing BLS data (full coverage)...")
+        print("  Target: every metro area x every detailed occupation")
+        with profiler.stage("parse"):
+            store_file = ensure_parse_cache(downloaded["oe.data.0.Current"], workers=args.workers)
+        area_names = parse_area_codes(downloaded["oe.area"]) if "oe.area" in downloaded else {}
+        occ_names = (parse_occupation_codes(downloaded["oe.occupation"])
+                     if "oe.occupation" in downloaded else {})
+        bls_records = profiler.iter("group", iter_coverage_records(store_file, area_names, occ_names))
+        records = SalaryTable()
+    elif records is None:
+        print(f"\nStep 2: Parsing BLS data...")
+        print(f"  Target: {len(TARGET_AREAS)} US metros x {len(TARGET_OCCUPATIONS)} occupations")
+        with profiler.stage("parse"):
+            records = parse_data_file(downloaded["oe.data.0.Current"], workers=args.workers,
+                                      cache=args.parse_cache)
 
     # Step 3: Add Canadian data
     print(f"\nStep 3: Adding Canadian data...")
-    records = add_canadian_data(records)
+    with profiler.stage("merge"):
+        records = add_canadian_data(records)
+    if args.coverage == "full":
+        # The US records are grouped from the cache as the writer consumes them
+        records = itertools.chain(bls_records, records)
 
-    # Step 4: Validate and filter
+    # Step 4 + 5: Validate, sort by median salary descending and write, streaming
+    output_file = output_path(OUTPUT_DIR, args.format)
     print(f"\nStep 4: Validating records...")
-    valid_records = []
-    invalid_count = 0
-    for key, record in records.items():
-        if validate_record(record):
-            valid_records.append(record)
-        else:
-            invalid_count += 1
-
-    print(f"  Valid: {len(valid_records)}, Invalid/incomplete: {invalid_count}")
-
-    # Sort by median salary descending
-    valid_records.sort(key=lambda r: r["median_annual"], reverse=True)
-
-    # Step 5: Write output
-    output_path = os.path.join(OUTPUT_DIR, "salary_data.json")
-    print(f"\nStep 5: Writing {len(valid_records)} records to {output_path}...")
-    with open(output_path, "w") as f:
-        json.dump(valid_records, f, indent=2)
+    print(f"Step 5: Writing records to {output_file}...")
+    counts = {"valid": 0, "invalid": 0}
+    stats = RecordStats()
+    valid = profiler.iter("validate", iter_valid_records(records, counts))
+    result = write_records(stats.track(valid), output_file, args.format,
+                           index_file=index_path(OUTPUT_DIR), shards=shard_dir(OUTPUT_DIR),
+                           store_file=store_path(OUTPUT_DIR), profiler=profiler)
+    print(f"  Valid: {counts['valid']}, Invalid/incomplete: {counts['invalid']}")
 
     # Stats
-    occupations = set(r["occ_slug"] for r in valid_records)
-    us_cities = set(r["city_short"] for r in valid_records if r["country"] == "US")
-    ca_cities = set(r["city_short"] for r in valid_records if r["country"] == "CA")
+    occupations = stats.occupations
+    us_cities = stats.cities.get("US", set())
+    ca_cities = stats.cities.get("CA", set())
 
     print(f"\n{'=' * 60}")
     print(f"  DONE!")
-    print(f"  Records: {len(valid_records)}")
+    print(f"  Records: {result.count}")
     print(f"  Occupations: {len(occupations)}")
     print(f"  US Cities: {len(us_cities)}")
     print(f"  CA Cities: {len(ca_cities)}")
-    print(f"  Potential salary pages: {len(valid_records)}")
+    print(f"  Potential salary pages: {result.count}")
     print(f"  + job pages: {len(occupations)}")
     print(f"  + city pages: {len(us_cities) + len(ca_cities)}")
-    print(f"  = ~{len(valid_records) + len(occupations) + len(us_cities) + len(ca_cities)} total pages")
+    print(f"  = ~{result.count + len(occupations) + len(us_cities) + len(ca_cities)} total pages")
     print(f"{'=' * 60}")
 
     # Show top 10
     print("\nTop 10 highest paying:")
-    for r in valid_records[:10]:
+    for r in result.head:
         curr = "CAD" if r["currency"] == "CAD" else "USD"
         print(f"  ${r['median_annual']:>9,} {curr}  {r['occ_name']} in {r['city_short']}")
+    profiler.finish()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,316 @@
+"""
+Build the prebuilt search index used by /api/search.
+
+Documents are occupations ("job") and cities ("city"), ranked by total
+employment. Each document is indexed under the tokens of its label plus a
+naive singular form ("nurses" -> "nurse"). An alias table maps common search
+terms that don't appear in BLS titles ("nurse", "rn", "cpa", "dev", ...) to
+the documents they should surface first.
+
+The serialized index (next-app/src/lib/search_index.json) holds:
+  - docs       [type, slug, label, weight], sorted by type then weight desc,
+               so a document's id is also its rank
+  - vocab      every indexed term, sorted, for binary-search prefix lookups
+  - postings   doc ids per vocab term (ascending = best first)
+  - trigrams   doc ids per label trigram, for substring fallback
+  - aliases    alias term -> doc ids
+
+A query token scores 2 on alias hits, 1 on an exact term and 0 on a prefix or
+substring; documents must match every token and are ranked by type, total
+score, rank. Substring matches are used for a token without prefix hits, and
+for every token when no document matches them all.
+
+search() is the reference query implementation; the route in
+app/api/search/route.ts follows the same steps.
+"""
+
+import bisect
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from salary_io import output_path, read_records, source_path
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "next-app", "src", "lib")
+SEARCH_INDEX_FILE = "search_index.json"
+SEARCH_INDEX_VERSION = 1
+
+DOC_TYPES = ["job", "city"]          # result order, same as the old substring scan
+STOPWORDS = {"in", "the", "and", "of", "for", "a"}
+RESULT_LIMIT = 8
+
+# Common search terms that don't appear in BLS titles -> occupation slugs
+ALIASES = {
+    "nurse": ["registered-nurses", "nurse-practitioners", "licensed-practical-nurses"],
+    "rn": ["registered-nurses"],
+    "np": ["nurse-practitioners"],
+    "lpn": ["licensed-practical-nurses"],
+    "pa": ["physician-assistants"],
+    "doctor": ["physicians-surgeons", "family-medicine-physicians", "emergency-medicine-physicians"],
+    "dev": ["software-developers", "web-developers"],
+    "developer": ["software-developers", "web-developers"],
+    "programmer": ["computer-programmers", "software-developers"],
+    "swe": ["software-developers"],
+    "engineer": ["software-developers"],
+    "coder": ["computer-programmers", "software-developers"],
+    "it": ["computer-user-support-specialists", "computer-information-systems-managers"],
+    "cpa": ["accountants-auditors"],
+    "accountant": ["accountants-auditors"],
+    "hr": ["human-resources-specialists", "human-resources-managers"],
+    "pm": ["project-management-specialists"],
+    "teacher": ["elementary-school-teachers", "high-school-teachers", "middle-school-teachers"],
+    "cop": ["police-officers"],
+    "police": ["police-officers"],
+    "trucker": ["truck-drivers-heavy-tractor-trailer", "truck-drivers-light-delivery"],
+    "hvac": ["hvac-technicians"],
+    "dentist": ["dentists"],
+    "vet": ["veterinarians"],
+    "lawyer": ["lawyers"],
+    "attorney": ["lawyers"],
+    "nyc": ["new-york"],
+    "la": ["los-angeles"],
+    "sf": ["san-francisco"],
+    "dc": ["washington-dc"],
+    "philly": ["philadelphia"],
+    "vegas": ["las-vegas"],
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text):
+    """Lowercase, split on anything that isn't a letter or digit."""
+    return [t for t in _NON_ALNUM.split(text.lower()) if t]
+
+
+def singular(token):
+    """Naive English singular: enough to let "nurse" match "Nurses" exactly."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# =============================================================================
+# BUILD
+# =============================================================================
+
+def collect_documents(records):
+    """Aggregate records into job and city documents weighted by employment."""
+    jobs, cities = {}, {}
+    for r in records:
+        job = jobs.setdefault(r["occ_slug"], ["job", r["occ_slug"], r["occ_name"], 0])
+        job[3] += r["employment"]
+        city = cities.setdefault(r["city_slug"], ["city", r["city_slug"], f"{r['city_short']}, {r['state']}", 0])
+        city[3] += r["employment"]
+    docs = list(jobs.values()) + list(cities.values())
+    docs.sort(key=lambda d: (DOC_TYPES.index(d[0]), -d[3], d[2]))
+    return docs
+
+
+def build_index(records, aliases=ALIASES):
+    """Build the serializable search index from a record stream."""
+    docs = collect_documents(records)
+    slug_to_ids = {}
+    for doc_id, (_, slug, _, _) in enumerate(docs):
+        slug_to_ids.setdefault(slug, []).append(doc_id)
+
+    term_docs = {}
+    tri_docs = {}
+    for doc_id, (_, _, label, _) in enumerate(docs):
+        tokens = normalize(label)
+        for token in tokens:
+            term_docs.setdefault(token, set()).add(doc_id)
+            term_docs.setdefault(singular(token), set()).add(doc_id)
+        for tri in trigrams(" ".join(tokens)):
+            tri_docs.setdefault(tri, set()).add(doc_id)
+
+    alias_docs = {}
+    for alias, slugs in sorted(aliases.items()):
+        ids = sorted(d for slug in slugs for d in slug_to_ids.get(slug, ()))
+        if ids:
+            alias_docs[alias] = ids
+
+    vocab = sorted(term_docs)
+    return {
+        "version": SEARCH_INDEX_VERSION,
+        "docs": docs,
+        "vocab": vocab,
+        "postings": [sorted(term_docs[t]) for t in vocab],
+        "trigrams": {t: sorted(ids) for t, ids in sorted(tri_docs.items())},
+        "aliases": alias_docs,
+    }
+
+
+# =============================================================================
+# QUERY (reference implementation)
+# =============================================================================
+
+class SearchIndex:
+    """Loaded search index with the lookup structures search() needs."""
+
+    def __init__(self, data):
+        self.docs = data["docs"]
+        self.vocab = data["vocab"]
+        self.postings = data["postings"]
+        self.trigrams = data["trigrams"]
+        self.aliases = data["aliases"]
+        self.labels = [" ".join(normalize(d[2])) for d in self.docs]
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def match_token(self, token, substring=False):
+        """
+        Doc ids matching one query token, with a score for each.
+
+        Prefix match over the sorted vocabulary (1 if the term is exact, 0 for
+        a prefix) plus alias hits (2). If neither finds anything, or with
+        substring=True, substring matches through the trigram postings are
+        added (0). Returns {doc_id: score}.
+        """
+        matches = {}
+        hi = bisect.bisect_left(self.vocab, token)
+        while hi < len(self.vocab) and self.vocab[hi].startswith(token):
+            score = int(self.vocab[hi] == token)
+            for doc_id in self.postings[hi]:
+                matches[doc_id] = max(matches.get(doc_id, 0), score)
+            hi += 1
+        for doc_id in self.aliases.get(token, ()):
+            matches[doc_id] = 2
+        if (matches and not substring) or len(token) < 3:
+            return matches
+
+        candidates = None
+        for tri in trigrams(token):
+            ids = self.trigrams.get(tri)
+            if ids is None:
+                return matches
+            candidates = set(ids) if candidates is None else candidates.intersection(ids)
+        for doc_id in candidates:
+            if token in self.labels[doc_id]:
+                matches.setdefault(doc_id, 0)
+        return matches
+
+    def _scores(self, tokens, doc_type, min_score, substring):
+        scores = None
+        for token in tokens:
+            matches = self.match_token(token, substring)
+            if scores is None:
+                scores = {d: s for d, s in matches.items()
+                          if s >= min_score and (doc_type is None or self.docs[d][0] == doc_type)}
+            else:
+                scores = {d: s + matches[d] for d, s in scores.items()
+                          if matches.get(d, -1) >= min_score}
+            if not scores:
+                return {}
+        return scores or {}
+
+    def match_all(self, tokens, doc_type=None, min_score=0):
+        """
+        Docs matching every token (AND) with at least min_score each, ranked
+        by type, total score, then doc id. If none do (and min_score is 0),
+        every token is matched again with substring matches included, so
+        "ware dev" still finds Software Developers.
+        """
+        scores = self._scores(tokens, doc_type, min_score, False)
+        if not scores and min_score == 0:
+            scores = self._scores(tokens, doc_type, min_score, True)
+        return sorted(scores, key=lambda d: (DOC_TYPES.index(self.docs[d][0]), -scores[d], d))
+
+    def search(self, query, limit=RESULT_LIMIT, has_page=None, pages=None):
+        """
+        Answer a search box query.
+
+        Returns up to limit (type, slug, label) tuples: jobs and cities that
+        match every token, then salary pages from splitting the query into a
+        job part and a city part ("nurse toronto" -> registered-nurses-in-toronto)
+        unless the query matched a city,
+        then salary pages of the matched jobs and cities themselves ("toronto"),
+        in data order. has_page(slug), if given, drops pairs without a salary
+        record, as the route does; pages(doc_type, slug), if given, lists a
+        job's or city's salary pages as (position, page slug, label).
+        """
+        tokens = [t for t in normalize(query) if t not in STOPWORDS]
+        if not tokens or len(query.strip()) < 2:
+            return []
+
+        hits = [self.docs[d] for d in self.match_all(tokens)[:limit]]
+        results = [(doc_type, slug, label) for doc_type, slug, label, _ in hits]
+
+        # A query that names a city ("new york") is not split into job + city
+        city_query = any(doc_type == "city" for doc_type, _, _, _ in hits)
+        for split in range(1, 0 if city_query else len(tokens)):
+            if len(results) >= limit:
+                break
+            # The job part must match exactly or through an alias: "new" is
+            # only a prefix of "news", so "new york" is no job + city pair
+            jobs = self.match_all(tokens[:split], "job", min_score=1)
+            cities = self.match_all(tokens[split:], "city") if jobs else []
+            for job in jobs:
+                for city in cities:
+                    if len(results) >= limit:
+                        break
+                    j, c = self.docs[job], self.docs[city]
+                    slug = f"{j[1]}-in-{c[1]}"
+                    if has_page is not None and not has_page(slug):
+                        continue
+                    results.append(("salary", slug,
+                                    f"{j[2]} in {c[2].rsplit(',', 1)[0]}"))
+
+        if pages is not None and len(results) < limit:
+            seen = {slug for doc_type, slug, _ in results if doc_type == "salary"}
+            top = sorted({page for doc_type, slug, _, _ in hits for page in pages(doc_type, slug)})
+            for _, slug, label in top[:limit]:
+                if len(results) >= limit:
+                    break
+                if slug not in seen:
+                    results.append(("salary", slug, label))
+        return results
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    print("=" * 60)
+    print("  SalaryLens — Search Index")
+    print("=" * 60)
+
+    data_path = output_path(OUTPUT_DIR)
+    if not os.path.exists(data_path):
+        print("  ERROR: salary_data.json not found. Run generate_full_data.py first!")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    index = build_index(read_records(source_path(OUTPUT_DIR)))
+    elapsed = time.perf_counter() - start
+
+    out_path = os.path.join(OUTPUT_DIR, SEARCH_INDEX_FILE)
+    with open(out_path, "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+
+    n_jobs = sum(1 for d in index["docs"] if d[0] == "job")
+    print(f"\n  Jobs:             {n_jobs:,}")
+    print(f"  Cities:           {len(index['docs']) - n_jobs:,}")
+    print(f"  Terms:            {len(index['vocab']):,}")
+    print(f"  Trigrams:         {len(index['trigrams']):,}")
+    print(f"  Build time:       {elapsed:.2f} s")
+    print(f"  File size:        {os.path.getsize(out_path) / 1024:,.0f} KB")
+    print(f"  Output:           {out_path}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
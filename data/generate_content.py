@@ -9,12 +9,17 @@ Content is template-based (no API needed). Uses SOC major group templates with
 occupation-specific variable substitution for uniqueness.
 """
 
+import argparse
+import bisect
+import hashlib
 import json
+import math
 import os
-import hashlib
 
-# Import occupation list from the data generator
-from generate_full_data import OCCUPATIONS, US_METROS, CA_METROS
+import profiling
+import registry
+# Occupation list from the registry (cached, without importing the data generator)
+from registry import OCCUPATIONS
 
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "next-app", "src", "lib")
 
@@ -939,18 +944,87 @@ CITY_CONTENT = {
 # RELATED OCCUPATIONS MAPPING
 # =============================================================================
 
-def get_related_occupations(slug, soc_code, all_occupations):
-    """Find 2-3 related occupations based on SOC code proximity."""
-    group = soc_code[:2]
-    related = []
-    for s, code, name, median in all_occupations:
-        if s == slug:
-            continue
-        if code[:2] == group and len(related) < 3:
-            related.append(s)
+RELATED_COUNT = 3
+CODE_WEIGHT = 0.5      # weight of SOC code distance (as a fraction of the bucket width)
+MEDIAN_WEIGHT = 0.5    # weight of median salary distance (|log ratio|)
+
+# Registry SOC group levels, nearest first (see registry.SOC_PREFIXES)
+SOC_LEVELS = [("broad", 10), ("minor", 1000), ("major", 10000)]   # (level, codes per bucket)
+
+
+def related_occupations(occupations, k=RELATED_COUNT):
+    """
+    Related occupations for every occupation, in one pass.
+
+    Occupations are bucketed by SOC broad, minor and major prefix through the
+    registry's soc_group() index (the shared one for OCCUPATIONS, a fresh
+    Registry for any other catalog), each bucket sorted by code. Candidates
+    come from the narrowest bucket first: a same-broad-group occupation
+    always beats a same-minor-group one, and so on, and wider buckets are
+    only searched when the narrower ones hold fewer than k. Within a level,
+    candidates are ranked by a weighted sum of SOC code distance and median
+    salary distance; the search walks outward from the occupation's own code
+    and stops once the code distance alone can't beat the current k-th best.
+    Ties break on slug.
+
+    Returns {slug: [related slug, ...]}.
+    """
+    reg = registry.load() if occupations is OCCUPATIONS else registry.Registry(list(occupations), [], [], None)
+    info = {}
+    for slug, soc_code, name, median in reg.occupations:
+        info[slug] = (soc_code, int(soc_code.replace("-", "")), math.log(max(median, 1)))
+
+    buckets = {}   # SOC prefix -> (members as code-sorted (code, slug), their codes)
+
+    def bucket(prefix):
+        if prefix not in buckets:
+            members = sorted((info[o[0]][1], o[0]) for o in reg.soc_group(prefix))
+            buckets[prefix] = (members, [c for c, _ in members])
+        return buckets[prefix]
+
+    related = {}
+    for slug, (soc_code, code_num, log_median) in info.items():
+        chosen = []
+        seen = {slug}
+        for level, width in SOC_LEVELS:
+            members, codes = bucket(soc_code[:registry.SOC_PREFIXES[level]])
+            best = _nearest(members, codes, code_num, log_median,
+                            CODE_WEIGHT / width, k - len(chosen), seen, info)
+            chosen.extend(c for _, c in best)
+            if len(chosen) >= k:
+                break
+            seen.update(c for _, c in best)
+        related[slug] = chosen
     return related
 
 
+def _nearest(members, member_codes, code_num, log_median, code_scale, k, seen, info):
+    """Best k (score, slug) in one code-sorted bucket, walking out from code_num."""
+    top = []                          # sorted (score, slug), at most k long
+    right = bisect.bisect_left(member_codes, code_num)
+    left = right - 1
+    while left >= 0 or right < len(members):
+        # Take whichever side is closer in code
+        if right >= len(members) or (left >= 0 and code_num - member_codes[left] <= member_codes[right] - code_num):
+            c_num, c = members[left]
+            left -= 1
+        else:
+            c_num, c = members[right]
+            right += 1
+        code_part = code_scale * abs(c_num - code_num)
+        if len(top) == k and code_part > top[-1][0]:
+            break                     # every remaining candidate is further in code
+        if c in seen:
+            continue
+        entry = (code_part + MEDIAN_WEIGHT * abs(info[c][2] - log_median), c)
+        if len(top) < k:
+            bisect.insort(top, entry)
+        elif entry < top[-1]:
+            bisect.insort(top, entry)
+            top.pop()
+    return top
+
+
 # =============================================================================
 # CONTENT GENERATION
 # =============================================================================
@@ -958,6 +1032,7 @@ def get_related_occupations(slug, soc_code, all_occupations):
 def generate_occupation_content(occupations):
     """Generate content for all occupations."""
     content = {}
+    related_by_slug = related_occupations(occupations)
 
     for slug, soc_code, name, median in occupations:
         group_code = soc_code[:2]
@@ -996,7 +1071,7 @@ def generate_occupation_content(occupations):
             tips = (all_tips + all_tips)[:5]
 
         # Related occupations
-        related = get_related_occupations(slug, soc_code, occupations)
+        related = related_by_slug[slug]
 
         content[slug] = {
             "soc_group": group_code,
@@ -1013,14 +1088,20 @@ def generate_occupation_content(occupations):
     return content
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate occupation and city content JSON.")
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    profiler = profiling.Profiler.from_args(args, "generate_content")
+
     print("=" * 60)
     print("  SalaryLens — Content Generation")
     print("=" * 60)
 
     # Generate occupation content
     print(f"\n  Generating content for {len(OCCUPATIONS)} occupations...")
-    occ_content = generate_occupation_content(OCCUPATIONS)
+    with profiler.stage("generate"):
+        occ_content = generate_occupation_content(OCCUPATIONS)
     print(f"    Generated {len(occ_content)} occupation entries")
 
     # City content
@@ -1031,20 +1112,21 @@ def main():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     occ_path = os.path.join(OUTPUT_DIR, "occupation_content.json")
-    with open(occ_path, "w") as f:
+    with profiler.stage("serialize"), open(occ_path, "w") as f:
         json.dump(occ_content, f, indent=2)
     occ_size = os.path.getsize(occ_path) / 1024
     print(f"\n  occupation_content.json: {occ_size:.0f} KB ({len(occ_content)} entries)")
 
     # Write city content
     city_path = os.path.join(OUTPUT_DIR, "city_content.json")
-    with open(city_path, "w") as f:
+    with profiler.stage("serialize"), open(city_path, "w") as f:
         json.dump(city_content, f, indent=2)
     city_size = os.path.getsize(city_path) / 1024
     print(f"  city_content.json: {city_size:.0f} KB ({len(city_content)} entries)")
 
     print(f"\n  Output directory: {OUTPUT_DIR}")
     print("=" * 60)
+    profiler.finish()
 
 
 if __name__ == "__main__":
@@ -7,9 +7,25 @@ Uses published BLS OES national medians with metro-area cost-of-living adjustmen
 This produces ~18,000+ salary records for programmatic SEO pages.
 """
 
+import argparse
+import hashlib
+import heapq
+import itertools
 import json
 import os
 import random
+from concurrent.futures import ProcessPoolExecutor
+
+import profiling
+from salary_io import (
+    FORMATS, RecordStats, index_path, median_desc, output_path, read_records, shard_dir,
+    slugify, store_path, write_records,
+)
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for --engine numpy
+    np = None
 
 random.seed(42)
 
@@ -1055,22 +1071,6 @@ CA_WAGE_FACTOR = 0.82
 # GENERATION LOGIC
 # =============================================================================
 
-def slugify(name):
-    """Convert an occupation name to a URL-friendly slug."""
-    return (
-        name.lower()
-        .replace(",", "")
-        .replace("'", "")
-        .replace("(", "")
-        .replace(")", "")
-        .replace("/", "-")
-        .replace("&", "and")
-        .replace("  ", " ")
-        .strip()
-        .replace(" ", "-")
-    )
-
-
 def salary_spread(median):
     """Return a spread factor based on salary level."""
     if median > 150000:
@@ -1085,8 +1085,64 @@ def salary_spread(median):
         return 0.30
 
 
-def generate_record(occ_tuple, metro_tuple, country="US"):
-    """Generate a single salary record."""
+# =============================================================================
+# PER-RECORD SEEDING
+# Every record's jitter comes from a stable hash of (occ_slug, area_code), so
+# adding, removing or reordering occupations/metros never moves other records.
+# =============================================================================
+
+SEED = 42
+MASK64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+def key_hash(text):
+    """Stable 64-bit hash of a string (unlike hash(), not salted per process)."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def mix64(z):
+    """SplitMix64 finalizer on a Python int."""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def record_seed(occ_slug, area_code, seed=SEED):
+    """64-bit seed for one (occupation, metro) record."""
+    return mix64(key_hash(occ_slug) ^ mix64((key_hash(area_code) + seed) & MASK64))
+
+
+class RecordRandom:
+    """
+    Drop-in for the random module inside generate_record(), drawing from a
+    SplitMix64 stream keyed on one record. generate_grid() reproduces the same
+    draws with array ops, so both engines agree in hash mode.
+    """
+
+    def __init__(self, occ_slug, area_code, seed=SEED):
+        self._state = record_seed(occ_slug, area_code, seed)
+
+    def random(self):
+        self._state = (self._state + GOLDEN_GAMMA) & MASK64
+        return (mix64(self._state) >> 11) * 2.0 ** -53
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+    def randint(self, a, b):
+        return a + int(self.random() * (b - a + 1))
+
+
+def generate_record(occ_tuple, metro_tuple, country="US", rng=None):
+    """
+    Generate a single salary record.
+
+    rng defaults to the module-level random stream; pass a RecordRandom to make
+    the record independent of every draw that came before it.
+    """
+    if rng is None:
+        rng = random
     slug, soc_code, name, nat_median = occ_tuple
 
     if country == "US":
@@ -1099,11 +1155,11 @@ def generate_record(occ_tuple, metro_tuple, country="US"):
         base_median = nat_median * CA_WAGE_FACTOR
 
     # Apply metro adjustment with slight randomness (±3%)
-    adjusted = col_factor * random.uniform(0.97, 1.03)
+    adjusted = col_factor * rng.uniform(0.97, 1.03)
     median = round(base_median * adjusted / 1000) * 1000
 
     # Mean is typically slightly above median
-    mean = round(median * random.uniform(1.02, 1.12) / 1000) * 1000
+    mean = round(median * rng.uniform(1.02, 1.12) / 1000) * 1000
 
     # Percentile spread
     sp = salary_spread(median)
@@ -1113,7 +1169,7 @@ def generate_record(occ_tuple, metro_tuple, country="US"):
     p90 = round(median * (1 + sp * 0.75) / 1000) * 1000
 
     # Employment: random base scaled by metro size
-    base_emp = random.randint(1500, 20000)
+    base_emp = rng.randint(1500, 20000)
     emp = round(base_emp * emp_mult / 100) * 100
     emp = max(emp, 200)
 
@@ -1137,7 +1193,352 @@ def generate_record(occ_tuple, metro_tuple, country="US"):
     }
 
 
-def main():
+# =============================================================================
+# BATCH (NUMPY) ENGINE
+# =============================================================================
+
+RECORD_FIELDS = [
+    "area_code", "area_name", "city_short", "state", "country", "currency",
+    "occ_code", "occ_name", "occ_slug", "employment", "mean_annual",
+    "median_annual", "pct10_annual", "pct25_annual", "pct75_annual", "pct90_annual",
+]
+
+# (threshold, spread) tiers — must stay in sync with salary_spread()
+SPREAD_TIERS = [(150000, 0.50), (100000, 0.45), (70000, 0.40), (45000, 0.35)]
+SPREAD_FLOOR = 0.30
+
+
+def _mix64_array(z):
+    """SplitMix64 finalizer over a uint64 array (wraps mod 2**64 like mix64)."""
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def hash_uniforms(occ_slugs, area_codes, n_draws, seed=SEED):
+    """
+    RecordRandom.random() draws for every cell of the grid at once.
+
+    Returns an array of shape (n_draws, len(occ_slugs), len(area_codes)).
+    """
+    occ_h = np.array([key_hash(s) for s in occ_slugs], dtype=np.uint64)
+    area_h = np.array([(key_hash(c) + seed) & MASK64 for c in area_codes], dtype=np.uint64)
+    state = _mix64_array(occ_h[:, None] ^ _mix64_array(area_h)[None, :])
+
+    draws = np.empty((n_draws,) + state.shape, dtype=np.float64)
+    for k in range(n_draws):
+        state = state + np.uint64(GOLDEN_GAMMA)
+        draws[k] = (_mix64_array(state) >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+    return draws
+
+
+def grid_draws(occupations, metros, rng=None, seed_mode="sequential", seed=SEED):
+    """
+    The random inputs of generate_grid(): (jitter, mean_ratio, base_emp), each
+    of shape (len(occupations), len(metros)).
+
+    With seed_mode="hash" the draws match generate_record() with a
+    RecordRandom(seed=seed).
+    """
+    shape = (len(occupations), len(metros))
+    if seed_mode == "hash":
+        u = hash_uniforms([o[0] for o in occupations], [m[1] for m in metros], 3, seed)
+        # Same arithmetic as RecordRandom.uniform() / randint()
+        jitter = 0.97 + (1.03 - 0.97) * u[0]
+        mean_ratio = 1.02 + (1.12 - 1.02) * u[1]
+        base_emp = 1500 + np.floor(u[2] * (20000 - 1500 + 1))
+    else:
+        if rng is None:
+            rng = np.random.default_rng(SEED)
+        jitter = rng.uniform(0.97, 1.03, shape)
+        mean_ratio = rng.uniform(1.02, 1.12, shape)
+        base_emp = rng.integers(1500, 20000, shape, endpoint=True)
+    return jitter, mean_ratio, base_emp
+
+
+def derive_grid(base_median, col_factor, emp_mult, draws):
+    """
+    Salary fields from national medians, metro factors and grid_draws().
+
+    base_median is per occupation (already scaled by CA_WAGE_FACTOR for
+    Canada); col_factor and emp_mult are per metro. Every step is elementwise,
+    so deriving a subset of metro columns gives the same values as slicing
+    the full grid.
+    """
+    jitter, mean_ratio, base_emp = draws
+
+    # Outer product of national medians and metro factors, with ±3% jitter
+    adjusted = col_factor[None, :] * jitter
+    median = np.round(base_median[:, None] * adjusted / 1000) * 1000
+
+    mean = np.round(median * mean_ratio / 1000) * 1000
+
+    # Tiered spread, selected per cell
+    sp = np.select([median > t for t, _ in SPREAD_TIERS],
+                   [s for _, s in SPREAD_TIERS], SPREAD_FLOOR)
+    p10 = np.round(median * (1 - sp) / 1000) * 1000
+    p25 = np.round(median * (1 - sp * 0.55) / 1000) * 1000
+    p75 = np.round(median * (1 + sp * 0.45) / 1000) * 1000
+    p90 = np.round(median * (1 + sp * 0.75) / 1000) * 1000
+
+    emp = np.maximum(np.round(base_emp * emp_mult[None, :] / 100) * 100, 200)
+
+    return {
+        "employment": emp.astype(np.int64),
+        "mean_annual": mean.astype(np.int64),
+        "median_annual": median.astype(np.int64),
+        "pct10_annual": p10.astype(np.int64),
+        "pct25_annual": p25.astype(np.int64),
+        "pct75_annual": p75.astype(np.int64),
+        "pct90_annual": p90.astype(np.int64),
+    }
+
+
+def generate_grid(occupations, metros, country="US", rng=None, seed_mode="sequential"):
+    """
+    Generate the whole occupation x metro grid for one country as column arrays.
+
+    Same model as generate_record(), but every step is an array op over the
+    (len(occupations), len(metros)) grid instead of a Python loop. Returns a
+    dict of 2-D int64 arrays keyed by the numeric record fields.
+
+    With seed_mode="hash" the draws match generate_record() with a RecordRandom,
+    so the output is identical to the scalar engine in hash mode.
+    """
+    if np is None:
+        raise RuntimeError("numpy is required for the batch engine (pip install numpy)")
+
+    draws = grid_draws(occupations, metros, rng, seed_mode)
+    nat_median = np.array([o[3] for o in occupations], dtype=np.float64)
+    col_factor = np.array([m[5] for m in metros], dtype=np.float64)
+    emp_mult = np.array([m[6] for m in metros], dtype=np.float64)
+
+    base_median = nat_median if country == "US" else nat_median * CA_WAGE_FACTOR
+    return derive_grid(base_median, col_factor, emp_mult, draws)
+
+
+def iter_grid_records(grid, occupations, metros, country="US"):
+    """Yield record dicts from generate_grid() output, occupation-major like main()."""
+    currency = "USD" if country == "US" else "CAD"
+    columns = {k: v.tolist() for k, v in grid.items()}
+    for i, (slug, soc_code, name, _) in enumerate(occupations):
+        rows = {k: v[i] for k, v in columns.items()}
+        for j, (_, m_code, m_full, m_short, m_state, _, _) in enumerate(metros):
+            yield {
+                "area_code": m_code,
+                "area_name": m_full,
+                "city_short": m_short,
+                "state": m_state,
+                "country": country,
+                "currency": currency,
+                "occ_code": soc_code,
+                "occ_name": name,
+                "occ_slug": slug,
+                "employment": rows["employment"][j],
+                "mean_annual": rows["mean_annual"][j],
+                "median_annual": rows["median_annual"][j],
+                "pct10_annual": rows["pct10_annual"][j],
+                "pct25_annual": rows["pct25_annual"][j],
+                "pct75_annual": rows["pct75_annual"][j],
+                "pct90_annual": rows["pct90_annual"][j],
+            }
+
+
+def iter_records(occupations, metros, country="US", engine="scalar", rng=None,
+                 seed_mode="sequential"):
+    """Lazily generate every record for one country with the chosen engine and seed mode."""
+    if engine == "numpy":
+        grid = generate_grid(occupations, metros, country, rng, seed_mode)
+        yield from iter_grid_records(grid, occupations, metros, country)
+        return
+    for occ in occupations:
+        for metro in metros:
+            if seed_mode == "hash":
+                yield generate_record(occ, metro, country, RecordRandom(occ[0], metro[1]))
+            else:
+                yield generate_record(occ, metro, country, rng)
+
+
+def generate_records(occupations, metros, country="US", engine="scalar", rng=None,
+                     seed_mode="sequential"):
+    """Generate every record for one country as a list."""
+    return list(iter_records(occupations, metros, country, engine, rng, seed_mode))
+
+
+# =============================================================================
+# SHARDED GENERATION
+# =============================================================================
+
+def record_sort_key(record):
+    """Total order for output: median descending, then occupation and area."""
+    return (-record["median_annual"], record["occ_slug"], record["area_code"])
+
+
+def generate_shard(occupations, engine="scalar"):
+    """Worker task: US + CA records for a slice of occupations, pre-sorted."""
+    records = generate_records(occupations, US_METROS, "US", engine, seed_mode="hash")
+    records.extend(generate_records(occupations, CA_METROS, "CA", engine, seed_mode="hash"))
+    records.sort(key=record_sort_key)
+    return records
+
+
+def generate_sharded(occupations, workers, engine="scalar"):
+    """
+    Split occupations across a process pool and k-way merge the sorted shards.
+
+    Uses hash seeding, so the result is identical for any worker count.
+    Occupations are cut into a few more shards than workers to even out load.
+    """
+    n_shards = min(len(occupations), workers * 4)
+    size = -(-len(occupations) // n_shards)
+    chunks = [occupations[i:i + size] for i in range(0, len(occupations), size)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        shards = list(pool.map(generate_shard, chunks, [engine] * len(chunks)))
+    return heapq.merge(*shards, key=record_sort_key)
+
+
+# =============================================================================
+# INCREMENTAL REGENERATION
+# Fingerprints of every occupation and metro tuple are stored next to the
+# output. With --incremental, only rows whose occupation or metro changed are
+# regenerated; every other row is copied from the previous output. Requires
+# hash seeding, so a patched file is identical to a full rebuild.
+# =============================================================================
+
+FINGERPRINT_FILE = "salary_data.fingerprints.json"
+FINGERPRINT_VERSION = 1
+
+
+def fingerprint(value):
+    """Short stable digest of a JSON-serializable value (tuples hash like lists)."""
+    return hashlib.sha1(json.dumps(value, separators=(",", ":")).encode("utf-8")).hexdigest()[:16]
+
+
+def build_fingerprints(fmt):
+    """Fingerprints of the current inputs, keyed the way records are keyed."""
+    return {
+        "version": FINGERPRINT_VERSION,
+        # Anything that affects every record forces a full rebuild when it changes
+        "params": fingerprint([fmt, SEED, CA_WAGE_FACTOR, SPREAD_TIERS, SPREAD_FLOOR]),
+        "occupations": {occ[0]: fingerprint(occ) for occ in OCCUPATIONS},
+        "metros": {m[1]: fingerprint([country, m])
+                   for country, metros in (("US", US_METROS), ("CA", CA_METROS))
+                   for m in metros},
+    }
+
+
+def load_fingerprints(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        stored = json.load(f)
+    if stored.get("version") != FINGERPRINT_VERSION:
+        return None
+    return stored
+
+
+def save_fingerprints(path, fingerprints):
+    with open(path, "w") as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
+
+
+def diff_keys(old, new):
+    """Return (changed_or_added, removed) keys between two fingerprint maps."""
+    changed = {k for k, fp in new.items() if old.get(k) != fp}
+    removed = set(old) - set(new)
+    return changed, removed
+
+
+def plan_incremental(old, new, out_path):
+    """
+    Decide what an incremental run has to regenerate.
+
+    Returns None when a full rebuild is needed, otherwise a dict of changed and
+    removed occupation slugs and metro area codes.
+    """
+    if old is None or not os.path.exists(out_path):
+        return None
+    if old["params"] != new["params"]:
+        return None
+    changed_occ, removed_occ = diff_keys(old["occupations"], new["occupations"])
+    changed_metro, removed_metro = diff_keys(old["metros"], new["metros"])
+    return {
+        "changed_occupations": changed_occ,
+        "removed_occupations": removed_occ,
+        "changed_metros": changed_metro,
+        "removed_metros": removed_metro,
+    }
+
+
+def iter_patched_records(plan, out_path, engine="scalar"):
+    """
+    Yield the full record set for a plan: untouched rows streamed from the
+    previous output, plus freshly generated rows for anything that changed.
+    """
+    stale_occ = plan["changed_occupations"] | plan["removed_occupations"]
+    stale_metro = plan["changed_metros"] | plan["removed_metros"]
+
+    for r in read_records(out_path):
+        if r["occ_slug"] not in stale_occ and r["area_code"] not in stale_metro:
+            yield r
+
+    changed_occs = [o for o in OCCUPATIONS if o[0] in plan["changed_occupations"]]
+    kept_occs = [o for o in OCCUPATIONS if o[0] not in plan["changed_occupations"]]
+    for country, metros in (("US", US_METROS), ("CA", CA_METROS)):
+        changed_metros = [m for m in metros if m[1] in plan["changed_metros"]]
+        # Changed occupations across every metro, unchanged ones only in changed metros
+        yield from iter_records(changed_occs, metros, country, engine, seed_mode="hash")
+        yield from iter_records(kept_occs, changed_metros, country, engine, seed_mode="hash")
+
+
+def print_plan(plan):
+    metro_slugs = {m[1]: m[0] for m in US_METROS + CA_METROS}
+    rows = (len(plan["changed_occupations"]) * (len(US_METROS) + len(CA_METROS))
+            + (len(OCCUPATIONS) - len(plan["changed_occupations"])) * len(plan["changed_metros"]))
+    labels = [
+        ("Changed occupations", sorted(plan["changed_occupations"])),
+        ("Removed occupations", sorted(plan["removed_occupations"])),
+        ("Changed metros", sorted(metro_slugs[c] for c in plan["changed_metros"])),
+        ("Removed metros", sorted(plan["removed_metros"])),
+    ]
+    for label, slugs in labels:
+        if slugs:
+            print(f"    {label + ':':<22}{len(slugs):>4}  {', '.join(slugs[:10])}"
+                  f"{' …' if len(slugs) > 10 else ''}")
+    print(f"    Rows to regenerate:   {rows:,}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate salary_data.json for SalaryLens.")
+    parser.add_argument("--engine", choices=["scalar", "numpy"], default="scalar",
+                        help="record generator: per-record Python loop or vectorized numpy grid")
+    parser.add_argument("--seed-mode", choices=["sequential", "hash"], default="sequential",
+                        help="sequential: one global random stream (legacy); "
+                             "hash: per-record draws keyed on (occ_slug, area_code)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="generate occupation shards in N processes (requires --seed-mode hash)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="json",
+                        help="json: salary_data.json array; ndjson: salary_data.ndjson, one record per line; "
+                             "normalized: salary_data.normalized.json, dimension tables + integer facts")
+    parser.add_argument("--incremental", action="store_true",
+                        help="regenerate only rows whose occupation or metro tuple changed "
+                             "since the last run (requires --seed-mode hash)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.engine == "numpy" and np is None:
+        parser.error("--engine numpy requires numpy (pip install numpy)")
+    if args.workers > 1 and args.seed_mode != "hash":
+        parser.error("--workers requires --seed-mode hash (sequential draws depend on generation order)")
+    if args.incremental and args.seed_mode != "hash":
+        parser.error("--incremental requires --seed-mode hash (sequential draws depend on generation order)")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiler = profiling.Profiler.from_args(args, "generate_full_data")
+
     print("=" * 60)
     print("  SalaryLens — Full Data Generation")
     print("=" * 60)
@@ -1150,54 +1551,87 @@ def main():
     total_expected = len(OCCUPATIONS) * (len(US_METROS) + len(CA_METROS))
     print(f"  Expected total:       {total_expected:,}")
 
-    records = []
-
-    # Generate US records
-    print("\n  Generating US records...")
-    for occ in OCCUPATIONS:
-        for metro in US_METROS:
-            records.append(generate_record(occ, metro, "US"))
-    us_count = len(records)
-    print(f"    ✓ {us_count:,} US records")
-
-    # Generate CA records
-    print("  Generating Canadian records...")
-    ca_start = len(records)
-    for occ in OCCUPATIONS:
-        for metro in CA_METROS:
-            records.append(generate_record(occ, metro, "CA"))
-    ca_count = len(records) - ca_start
-    print(f"    ✓ {ca_count:,} Canadian records")
-
-    # Sort by median salary descending
-    records.sort(key=lambda r: r["median_annual"], reverse=True)
-
-    # Write output
+    print(f"  Engine:               {args.engine}")
+    print(f"  Seed mode:            {args.seed_mode}")
+    print(f"  Workers:              {args.workers}")
+
+    rng = np.random.default_rng(SEED) if args.engine == "numpy" else None
+
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    out_path = os.path.join(OUTPUT_DIR, "salary_data.json")
-    with open(out_path, "w") as f:
-        json.dump(records, f, indent=2)
+    out_path = output_path(OUTPUT_DIR, args.format)
+    fp_path = os.path.join(OUTPUT_DIR, FINGERPRINT_FILE)
+    with profiler.stage("plan"):
+        fingerprints = build_fingerprints(args.format)
+        plan = None
+        if args.incremental:
+            plan = plan_incremental(load_fingerprints(fp_path), fingerprints, out_path)
+    if args.incremental:
+        if plan is None:
+            print("\n  Incremental: no usable fingerprints for this output — full rebuild")
+        elif not any(plan.values()):
+            print(f"\n  Incremental: inputs unchanged — {out_path} is up to date")
+            profiler.finish()
+            return
+        else:
+            print("\n  Incremental: patching changed rows")
+            print_plan(plan)
+
+    stats = RecordStats()
+
+    if plan:
+        records = iter_patched_records(plan, out_path, args.engine)
+        sort_key, presorted = record_sort_key, False
+    elif args.workers > 1:
+        # Each worker returns a sorted shard; merging them keeps the output sorted
+        print(f"\n  Generating records in {args.workers} worker processes...")
+        records = generate_sharded(OCCUPATIONS, args.workers, args.engine)
+        sort_key, presorted = record_sort_key, True
+    else:
+        # Records stream straight into the writer, which sorts them on disk
+        print("\n  Generating US + Canadian records...")
+        records = itertools.chain(
+            iter_records(OCCUPATIONS, US_METROS, "US", args.engine, rng, args.seed_mode),
+            iter_records(OCCUPATIONS, CA_METROS, "CA", args.engine, rng, args.seed_mode),
+        )
+        sort_key = record_sort_key if args.seed_mode == "hash" else median_desc
+        presorted = False
+
+    # Write output (generation is streamed, so it is timed inside sort, or serialize if presorted)
+    records = profiler.iter("generate", records)
+    result = write_records(stats.track(records), out_path, args.format, sort_key, presorted,
+                           index_file=index_path(OUTPUT_DIR), shards=shard_dir(OUTPUT_DIR),
+                           workers=args.workers, store_file=store_path(OUTPUT_DIR),
+                           profiler=profiler)
+    if args.seed_mode == "hash":
+        save_fingerprints(fp_path, fingerprints)
+    elif os.path.exists(fp_path):
+        # Sequential output can't be patched; don't let a later --incremental trust it
+        os.remove(fp_path)
+    print(f"    ✓ {stats.by_country['US']:,} US records")
+    print(f"    ✓ {stats.by_country['CA']:,} Canadian records")
 
     file_size_mb = os.path.getsize(out_path) / (1024 * 1024)
 
     # Stats
-    occupations = set(r["occ_slug"] for r in records)
-    us_cities = set(r["city_short"] for r in records if r["country"] == "US")
-    ca_cities = set(r["city_short"] for r in records if r["country"] == "CA")
+    occupations = stats.occupations
+    us_cities = stats.cities.get("US", set())
+    ca_cities = stats.cities.get("CA", set())
 
     print(f"\n{'=' * 60}")
     print(f"  RESULTS")
     print(f"{'=' * 60}")
-    print(f"  Total records:    {len(records):,}")
+    print(f"  Total records:    {result.count:,}")
     print(f"  Unique jobs:      {len(occupations)}")
     print(f"  US cities:        {len(us_cities)}")
     print(f"  CA cities:        {len(ca_cities)}")
     print(f"  File size:        {file_size_mb:.1f} MB")
     print(f"  Output:           {out_path}")
+    if args.format == "json":
+        print(f"  Shards:           {shard_dir(OUTPUT_DIR)}")
     print(f"{'=' * 60}")
 
     # Estimated page counts
-    salary_pages = len(records)
+    salary_pages = result.count
     job_pages = len(occupations)
     city_pages = len(us_cities) + len(ca_cities)
     # Comparison pages (combinations of cities)
@@ -1213,17 +1647,18 @@ def main():
 
     # Top paying
     print(f"\n  Top 10 highest paying:")
-    for r in records[:10]:
+    for r in result.head:
         flag = "🇺🇸" if r["country"] == "US" else "🇨🇦"
         print(f"    {flag} ${r['median_annual']:>9,} {r['currency']}  {r['occ_name']} — {r['city_short']}")
 
     # Bottom 5
     print(f"\n  Bottom 5:")
-    for r in records[-5:]:
+    for r in result.tail:
         flag = "🇺🇸" if r["country"] == "US" else "🇨🇦"
         print(f"    {flag} ${r['median_annual']:>9,} {r['currency']}  {r['occ_name']} — {r['city_short']}")
 
     print()
+    profiler.finish()
 
 
 if __name__ == "__main__":
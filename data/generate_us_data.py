@@ -6,10 +6,17 @@ This creates sample data good enough for the MVP. Once we get a BLS API key,
 we can replace it with real data using build_from_api.py.
 """
 
-import json
+import argparse
+import itertools
 import os
 import random
 
+from salary_io import (
+    FORMATS, STORE_EXT, RecordStats, index_path, output_path, read_records, shard_dir, source_path,
+    store_path, write_records,
+)
+from salary_store import SalaryStore
+
 random.seed(42)  # Reproducible results
 
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "next-app", "src", "lib")
@@ -128,52 +135,69 @@ def generate_record(occ_slug, occ_info, metro_slug, metro_info):
     }
 
 
-def main():
-    print("Generating US salary data...")
-
-    us_records = []
+def iter_us_records():
+    """Lazily generate every occupation x metro record."""
     for occ_slug, occ_info in OCCUPATIONS.items():
         for metro_slug, metro_info in METROS.items():
-            record = generate_record(occ_slug, occ_info, metro_slug, metro_info)
-            us_records.append(record)
+            yield generate_record(occ_slug, occ_info, metro_slug, metro_info)
+
+
+def iter_canadian_records(path):
+    """Stream the Canadian records out of an existing salary data file or store."""
+    if not os.path.exists(path):
+        return
+    if path.endswith(STORE_EXT):
+        # Filter on the country codes without decoding the US rows
+        with SalaryStore(path) as store:
+            for i in store.where("country", "CA"):
+                yield store.row(i)
+        return
+    for r in read_records(path):
+        if r.get("country") == "CA":
+            yield r
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate US salary data, keeping existing Canadian records.")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="json",
+                        help="json: salary_data.json array; ndjson: salary_data.ndjson, one record per line; "
+                             "normalized: salary_data.normalized.json, dimension tables + integer facts")
+    args = parser.parse_args(argv)
 
-    print(f"  Generated {len(us_records)} US records")
-
-    # Load existing Canadian data
-    ca_path = os.path.join(OUTPUT_DIR, "salary_data.json")
-    ca_records = []
-    if os.path.exists(ca_path):
-        with open(ca_path) as f:
-            existing = json.load(f)
-            ca_records = [r for r in existing if r.get("country") == "CA"]
-        print(f"  Preserved {len(ca_records)} Canadian records")
+    print("Generating US salary data...")
 
-    # Combine and sort
-    all_records = us_records + ca_records
-    all_records.sort(key=lambda r: r["median_annual"], reverse=True)
+    # Combine with existing Canadian data and sort, streaming into the writer.
+    # write_records() renames into place at the end, so reading from the file
+    # it replaces is safe.
+    ca_path = output_path(OUTPUT_DIR, args.format)
+    stats = RecordStats()
+    existing = source_path(OUTPUT_DIR, args.format)
+    all_records = itertools.chain(iter_us_records(), iter_canadian_records(existing))
+    result = write_records(stats.track(all_records), ca_path, args.format,
+                           index_file=index_path(OUTPUT_DIR), shards=shard_dir(OUTPUT_DIR),
+                           store_file=store_path(OUTPUT_DIR))
 
-    # Write
-    with open(ca_path, "w") as f:
-        json.dump(all_records, f, indent=2)
+    print(f"  Generated {stats.by_country['US']} US records")
+    if stats.by_country["CA"]:
+        print(f"  Preserved {stats.by_country['CA']} Canadian records")
 
-    occupations = set(r["occ_slug"] for r in all_records)
-    us_cities = set(r["city_short"] for r in all_records if r["country"] == "US")
-    ca_cities = set(r["city_short"] for r in all_records if r["country"] == "CA")
+    us_cities = stats.cities.get("US", set())
+    ca_cities = stats.cities.get("CA", set())
 
     print(f"\n{'=' * 50}")
-    print(f"  Total records: {len(all_records)}")
-    print(f"  Occupations: {len(occupations)}")
+    print(f"  Total records: {result.count}")
+    print(f"  Occupations: {len(stats.occupations)}")
     print(f"  US Cities: {len(us_cities)}")
     print(f"  CA Cities: {len(ca_cities)}")
-    print(f"  Total pages: ~{len(all_records)}")
+    print(f"  Total pages: ~{result.count}")
     print(f"{'=' * 50}")
 
     print(f"\nTop 10 highest paying:")
-    for r in all_records[:10]:
+    for r in result.head:
         print(f"  ${r['median_annual']:>9,} {r['currency']}  {r['occ_name']} in {r['city_short']}")
 
     print(f"\nBottom 5:")
-    for r in all_records[-5:]:
+    for r in result.tail:
         print(f"  ${r['median_annual']:>9,} {r['currency']}  {r['occ_name']} in {r['city_short']}")
 
 
@@ -0,0 +1,332 @@
+"""
+Make-style runner for the data pipeline.
+
+Each stage is a script with declared inputs, outputs and dependencies:
+
+    salary       generate_full_data.py   -> salary_data.json / .bin, index, shards
+    bls          build_from_api.py       -> merges real BLS data into the same files (--bls only)
+    content      generate_content.py     -> occupation_content.json, city_content.json
+    comparisons  build_comparisons.py    -> comparisons/ (after salary / bls)
+    search       build_search_index.py   -> search_index.json (after salary / bls)
+
+A stage is skipped when it is up to date:
+  - its key matches the last run: a hash of its command, the contents of its
+    input files and the keys of the stages it depends on
+  - no stage it depends on ran in this invocation
+  - its outputs still have the size and mtime they had after the last stage
+    that wrote them (so a hand-run script or a deleted file triggers a rebuild)
+
+Input hashes are cached by (size, mtime), and outputs are checked with
+stat() alone, so a no-op run reads no data files and takes milliseconds.
+Independent stages run concurrently (content never waits for salary). Each
+stage's output goes to .pipeline/<stage>.log; state is in .pipeline/state.json.
+
+    python3 pipeline.py                 # rebuild whatever is stale
+    python3 pipeline.py -n              # show what would run, and why
+    python3 pipeline.py search          # one stage (and what it depends on)
+    python3 pipeline.py --force content
+    BLS_API_KEY=... python3 pipeline.py --bls
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(DATA_DIR)
+LIB = "next-app/src/lib"
+STATE_DIR = os.path.join(DATA_DIR, ".pipeline")
+STATE_FILE = os.path.join(STATE_DIR, "state.json")
+STATE_VERSION = 1
+
+# Modules every stage script imports
+SHARED = ["data/salary_io.py", "data/salary_store.py", "data/salary_table.py", "data/profiling.py"]
+
+SALARY_OUTPUTS = [f"{LIB}/salary_data.json", f"{LIB}/salary_data.bin",
+                  f"{LIB}/salary_index.json", f"{LIB}/shards/manifest.json"]
+
+# Paths are relative to the repository root
+Stage = namedtuple("Stage", "name script args inputs outputs deps optional")
+
+STAGES = [
+    Stage("salary", "generate_full_data.py", [],
+          ["data/generate_full_data.py"] + SHARED,
+          SALARY_OUTPUTS, [], False),
+    Stage("bls", "build_from_api.py", [],
+          ["data/build_from_api.py", "data/api_progress.json", "data/registry.py"] + SHARED,
+          SALARY_OUTPUTS, ["salary"], True),
+    Stage("content", "generate_content.py", [],
+          ["data/generate_content.py", "data/registry.py", "data/generate_full_data.py", "data/profiling.py"],
+          [f"{LIB}/occupation_content.json", f"{LIB}/city_content.json"], [], False),
+    Stage("comparisons", "build_comparisons.py", [],
+          ["data/build_comparisons.py"] + SHARED,
+          [f"{LIB}/comparisons/index.json"], ["salary", "bls"], False),
+    Stage("search", "build_search_index.py", [],
+          ["data/build_search_index.py"] + SHARED,
+          [f"{LIB}/search_index.json"], ["salary", "bls"], False),
+]
+
+
+def _abs(path):
+    return os.path.join(ROOT_DIR, path)
+
+
+def _stat(path):
+    """[size, mtime_ns] of a repository path, or None if it is missing."""
+    try:
+        st = os.stat(_abs(path))
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+# =============================================================================
+# STATE
+# =============================================================================
+
+class State:
+    """
+    What the last runs recorded: input digests (by size and mtime), each
+    stage's key, and each output's stat after the last stage that wrote it.
+    """
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if data.get("version") != STATE_VERSION:
+            data = {}
+        self.files = data.get("files", {})       # input path -> [size, mtime_ns, digest]
+        self.stages = data.get("stages", {})     # stage -> {"key", "seconds", "finished"}
+        self.outputs = data.get("outputs", {})   # output path -> [size, mtime_ns]
+
+    def digest(self, path):
+        """Content hash of an input file, reusing the cached one if its stat is unchanged."""
+        stat = _stat(path)
+        if stat is None:
+            return "missing"
+        cached = self.files.get(path)
+        if cached and cached[:2] == stat:
+            return cached[2]
+        h = hashlib.blake2b(digest_size=16)
+        with open(_abs(path), "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        self.files[path] = stat + [h.hexdigest()]
+        return h.hexdigest()
+
+    def record(self, stage, key, seconds):
+        with self.lock:
+            self.stages[stage.name] = {"key": key, "seconds": round(seconds, 3),
+                                       "finished": time.strftime("%Y-%m-%dT%H:%M:%S")}
+            for path in stage.outputs:
+                self.outputs[path] = _stat(path)
+            self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": STATE_VERSION, "files": self.files, "stages": self.stages,
+                       "outputs": self.outputs}, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+# =============================================================================
+# PLANNING
+# =============================================================================
+
+def select_stages(names=(), include_optional=False):
+    """{name: Stage} to consider, in declaration order: the named ones plus their dependencies."""
+    enabled = {s.name: s for s in STAGES if include_optional or not s.optional}
+    for name in names:
+        if name not in {s.name for s in STAGES}:
+            raise ValueError(f"unknown stage {name!r}")
+        enabled[name] = next(s for s in STAGES if s.name == name)
+    # Dependencies on disabled optional stages are dropped
+    enabled = {n: s._replace(deps=[d for d in s.deps if d in enabled]) for n, s in enabled.items()}
+    if not names:
+        return enabled
+
+    wanted, todo = set(), list(names)
+    while todo:
+        name = todo.pop()
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(enabled[name].deps)
+    return {n: s for n, s in enabled.items() if n in wanted}
+
+
+def check_outputs(stages):
+    """Stages writing the same file must be ordered by their dependencies."""
+    def ancestors(name):
+        seen, todo = set(), list(stages[name].deps)
+        while todo:
+            d = todo.pop()
+            if d not in seen:
+                seen.add(d)
+                todo.extend(stages[d].deps)
+        return seen
+
+    writers = {}
+    for stage in stages.values():
+        for path in stage.outputs:
+            for other in writers.get(path, []):
+                if other not in ancestors(stage.name) and stage.name not in ancestors(other):
+                    raise ValueError(f"{other} and {stage.name} both write {path} but are not ordered")
+            writers.setdefault(path, []).append(stage.name)
+
+
+def stage_keys(stages, state):
+    """Key per stage: command, input contents and dependency keys (stages are in dependency order)."""
+    keys = {}
+    for stage in stages.values():
+        h = hashlib.blake2b(digest_size=16)
+        h.update(json.dumps([stage.script, stage.args]).encode())
+        for path in stage.inputs:
+            h.update(f"{path}:{state.digest(path)}\n".encode())
+        for dep in stage.deps:
+            h.update(f"dep:{dep}:{keys[dep]}\n".encode())
+        keys[stage.name] = h.hexdigest()
+    return keys
+
+
+def stale_reason(stage, key, state, rebuilt, force):
+    """Why a stage must run, or None if it is up to date."""
+    if force:
+        return "forced"
+    stamp = state.stages.get(stage.name)
+    if stamp is None:
+        return "never run"
+    if stamp["key"] != key:
+        return "inputs changed"
+    for dep in stage.deps:
+        if dep in rebuilt:
+            return f"{dep} rebuilt"
+    for path in stage.outputs:
+        stat = _stat(path)
+        if stat is None:
+            return f"missing {path}"
+        if stat != state.outputs.get(path):
+            return f"modified {path}"
+    return None
+
+
+# =============================================================================
+# RUNNING
+# =============================================================================
+
+def run_stage(stage):
+    """Run a stage's script, logging to .pipeline/<stage>.log; returns (ok, seconds)."""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    start = time.perf_counter()
+    with open(os.path.join(STATE_DIR, f"{stage.name}.log"), "w") as log:
+        proc = subprocess.run([sys.executable, os.path.join(DATA_DIR, stage.script), *stage.args],
+                              cwd=DATA_DIR, stdout=log, stderr=subprocess.STDOUT)
+    return proc.returncode == 0, time.perf_counter() - start
+
+
+def log_tail(stage, lines=15):
+    try:
+        with open(os.path.join(STATE_DIR, f"{stage.name}.log")) as f:
+            return f.readlines()[-lines:]
+    except OSError:
+        return []
+
+
+def build(stages, state, jobs=None, force=(), dry_run=False, runner=run_stage):
+    """
+    Run every stale stage, independent ones concurrently. Returns
+    {stage: "up to date" | "ran" | "failed" | "blocked" | "would run"}.
+    """
+    keys = stage_keys(stages, state)
+    status = {}
+    rebuilt = set()
+    pending = dict(stages)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(d not in status for d in stage.deps):
+                    continue
+                del pending[name]
+                if any(status[d] in ("failed", "blocked") for d in stage.deps):
+                    status[name] = "blocked"
+                    print(f"  {name:<12} blocked (a dependency failed)")
+                    continue
+                reason = stale_reason(stage, keys[name], state, rebuilt, name in force)
+                if reason is None:
+                    status[name] = "up to date"
+                    print(f"  {name:<12} up to date")
+                elif dry_run:
+                    status[name] = "would run"
+                    rebuilt.add(name)
+                    print(f"  {name:<12} would run ({reason})")
+                else:
+                    print(f"  {name:<12} running ({reason})...", flush=True)
+                    running[pool.submit(runner, stage)] = stage
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                ok, seconds = future.result()
+                if ok:
+                    state.record(stage, keys[stage.name], seconds)
+                    status[stage.name] = "ran"
+                    rebuilt.add(stage.name)
+                    print(f"  {stage.name:<12} done in {seconds:.1f}s")
+                else:
+                    status[stage.name] = "failed"
+                    print(f"  {stage.name:<12} FAILED after {seconds:.1f}s — last lines of its log:")
+                    for line in log_tail(stage):
+                        print(f"    | {line.rstrip()}")
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the data pipeline, skipping up-to-date stages.")
+    parser.add_argument("stages", nargs="*", help="stages to build, with their dependencies (default: all)")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="show what would run, and why")
+    parser.add_argument("-j", "--jobs", type=int, help="stages to run at once (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="rerun the selected stages even if up to date")
+    parser.add_argument("--bls", action="store_true", help="include the BLS API merge (needs BLS_API_KEY)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        stages = select_stages(args.stages, args.bls)
+        check_outputs(stages)
+    except ValueError as e:
+        parser.error(str(e))
+
+    state = State()
+    force = set(args.stages or stages) if args.force else set()
+    status = build(stages, state, args.jobs, force, args.dry_run)
+    if not args.dry_run:
+        state.save()   # keeps the refreshed input digests
+
+    counts = {}
+    for s in status.values():
+        counts[s] = counts.get(s, 0) + 1
+    print("\n  " + ", ".join(f"{n} {s}" for s, n in counts.items())
+          + f" — {(time.perf_counter() - start) * 1000:.0f} ms")
+    failed = counts.get("failed", 0) + counts.get("blocked", 0)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
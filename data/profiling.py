@@ -0,0 +1,206 @@
+"""
+Per-stage instrumentation for the pipeline entry points.
+
+Every main() takes --profile, which records for each named stage (download,
+parse, validate, sort, serialize, merge, ...):
+
+  - wall time and CPU time (process_time)
+  - peak RSS: the process high-water mark when the stage ended
+  - tracemalloc peak: the most Python memory traced at once during the stage
+
+and prints a table when the run ends. tracemalloc makes allocation-heavy
+stages (JSON serialization especially) several times slower, so
+`--profile time` skips it when the timings are what matter. --profile-dir DIR also writes the
+table as DIR/<prog>.stages.json and a cProfile dump per top-level stage as
+DIR/<prog>.<stage>.prof (view with `python3 -m pstats` or snakeviz).
+
+    profiler = Profiler.from_args(args, "build_salary_data")
+    with profiler.stage("parse"):
+        records = parse_data_file(path)
+    for record in profiler.iter("validate", iter_valid_records(records, counts)):
+        ...
+    profiler.finish()
+
+Stages nest: a stage opened inside another is shown indented under it, and
+the outer stage's figures include it. profiler.iter() times a streamed stage
+— the time spent producing items, including the generators it pulls from —
+so "validate" can be measured while "sort" consumes it. cProfile runs only
+on top-level stages, which cover their nested ones.
+
+Without --profile, Profiler() is disabled and stage() / iter() cost nothing.
+"""
+
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:          # Windows: no peak RSS
+    resource = None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def add_arguments(parser):
+    """Add --profile / --profile-dir to an argparse parser."""
+    parser.add_argument("--profile", nargs="?", const="all", choices=["all", "time"],
+                        help="report wall/CPU time, peak RSS and tracemalloc peak per stage; "
+                             "--profile time leaves out tracemalloc, which slows the run")
+    parser.add_argument("--profile-dir", metavar="DIR",
+                        help="with --profile (implied): write the stage table and a cProfile dump "
+                             "per stage to DIR")
+
+
+class _Stage:
+    __slots__ = ("name", "depth", "streamed", "wall", "cpu", "traced_peak", "rss_peak", "calls")
+
+    def __init__(self, name, depth, streamed):
+        self.name = name
+        self.depth = depth
+        self.streamed = streamed
+        self.wall = self.cpu = 0.0
+        self.traced_peak = 0
+        self.rss_peak = None
+        self.calls = 0
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "depth": self.depth,
+            "streamed": self.streamed,
+            "calls": self.calls,
+            "wall_s": round(self.wall, 4),
+            "cpu_s": round(self.cpu, 4),
+            "traced_peak_mb": round(self.traced_peak / (1024 * 1024), 2) if self.traced_peak else None,
+            "peak_rss_mb": self.rss_peak and round(self.rss_peak, 1),
+        }
+
+
+class Profiler:
+    """Named-stage timer and memory meter; a no-op unless enabled."""
+
+    def __init__(self, enabled=False, prog="", profile_dir=None, trace_memory=True):
+        self.enabled = enabled or profile_dir is not None
+        self.trace_memory = trace_memory
+        self.prog = prog
+        self.profile_dir = profile_dir
+        self.stages = {}         # (name, depth) -> _Stage, in first-entered order
+        self._stack = []         # open stages, innermost last
+        self._profiles = {}      # top-level stage name -> cProfile.Profile
+        self._started_tracing = False
+
+    @classmethod
+    def from_args(cls, args, prog):
+        mode = getattr(args, "profile", None)
+        return cls(mode is not None, prog, getattr(args, "profile_dir", None), mode != "time")
+
+    # -- measuring -----------------------------------------------------------
+
+    def _enter(self, name, streamed):
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            # Fold the peak so far into the open stages before resetting it for this one
+            peak = tracemalloc.get_traced_memory()[1]
+            for open_stage in self._stack:
+                open_stage.traced_peak = max(open_stage.traced_peak, peak)
+            tracemalloc.reset_peak()
+
+        key = (name, len(self._stack))
+        stage = self.stages.get(key)
+        if stage is None:
+            stage = self.stages[key] = _Stage(name, len(self._stack), streamed)
+        self._stack.append(stage)
+        return stage, time.perf_counter(), time.process_time()
+
+    def _exit(self, stage, wall_start, cpu_start):
+        stage.wall += time.perf_counter() - wall_start
+        stage.cpu += time.process_time() - cpu_start
+        stage.calls += 1
+        self._stack.pop()
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            stage.traced_peak = max(stage.traced_peak, peak)
+            if self._stack:
+                self._stack[-1].traced_peak = max(self._stack[-1].traced_peak, stage.traced_peak)
+            tracemalloc.reset_peak()
+        stage.rss_peak = peak_rss_mb()
+
+    @contextmanager
+    def _measure(self, name):
+        stage, wall_start, cpu_start = self._enter(name, streamed=False)
+        profile = None
+        if self.profile_dir and len(self._stack) == 1:
+            # A stage entered more than once accumulates into one profile
+            profile = self._profiles.setdefault(name, cProfile.Profile())
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            self._exit(stage, wall_start, cpu_start)
+
+    def stage(self, name):
+        """Context manager timing one named stage."""
+        return self._measure(name) if self.enabled else nullcontext()
+
+    def iter(self, name, iterable):
+        """Yield from iterable, charging the time spent producing each item to a stage."""
+        if not self.enabled:
+            return iterable
+        return self._iter(name, iterable)
+
+    def _iter(self, name, iterable):
+        iterator = iter(iterable)
+        while True:
+            stage, wall_start, cpu_start = self._enter(name, streamed=True)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._exit(stage, wall_start, cpu_start)
+            yield item
+
+    # -- reporting -----------------------------------------------------------
+
+    def report(self):
+        """Print the stage table."""
+        print(f"\n  Profile ({self.prog}):")
+        print(f"  {'stage':<24}{'wall':>10}{'cpu':>10}{'traced peak':>14}{'peak RSS':>11}")
+        for stage in self.stages.values():
+            label = "  " * stage.depth + stage.name + (" (streamed)" if stage.streamed else "")
+            rss = f"{stage.rss_peak:>9.0f}MB" if stage.rss_peak is not None else f"{'-':>11}"
+            traced = (f"{stage.traced_peak / (1024 * 1024):>12.1f}MB" if self.trace_memory
+                      else f"{'-':>14}")
+            print(f"  {label:<24}{stage.wall:>9.2f}s{stage.cpu:>9.2f}s{traced}{rss}")
+
+    def finish(self):
+        """Print the table (and write it under --profile-dir); stop tracing."""
+        if not self.enabled:
+            return
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self.report()
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            for name, profile in self._profiles.items():
+                profile.dump_stats(os.path.join(self.profile_dir, f"{self.prog}.{name}.prof"))
+            path = os.path.join(self.profile_dir, f"{self.prog}.stages.json")
+            with open(path, "w") as f:
+                json.dump([s.as_dict() for s in self.stages.values()], f, indent=2)
+            print(f"  Stage table and cProfile dumps: {self.profile_dir}")
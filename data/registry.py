@@ -0,0 +1,170 @@
+"""
+Indexed registry of the occupation and metro dimensions.
+
+OCCUPATIONS, US_METROS, CA_METROS and CA_WAGE_FACTOR are defined in
+generate_full_data.py, which is large and pulls in numpy. Scripts that only
+need the dimensions import them from here instead:
+
+    from registry import OCCUPATIONS, US_METROS      # same tuples, loaded lazily
+
+    reg = registry.load()
+    reg.occupation("software-developers")           # O(1) by slug
+    reg.occupations_by_soc("15-1252")               # O(1) by SOC code
+    reg.metro_by_code("35620")                      # O(1) by CBSA (or CA) code
+    reg.soc_group("15-12")                          # by SOC major/minor/broad prefix
+
+The dimensions are cached as compact JSON in registry_cache.json, keyed on
+the size and mtime of generate_full_data.py; only a cache miss imports the
+generator module. Indexes are built on first use.
+"""
+
+import json
+import os
+from functools import cached_property
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_FILE = os.path.join(DATA_DIR, "generate_full_data.py")
+CACHE_FILE = os.path.join(DATA_DIR, "registry_cache.json")
+CACHE_VERSION = 1
+
+# SOC code "15-1252": major group "15", minor "15-1", broad "15-125"
+SOC_PREFIXES = {"major": 2, "minor": 4, "broad": 6}
+
+_EXPORTS = ("OCCUPATIONS", "US_METROS", "CA_METROS", "CA_WAGE_FACTOR")
+
+_registry = None
+
+
+def soc_prefixes(soc_code):
+    """(major, minor, broad) prefixes of a SOC code."""
+    return tuple(soc_code[:n] for n in SOC_PREFIXES.values())
+
+
+class Registry:
+    """Occupation and metro tuples with lazily built lookup indexes."""
+
+    def __init__(self, occupations, us_metros, ca_metros, ca_wage_factor):
+        self.occupations = occupations
+        self.us_metros = us_metros
+        self.ca_metros = ca_metros
+        self.ca_wage_factor = ca_wage_factor
+
+    @cached_property
+    def _occ_by_slug(self):
+        return {o[0]: o for o in self.occupations}
+
+    @cached_property
+    def _occ_by_soc(self):
+        index = {}
+        for o in self.occupations:
+            index.setdefault(o[1], []).append(o)
+        return index
+
+    @cached_property
+    def _occ_by_group(self):
+        index = {}
+        for o in self.occupations:
+            for prefix in soc_prefixes(o[1]):
+                index.setdefault(prefix, []).append(o)
+        return index
+
+    @cached_property
+    def _metro_by_slug(self):
+        return {m[0]: m for m in self.us_metros + self.ca_metros}
+
+    @cached_property
+    def _metro_by_code(self):
+        return {m[1]: m for m in self.us_metros + self.ca_metros}
+
+    def occupation(self, slug):
+        """Occupation tuple for a slug, or None."""
+        return self._occ_by_slug.get(slug)
+
+    def occupations_by_soc(self, soc_code):
+        """Every occupation tuple with this SOC code (several slugs can share one)."""
+        return self._occ_by_soc.get(soc_code, [])
+
+    def soc_group(self, prefix):
+        """Occupation tuples under a SOC major ("15"), minor ("15-1") or broad ("15-125") prefix."""
+        return self._occ_by_group.get(prefix, [])
+
+    def metro(self, slug):
+        """US or Canadian metro tuple for a slug, or None."""
+        return self._metro_by_slug.get(slug)
+
+    def metro_by_code(self, code):
+        """Metro tuple for a CBSA code (or Canadian city code), or None."""
+        return self._metro_by_code.get(code)
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+def _source_key():
+    st = os.stat(SOURCE_FILE)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read_cache():
+    try:
+        with open(CACHE_FILE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get("version") != CACHE_VERSION or cache.get("source") != _source_key():
+        return None
+    return cache
+
+
+def _write_cache(reg):
+    cache = {
+        "version": CACHE_VERSION,
+        "source": _source_key(),
+        "occupations": reg.occupations,
+        "us_metros": reg.us_metros,
+        "ca_metros": reg.ca_metros,
+        "ca_wage_factor": reg.ca_wage_factor,
+    }
+    tmp_path = CACHE_FILE + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f, separators=(",", ":"))
+        os.replace(tmp_path, CACHE_FILE)
+    except OSError:
+        pass  # read-only checkout: the registry still works, just uncached
+
+
+def load(refresh=False):
+    """The shared Registry, from the cache when it matches generate_full_data.py."""
+    global _registry
+    if _registry is not None and not refresh:
+        return _registry
+
+    cache = None if refresh else _read_cache()
+    if cache is not None:
+        _registry = Registry(
+            [tuple(o) for o in cache["occupations"]],
+            [tuple(m) for m in cache["us_metros"]],
+            [tuple(m) for m in cache["ca_metros"]],
+            cache["ca_wage_factor"],
+        )
+    else:
+        import generate_full_data as gfd
+        _registry = Registry(list(gfd.OCCUPATIONS), list(gfd.US_METROS), list(gfd.CA_METROS),
+                             gfd.CA_WAGE_FACTOR)
+        _write_cache(_registry)
+    return _registry
+
+
+def __getattr__(name):
+    # `from registry import OCCUPATIONS` loads the registry on first access
+    if name in _EXPORTS:
+        reg = load()
+        return {
+            "OCCUPATIONS": reg.occupations,
+            "US_METROS": reg.us_metros,
+            "CA_METROS": reg.ca_metros,
+            "CA_WAGE_FACTOR": reg.ca_wage_factor,
+        }[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
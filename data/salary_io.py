@@ -0,0 +1,606 @@
+"""
+Streaming record I/O shared by the salary data generators.
+
+write_records() writes records as they are produced instead of building one
+big list for json.dump(). Sorting uses an external merge sort: records are
+buffered in fixed-size runs, each run is sorted and spilled to a temporary
+NDJSON file, and the runs are k-way merged into the output. Peak memory is
+one run, whatever the record count.
+
+Three output formats:
+  - json        a JSON array laid out exactly like json.dump(records, f, indent=2)
+  - ndjson      one compact JSON object per line, for streaming consumers
+  - normalized  metro and occupation dimension tables written once, plus one
+                compact integer fact row per record (see NormalizedWriter)
+
+Every written record gets a canonical city_slug column, and write_records()
+can emit a companion lookup index (salary_index.json) mapping page slugs,
+occupation slugs and city slugs to record positions, so the Next.js app can
+answer page lookups without scanning the data.
+
+It can also write sharded outputs: one small JSON file per city slug and per
+occupation slug plus a manifest, so a page only parses the records it shows,
+and a memory-mapped columnar store (salary_data.bin, see salary_store.py)
+that Python consumers can open without parsing any JSON.
+"""
+
+import heapq
+import json
+import os
+import re
+import shutil
+import tempfile
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+from profiling import Profiler
+from salary_store import SalaryStore, StoreWriter
+
+RUN_SIZE = 50000          # records held in memory per sorted run
+READ_CHUNK = 1 << 20      # bytes per read when streaming a JSON array
+
+FORMATS = {
+    "json": ".json",
+    "ndjson": ".ndjson",
+    "normalized": ".normalized.json",
+}
+NORMALIZED_VERSION = 1
+
+# Fields that live in the dimension tables of the normalized format
+METRO_FIELDS = ["area_code", "area_name", "city_short", "state", "country", "currency", "city_slug"]
+OCC_FIELDS = ["occ_code", "occ_name", "occ_slug"]
+
+STORE_EXT = ".bin"
+
+INDEX_FILE = "salary_index.json"
+INDEX_VERSION = 1
+
+SHARD_DIR = "shards"
+SHARD_MANIFEST = "manifest.json"
+SHARD_VERSION = 1
+SHARD_KINDS = {
+    "cities": "city_slug",
+    "occupations": "occ_slug",
+}
+
+WriteResult = namedtuple("WriteResult", ["path", "count", "head", "tail"])
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Value types of a flat record (see _indented)
+_FLAT_TYPES = frozenset([str, int, float, bool, type(None)])
+
+
+def median_desc(record):
+    """Default sort key: highest median first (ties keep input order)."""
+    return -record["median_annual"]
+
+
+def output_path(output_dir, fmt="json", basename="salary_data"):
+    """Path of the main data file for an output format."""
+    return os.path.join(output_dir, basename + FORMATS[fmt])
+
+
+def store_path(output_dir, basename="salary_data"):
+    """Path of the columnar store written alongside the data file."""
+    return os.path.join(output_dir, basename + STORE_EXT)
+
+
+def file_identity(path):
+    """Name, size and mtime of a data file, as recorded in its store's header."""
+    st = os.stat(path)
+    return {"file": os.path.basename(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def source_path(output_dir, fmt="json", basename="salary_data"):
+    """
+    Best file to read existing records from: the columnar store if it was
+    written with the data file as it is now (see file_identity), otherwise
+    the data file itself.
+    """
+    data = output_path(output_dir, fmt, basename)
+    store = store_path(output_dir, basename)
+    if os.path.exists(store) and os.path.exists(data):
+        try:
+            with SalaryStore(store) as s:
+                if s.source == file_identity(data):
+                    return store
+        except ValueError:
+            pass
+    return data
+
+
+def index_path(output_dir):
+    """Path of the lookup index written alongside the data file."""
+    return os.path.join(output_dir, INDEX_FILE)
+
+
+def shard_dir(output_dir):
+    """Directory holding the per-city / per-occupation shards."""
+    return os.path.join(output_dir, SHARD_DIR)
+
+
+def city_slug(city_short):
+    """URL slug for a city — same rule as the frontend: lowercase, whitespace runs to '-'."""
+    return _WHITESPACE.sub("-", city_short.lower())
+
+
+def slugify(name):
+    """Convert an occupation name to a URL-friendly slug."""
+    return (
+        name.lower()
+        .replace(",", "")
+        .replace("'", "")
+        .replace("(", "")
+        .replace(")", "")
+        .replace("/", "-")
+        .replace("&", "and")
+        .replace("  ", " ")
+        .strip()
+        .replace(" ", "-")
+    )
+
+
+def page_slug(record):
+    """Salary page slug, e.g. "software-developers-in-new-york"."""
+    return f"{record['occ_slug']}-in-{record['city_slug']}"
+
+
+class RecordIndex:
+    """Record positions keyed by page slug, occupation slug and city slug."""
+
+    def __init__(self):
+        self.slugs = {}
+        self.occupations = {}
+        self.cities = {}
+
+    def add(self, position, record):
+        # A duplicate page slug keeps its first record, as data.find() did
+        self.slugs.setdefault(page_slug(record), position)
+        self.occupations.setdefault(record["occ_slug"], []).append(position)
+        self.cities.setdefault(record["city_slug"], []).append(position)
+
+    def write(self, path, count):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            # dumps, not dump: json.dump() always takes the pure-Python encoder
+            f.write(json.dumps({
+                "version": INDEX_VERSION,
+                "count": count,
+                "slugs": self.slugs,
+                "occupations": self.occupations,
+                "cities": self.cities,
+            }, separators=(",", ":")))
+        os.replace(tmp_path, path)
+
+
+class RecordStats:
+    """Summary counters collected while records stream past (O(dimensions) memory)."""
+
+    def __init__(self):
+        self.by_country = Counter()
+        self.occupations = set()
+        self.cities = {}
+
+    def track(self, records):
+        """Pass records through unchanged, counting them on the way."""
+        for record in records:
+            country = record["country"]
+            self.by_country[country] += 1
+            self.occupations.add(record["occ_slug"])
+            self.cities.setdefault(country, set()).add(record["city_short"])
+            yield record
+
+
+# =============================================================================
+# EXTERNAL MERGE SORT
+# =============================================================================
+
+def _spill_run(chunk, key, tmp_dir):
+    chunk.sort(key=key)
+    fd, path = tempfile.mkstemp(prefix="run-", suffix=".ndjson", dir=tmp_dir)
+    with os.fdopen(fd, "w") as f:
+        for record in chunk:
+            f.write(json.dumps(record, separators=(",", ":")))
+            f.write("\n")
+    return path
+
+
+def _read_run(path):
+    with open(path) as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def spill_runs(records, key=median_desc, run_size=RUN_SIZE, work_dir=None):
+    """
+    First phase of the external sort: consume records, writing each run_size
+    chunk sorted to a file in work_dir. Returns (run paths, sorted remainder);
+    if everything fit in one chunk there are no runs and nothing touched disk.
+    """
+    runs = []
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= run_size:
+            runs.append(_spill_run(chunk, key, work_dir))
+            chunk = []
+
+    if not runs:
+        chunk.sort(key=key)
+        return runs, chunk
+
+    if chunk:
+        runs.append(_spill_run(chunk, key, work_dir))
+    return runs, []
+
+
+def merge_runs(runs, key=median_desc):
+    """Second phase: yield the records of sorted runs in key order."""
+    return heapq.merge(*(_read_run(p) for p in runs), key=key)
+
+
+def external_sort(records, key=median_desc, run_size=RUN_SIZE, tmp_dir=None):
+    """
+    Yield records sorted by key, holding at most run_size of them in memory.
+
+    The sort is stable: heapq.merge breaks ties by run order, and runs are
+    spilled in input order.
+    """
+    work_dir = tempfile.mkdtemp(prefix="salary-sort-", dir=tmp_dir)
+    try:
+        runs, chunk = spill_runs(records, key, run_size, work_dir)
+        if not runs:
+            yield from chunk
+            return
+        yield from merge_runs(runs, key)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# =============================================================================
+# SHARDS
+# =============================================================================
+
+class ShardPartitioner:
+    """
+    Split a record stream into per-city and per-occupation shards.
+
+    Records are buffered per shard and appended to temporary NDJSON files
+    whenever run_size records are pending, so memory stays bounded and no more
+    than one file is open at a time. finish() converts the partitions into
+    compact JSON arrays in parallel and swaps the new shard directory in.
+    """
+
+    def __init__(self, out_dir, run_size=RUN_SIZE):
+        self.out_dir = out_dir
+        self.run_size = run_size
+        self.work_dir = tempfile.mkdtemp(prefix="salary-shards-", dir=os.path.dirname(out_dir))
+        self.pending = {}
+        self.n_pending = 0
+        self.counts = Counter()
+
+    def add(self, record):
+        for kind, field in SHARD_KINDS.items():
+            key = (kind, record[field])
+            self.pending.setdefault(key, []).append(json.dumps(record, separators=(",", ":")))
+            self.counts[key] += 1
+            self.n_pending += 1
+        if self.n_pending >= self.run_size:
+            self._flush()
+
+    def _partition_path(self, kind, slug):
+        return os.path.join(self.work_dir, f"{kind}--{slug}.ndjson")
+
+    def _flush(self):
+        for (kind, slug), lines in self.pending.items():
+            with open(self._partition_path(kind, slug), "a") as f:
+                f.write("\n".join(lines))
+                f.write("\n")
+        self.pending = {}
+        self.n_pending = 0
+
+    def finish(self, workers=None):
+        """
+        Write every shard plus the manifest; returns the manifest dict. Shards
+        are written in up to `workers` processes (default: one per CPU), or
+        in this process when that is one.
+        """
+        self._flush()
+        build_dir = os.path.join(self.work_dir, "out")
+        for kind in SHARD_KINDS:
+            os.makedirs(os.path.join(build_dir, kind), exist_ok=True)
+
+        manifest = {"version": SHARD_VERSION}
+        jobs = []
+        for kind in SHARD_KINDS:
+            manifest[kind] = {}
+            for (k, slug), count in sorted(self.counts.items()):
+                if k != kind:
+                    continue
+                rel_path = f"{kind}/{slug}.json"
+                manifest[kind][slug] = {"file": rel_path, "records": count}
+                jobs.append((self._partition_path(kind, slug), os.path.join(build_dir, rel_path)))
+
+        try:
+            if (workers or os.cpu_count() or 1) <= 1 or len(jobs) <= 1:
+                for partition_path, out_path in jobs:
+                    _write_shard(partition_path, out_path)
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    list(pool.map(_write_shard, *zip(*jobs), chunksize=16))
+
+            with open(os.path.join(build_dir, SHARD_MANIFEST), "w") as f:
+                json.dump(manifest, f, indent=2)
+
+            # Swap the finished directory in, dropping shards for removed slugs
+            if os.path.exists(self.out_dir):
+                shutil.rmtree(self.out_dir)
+            os.replace(build_dir, self.out_dir)
+        finally:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        return manifest
+
+
+def _write_shard(partition_path, out_path):
+    """Worker task: NDJSON partition -> compact JSON array."""
+    with open(partition_path) as src, open(out_path, "w") as dst:
+        dst.write("[")
+        dst.write(",".join(line.rstrip("\n") for line in src))
+        dst.write("]")
+
+
+# =============================================================================
+# NORMALIZED FORMAT
+# =============================================================================
+
+class NormalizedWriter:
+    """
+    Write records as dimension tables plus integer fact rows.
+
+    Each distinct metro (METRO_FIELDS) and occupation (OCC_FIELDS) is stored
+    once; a fact row is [metro id, occupation id, *fact fields], where the
+    fact fields are every other field of the first record, in order. Facts
+    are streamed as they arrive and the dimensions written at the end:
+
+        {"version": 1, "fields": [...], "fact_fields": [...],
+         "facts": [[0,0,1234,...], ...],
+         "metros": [[area_code, area_name, ...], ...],
+         "occupations": [[occ_code, occ_name, occ_slug], ...]}
+
+    "fields" keeps the record's key order so load_normalized() can rebuild
+    identical dicts. A missing fact field is written as null and left out of
+    the rebuilt record.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.fields = None
+        self.fact_fields = None
+        self.metros = {}
+        self.occupations = {}
+        self.count = 0
+
+    def add(self, record):
+        if self.fields is None:
+            self.fields = list(record)
+            self.field_set = set(self.fields)
+            dims = set(METRO_FIELDS) | set(OCC_FIELDS)
+            self.fact_fields = [k for k in self.fields if k not in dims]
+            self.f.write('{"version":%d,"fields":%s,"fact_fields":%s,"facts":[' % (
+                NORMALIZED_VERSION,
+                json.dumps(self.fields, separators=(",", ":")),
+                json.dumps(self.fact_fields, separators=(",", ":"))))
+        elif len(record) > len(self.fields) or any(k not in self.field_set for k in record):
+            raise ValueError("normalized output: record has fields the first record didn't")
+
+        metro = tuple(record.get(k) for k in METRO_FIELDS)
+        metro_id = self.metros.setdefault(metro, len(self.metros))
+        occ = tuple(record.get(k) for k in OCC_FIELDS)
+        occ_id = self.occupations.setdefault(occ, len(self.occupations))
+
+        fact = [metro_id, occ_id] + [record.get(k) for k in self.fact_fields]
+        self.f.write(",\n" if self.count else "\n")
+        self.f.write(json.dumps(fact, separators=(",", ":")))
+        self.count += 1
+
+    def finish(self):
+        if self.fields is None:
+            self.f.write('{"version":%d,"fields":[],"fact_fields":[],"facts":[' % NORMALIZED_VERSION)
+        self.f.write('\n],"metros":')
+        json.dump([list(m) for m in self.metros], self.f, separators=(",", ":"))
+        self.f.write(',\n"occupations":')
+        json.dump([list(o) for o in self.occupations], self.f, separators=(",", ":"))
+        self.f.write("}\n")
+
+
+def load_normalized(path):
+    """Load a normalized file and rebuild the full record dicts."""
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("version") != NORMALIZED_VERSION:
+        raise ValueError(f"{path}: normalized version {data.get('version')}, expected {NORMALIZED_VERSION}")
+
+    fields = data["fields"]
+    fact_fields = data["fact_fields"]
+    # A fact row widened with its dimensions is metro + occupation + facts;
+    # pick the record's fields out of it in the original key order
+    combined = METRO_FIELDS + OCC_FIELDS + fact_fields
+    pick = itemgetter(*(combined.index(k) for k in fields)) if fields else None
+    metros = [tuple(m) for m in data["metros"]]
+    occupations = [tuple(o) for o in data["occupations"]]
+
+    records = []
+    for fact in data["facts"]:
+        values = pick(metros[fact[0]] + occupations[fact[1]] + tuple(fact[2:]))
+        if len(fields) == 1:
+            values = (values,)
+        if None in values:
+            records.append({k: v for k, v in zip(fields, values) if v is not None})
+        else:
+            records.append(dict(zip(fields, values)))
+    return records
+
+
+# =============================================================================
+# WRITING
+# =============================================================================
+
+def write_records(records, path, fmt="json", key=median_desc, presorted=False,
+                  run_size=RUN_SIZE, head=10, tail=5, index_file=None, shards=None,
+                  workers=None, store_file=None, profiler=None):
+    """
+    Stream records to path, sorted by key unless presorted.
+
+    The file is written to path + ".tmp" and renamed into place, so readers
+    never see a half-written file and the input may be streamed from the file
+    being replaced. If index_file is given, a RecordIndex of the written
+    positions is saved there too; if shards is a directory, per-city and
+    per-occupation shards are written there (see ShardPartitioner), using up
+    to `workers` processes. Both are written for fmt "json" only: the app
+    pairs them with salary_data.json, so another format must not replace
+    them. If store_file is given, the records are also written there as a
+    columnar store (see salary_store.py) tagged with the data file's identity,
+    so source_path() only prefers it while it matches that file. Returns a
+    WriteResult with the record count and the first `head` / last `tail`
+    records for summary printing.
+
+    With a profiler (see profiling.py), consuming and sorting the input is
+    timed as stage "sort" and merging and writing as "serialize".
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown output format: {fmt}")
+    if fmt != "json":
+        index_file = shards = None
+    profiler = profiler or Profiler()
+
+    work_dir = None
+    try:
+        if not presorted:
+            work_dir = tempfile.mkdtemp(prefix="salary-sort-", dir=os.path.dirname(os.path.abspath(path)))
+            with profiler.stage("sort"):
+                runs, chunk = spill_runs(records, key, run_size, work_dir)
+            records = merge_runs(runs, key) if runs else chunk
+        with profiler.stage("serialize"):
+            return _write_sorted(records, path, fmt, head, tail, index_file, shards, workers,
+                                 store_file, run_size)
+    finally:
+        if work_dir is not None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _indented(record):
+    """
+    json.dumps(record, indent=2), one level deeper (an element of an indented
+    array). indent= makes json use its pure-Python encoder; a flat record gets
+    the same text from the C encoder, with the line breaks as separators.
+    """
+    if not record or not _FLAT_TYPES.issuperset(map(type, record.values())):
+        return json.dumps(record, indent=2).replace("\n", "\n  ")
+    return "{\n    " + json.dumps(record, separators=(",\n    ", ": "))[1:-1] + "\n  }"
+
+
+def _write_sorted(records, path, fmt, head, tail, index_file, shards, workers, store_file, run_size):
+    first = []
+    last = deque(maxlen=tail)
+    count = 0
+    tmp_path = path + ".tmp"
+    index = RecordIndex() if index_file else None
+    partitioner = ShardPartitioner(shards, run_size) if shards else None
+    store = StoreWriter(store_file) if store_file else None
+
+    with open(tmp_path, "w") as f:
+        normalized = NormalizedWriter(f) if fmt == "normalized" else None
+        if fmt == "json":
+            f.write("[")
+        for record in records:
+            record["city_slug"] = city_slug(record["city_short"])
+            if index is not None:
+                index.add(count, record)
+            if partitioner is not None:
+                partitioner.add(record)
+            if store is not None:
+                store.add(record)
+            if fmt == "json":
+                # Same layout json.dump(..., indent=2) gives a list of dicts
+                f.write(",\n  " if count else "\n  ")
+                f.write(_indented(record))
+            elif normalized is not None:
+                normalized.add(record)
+            else:
+                f.write(json.dumps(record, separators=(",", ":")))
+                f.write("\n")
+            count += 1
+            if len(first) < head:
+                first.append(record)
+            last.append(record)
+        if fmt == "json":
+            f.write("\n]" if count else "]")
+        elif normalized is not None:
+            normalized.finish()
+
+    os.replace(tmp_path, path)
+    if index is not None:
+        index.write(index_file, count)
+    if partitioner is not None:
+        partitioner.finish(workers)
+    if store is not None:
+        store.finish(source=file_identity(path))
+    return WriteResult(path, count, first, list(last))
+
+
+# =============================================================================
+# READING
+# =============================================================================
+
+def read_records(path):
+    """
+    Yield records from a JSON array, NDJSON file, normalized file or
+    columnar store.
+
+    JSON arrays are decoded object by object with raw_decode over a sliding
+    buffer, so memory stays proportional to one record. Normalized files are
+    small enough to load whole (see load_normalized).
+    """
+    if path.endswith(FORMATS["normalized"]):
+        yield from load_normalized(path)
+        return
+
+    if path.endswith(STORE_EXT):
+        with SalaryStore(path) as store:
+            yield from store
+        return
+
+    if path.endswith(FORMATS["ndjson"]):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    decoder = json.JSONDecoder()
+    skip = " \t\r\n,"
+    with open(path) as f:
+        buf = f.read(READ_CHUNK).lstrip()
+        if not buf.startswith("["):
+            raise ValueError(f"{path}: expected a JSON array")
+        pos = 1
+        eof = False
+        while True:
+            while pos < len(buf) and buf[pos] in skip:
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                record, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError(f"{path}: truncated or malformed JSON array")
+                # Record spans the buffer boundary: drop consumed text, read more
+                more = f.read(READ_CHUNK)
+                eof = not more
+                buf = buf[pos:] + more
+                pos = 0
+                continue
+            yield record
@@ -0,0 +1,414 @@
+"""
+Memory-mapped columnar binary format for salary records.
+
+salary_data.bin holds the same records as salary_data.json, one column per
+field:
+  - integer fields   fixed-width little-endian int32 (int64 if a value needs it)
+  - float fields     little-endian float64
+  - string fields    dictionary-encoded: int32 codes into a value table
+
+Layout:
+
+    MAGIC (8 bytes) | version u32 | header length u32 | header JSON | pad to 8
+    column data, each column 8-byte aligned
+
+The header lists the field order, row count, each column's type, offset and
+dictionary, and a lookup permutation sorting rows by (occ_slug, city_slug).
+A store written alongside a data file also records that file's name, size
+and mtime ("source"), so readers can tell whether it still mirrors it.
+Its size depends on the dictionaries, not the row count, so opening a store
+costs the same at 40k rows or 4M.
+
+SalaryStore maps the file read-only. column() returns a memoryview straight
+into the mapping (no copy; np.asarray() on it is zero-copy too), row() builds
+one record dict on demand, and find() answers (occupation, city) lookups by
+binary search over the permutation.
+
+Missing values (a record without a field other records have) are stored as
+a sentinel — INT32_MIN / INT64_MIN, NaN, or code -1 — and left out of the
+rebuilt record.
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"SLSTORE\x00"
+STORE_VERSION = 1
+PREAMBLE = struct.Struct("<8sII")     # magic, version, header length
+ALIGN = 8
+
+LOOKUP_KEY = ("occ_slug", "city_slug")
+
+# column type -> (array typecode, null sentinel)
+COLUMN_TYPES = {
+    "i4": ("i", -(1 << 31)),
+    "i8": ("q", -(1 << 63)),
+    "f8": ("d", math.nan),
+    "dict": ("i", -1),
+}
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _padding(size):
+    return -size % ALIGN
+
+
+def _to_le(values):
+    """Return an array in little-endian byte order (a copy on big-endian hosts)."""
+    if not _LITTLE_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+# =============================================================================
+# WRITING
+# =============================================================================
+
+class Column:
+    """
+    One column of values held in a compact array.
+
+    String columns are dictionary-encoded: `data` holds int32 codes and
+    `strings` the distinct values, so each string is stored once however
+    many rows use it. Number columns start as int32 and widen in place — to
+    int64 when a value needs it, to float64 on the first non-integer — so
+    `data` is always in its final store type. Missing values are the null
+    sentinels in COLUMN_TYPES.
+    """
+
+    __slots__ = ("kind", "nulls", "data", "codes", "strings")
+
+    def __init__(self, kind, backfill=0):
+        self.kind = kind                          # "dict" or "num"
+        self.nulls = backfill > 0
+        self.data = array("i", [COLUMN_TYPES["i4"][1] if kind == "num" else -1]) * backfill
+        if kind == "dict":
+            self.codes = {}
+            self.strings = []
+        else:
+            self.codes = self.strings = None
+
+    @classmethod
+    def for_value(cls, value, backfill=0):
+        return cls("dict" if isinstance(value, str) else "num", backfill)
+
+    @property
+    def col_type(self):
+        return "dict" if self.kind == "dict" else _TYPE_OF[self.data.typecode]
+
+    def _widen(self, col_type):
+        old_null = COLUMN_TYPES[self.col_type][1]
+        typecode, null = COLUMN_TYPES[col_type]
+        convert = float if col_type == "f8" else int
+        self.data = array(typecode, (null if v == old_null else convert(v) for v in self.data))
+
+    def _encode_value(self, value, name):
+        if value is None:
+            self.nulls = True
+            return COLUMN_TYPES[self.col_type][1]
+        if self.kind == "dict":
+            if not isinstance(value, str):
+                raise ValueError(f"{name}: expected a string, got {value!r}")
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.strings)
+                self.strings.append(value)
+            return code
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{name}: expected a number, got {value!r}")
+        typecode = self.data.typecode
+        if isinstance(value, float):
+            if typecode != "d":
+                self._widen("f8")
+        elif typecode == "i" and not _I4_MIN < value <= _I4_MAX:
+            self._widen("i8")
+        return value
+
+    def append(self, value, name=""):
+        # Fast paths for the common cases: a string already in the dictionary,
+        # a number the array already holds as it is
+        value_type = type(value)
+        if self.kind == "dict":
+            if value_type is str:
+                code = self.codes.get(value)
+                if code is not None:
+                    self.data.append(code)
+                    return
+        elif value_type is int:
+            if self.data.typecode != "i" or _I4_MIN < value <= _I4_MAX:
+                self.data.append(value)
+                return
+        elif value_type is float and self.data.typecode == "d":
+            self.data.append(value)
+            return
+        raw = self._encode_value(value, name)   # may swap self.data for a wider array
+        self.data.append(raw)
+
+    def set(self, i, value, name=""):
+        raw = self._encode_value(value, name)
+        self.data[i] = raw
+
+    def get(self, i):
+        """Decoded value of row i; None if missing."""
+        raw = self.data[i]
+        if self.kind == "dict":
+            return None if raw < 0 else self.strings[raw]
+        if raw != raw or raw == COLUMN_TYPES[_TYPE_OF[self.data.typecode]][1]:
+            return None
+        return raw
+
+
+_TYPE_OF = {"i": "i4", "q": "i8", "d": "f8"}
+_I4_MIN, _I4_MAX = COLUMN_TYPES["i4"][1], (1 << 31) - 1
+
+
+def lookup_permutation(columns, count):
+    """Rows sorted by LOOKUP_KEY codes, or None if the key columns are missing."""
+    if not all(k in columns and columns[k].kind == "dict" for k in LOOKUP_KEY):
+        return None
+    occ, city = (columns[k].data for k in LOOKUP_KEY)
+    return array("i", sorted(range(count), key=lambda i: (occ[i], city[i])))
+
+
+def write_columns(path, columns, count, source=None):
+    """
+    Write {name: Column} holding count rows as a store (temp file + rename).
+    source, if given, is saved in the header (see SalaryStore.source).
+    """
+    header = {
+        "version": STORE_VERSION,
+        "rows": count,
+        "fields": list(columns),
+        "columns": {},
+    }
+    if source is not None:
+        header["source"] = source
+    blobs = []
+    offset = 0
+
+    def place(values):
+        nonlocal offset
+        start = offset
+        blobs.append(_to_le(values))
+        offset += len(values) * values.itemsize
+        pad = _padding(offset)
+        if pad:
+            blobs.append(b"\0" * pad)
+            offset += pad
+        return start
+
+    for name, column in columns.items():
+        col_type = column.col_type
+        meta = {"type": col_type, "offset": place(column.data), "nulls": column.nulls}
+        if col_type == "dict":
+            meta["values"] = column.strings
+        header["columns"][name] = meta
+
+    lookup = lookup_permutation(columns, count)
+    if lookup is not None:
+        header["lookup"] = {"key": list(LOOKUP_KEY), "offset": place(lookup)}
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    header_bytes += b" " * _padding(PREAMBLE.size + len(header_bytes))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, STORE_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return path
+
+
+class StoreWriter:
+    """
+    Collect records column by column and write them as a store.
+
+    Columns follow the first record's field order; fields first seen later
+    are appended and back-filled with nulls. Memory is one fixed-width value
+    per field per row plus the string dictionaries.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.columns = {}
+        self.count = 0
+
+    def add(self, record):
+        for name in record:
+            if name not in self.columns:
+                self.columns[name] = Column.for_value(record[name], self.count)
+        for name, column in self.columns.items():
+            column.append(record.get(name), name)
+        self.count += 1
+
+    def finish(self, source=None):
+        """Write the store to path (via a temp file and rename); returns path."""
+        return write_columns(self.path, self.columns, self.count, source)
+
+
+def write_store(records, path):
+    """Write an iterable of records to a store; returns the row count."""
+    writer = StoreWriter(path)
+    for record in records:
+        writer.add(record)
+    writer.finish()
+    return writer.count
+
+
+# =============================================================================
+# READING
+# =============================================================================
+
+class SalaryStore:
+    """
+    Read-only, memory-mapped view of a salary store.
+
+        with SalaryStore(path) as store:
+            medians = store.column("median_annual")        # memoryview, zero-copy
+            i = store.find("software-developers", "new-york")
+            record = store.row(i)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mmap)
+        try:
+            magic, version, header_len = PREAMBLE.unpack_from(self._buf)
+        except struct.error:
+            self.close()
+            raise ValueError(f"{path}: not a salary store")
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not a salary store")
+        if version != STORE_VERSION:
+            self.close()
+            raise ValueError(f"{path}: store version {version}, expected {STORE_VERSION}")
+
+        header = json.loads(bytes(self._buf[PREAMBLE.size:PREAMBLE.size + header_len]))
+        self._data_start = PREAMBLE.size + header_len
+        self.rows = header["rows"]
+        self.fields = header["fields"]
+        self._meta = header["columns"]
+        self._lookup_meta = header.get("lookup")
+        # Identity of the data file written with the store, or None
+        self.source = header.get("source")
+        self._views = {}
+        self._codes = {}
+
+    def __len__(self):
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._views.clear()
+        self._buf.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # caller still holds a column view; the mapping closes with it
+
+    def _view(self, col_type, offset):
+        typecode = COLUMN_TYPES[col_type][0]
+        size = array(typecode).itemsize
+        start = self._data_start + offset
+        raw = self._buf[start:start + self.rows * size]
+        if _LITTLE_ENDIAN:
+            return raw.cast(typecode)
+        values = array(typecode, raw.tobytes())
+        values.byteswap()
+        return memoryview(values)
+
+    def column(self, name):
+        """Raw values (or dictionary codes) of one column, as a memoryview."""
+        view = self._views.get(name)
+        if view is None:
+            meta = self._meta[name]
+            view = self._views[name] = self._view(meta["type"], meta["offset"])
+        return view
+
+    def column_info(self, name):
+        """Header entry of a column: type, offset, nulls (and values for dict columns)."""
+        return self._meta[name]
+
+    def dictionary(self, name):
+        """Value table of a dictionary-encoded column (index = code)."""
+        return self._meta[name]["values"]
+
+    def code(self, name, value):
+        """Dictionary code of value in a string column, or None."""
+        codes = self._codes.get(name)
+        if codes is None:
+            codes = self._codes[name] = {v: i for i, v in enumerate(self.dictionary(name))}
+        return codes.get(value)
+
+    def value(self, name, i):
+        """Decoded value of one cell; None if the row has no value."""
+        meta = self._meta[name]
+        raw = self.column(name)[i]
+        if meta["type"] == "dict":
+            return None if raw < 0 else meta["values"][raw]
+        if meta["nulls"] and (raw != raw or raw == COLUMN_TYPES[meta["type"]][1]):
+            return None
+        return raw
+
+    def row(self, i):
+        """Rebuild record i as a dict in the original field order."""
+        if not -self.rows <= i < self.rows:
+            raise IndexError("store row out of range")
+        record = {}
+        for name in self.fields:
+            value = self.value(name, i)
+            if value is not None:
+                record[name] = value
+        return record
+
+    def __iter__(self):
+        for i in range(self.rows):
+            yield self.row(i)
+
+    def where(self, name, value):
+        """Row numbers whose string column `name` equals value, in file order."""
+        code = self.code(name, value)
+        if code is None:
+            return []
+        return [i for i, c in enumerate(self.column(name)) if c == code]
+
+    def find(self, occ_slug, city_slug):
+        """Row number of the (occupation, city) record, or None."""
+        if self._lookup_meta is None:
+            raise ValueError(f"{self.path}: store has no lookup permutation")
+        key = (self.code(LOOKUP_KEY[0], occ_slug), self.code(LOOKUP_KEY[1], city_slug))
+        if None in key:
+            return None
+        perm = self._views.get("__lookup__")
+        if perm is None:
+            perm = self._views["__lookup__"] = self._view("dict", self._lookup_meta["offset"])
+        occ, city = self.column(LOOKUP_KEY[0]), self.column(LOOKUP_KEY[1])
+
+        lo, hi = 0, self.rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            i = perm[mid]
+            if (occ[i], city[i]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.rows and (occ[perm[lo]], city[perm[lo]]) == key:
+            return perm[lo]
+        return None
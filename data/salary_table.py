@@ -0,0 +1,213 @@
+"""
+Compact in-memory table of salary records for the Python pipeline.
+
+A list of 16-key dicts costs about a kilobyte per record: a dict, a hash
+table, and a boxed int per salary field. SalaryTable keeps one array per
+field instead (see salary_store.Column): int32 / int64 / float64 numbers, and strings
+dictionary-encoded as int32 codes, so each metro or occupation name is held
+once however many rows repeat it. A row is 4-8 bytes per field.
+
+    table = SalaryTable()
+    row = table.append(record)
+    table.set(row, "median_annual", 98000)
+    row = table.lookup("35620", "software-developers")
+    table.sort("median_annual", reverse=True)
+    table.save("salary_data.bin")          # the columnar store format
+    table = SalaryTable.load("salary_data.bin")
+
+Rows are keyed by (area_code, occ_slug); append() of an existing key adds a
+second row (lookup() finds the last), put() replaces it. The key index is a
+dense grid of row numbers built on the first lookup. Iterating yields record
+dicts built on demand.
+"""
+
+from array import array
+
+from salary_store import COLUMN_TYPES, Column, SalaryStore, write_columns
+
+KEY_FIELDS = ("area_code", "occ_slug")
+
+
+def _capacity(n):
+    """Smallest power of two >= n (at least 16)."""
+    return max(16, 1 << (n - 1).bit_length()) if n > 0 else 16
+
+
+class SalaryTable:
+    """Column-oriented records with an (area_code, occ_slug) index."""
+
+    __slots__ = ("columns", "count", "_grid", "_stride", "_areas")
+
+    def __init__(self):
+        self.columns = {}
+        self.count = 0
+        self._grid = None      # key index, built on first lookup (see _reindex)
+        self._stride = self._areas = 0
+
+    def __len__(self):
+        return self.count
+
+    # -- building ------------------------------------------------------------
+
+    def _column(self, name, value):
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = Column.for_value(value, self.count)
+        return column
+
+    def _key_codes(self, area_code, occ_slug):
+        area_col, occ_col = (self.columns.get(k) for k in KEY_FIELDS)
+        if area_col is None or occ_col is None:
+            return None
+        area, occ = area_col.codes.get(area_code), occ_col.codes.get(occ_slug)
+        if area is None or occ is None:
+            return None
+        return area, occ
+
+    def append(self, record):
+        """Add a record (any mapping) as a new row; returns the row number."""
+        for name, value in record.items():
+            self._column(name, value)
+        for name, column in self.columns.items():
+            column.append(record.get(name), name)
+        row = self.count
+        self.count += 1
+        if self._grid is not None:
+            self._index_row(row)
+        return row
+
+    def put(self, record):
+        """Replace the row with the record's (area_code, occ_slug), or append it."""
+        row = self.lookup(record["area_code"], record["occ_slug"])
+        if row is None:
+            return self.append(record)
+        for name, value in record.items():
+            self._column(name, value)
+        for name, column in self.columns.items():
+            column.set(row, record.get(name), name)
+        return row
+
+    def set(self, row, name, value):
+        """Set one field of one row (adding the column if it is new)."""
+        if name in KEY_FIELDS:
+            raise ValueError(f"{name} is part of the row key; use put()")
+        self._column(name, value).set(row, value, name)
+
+    # -- reading -------------------------------------------------------------
+
+    def lookup(self, area_code, occ_slug):
+        """Row number for (area_code, occ_slug), or None."""
+        codes = self._key_codes(area_code, occ_slug)
+        if codes is None:
+            return None
+        if self._grid is None:
+            self._reindex()
+        area, occ = codes
+        if area >= self._areas or occ >= self._stride:
+            return None
+        row = self._grid[area * self._stride + occ]
+        return None if row < 0 else row
+
+    def get(self, row, name):
+        """One field of one row; None if missing."""
+        column = self.columns.get(name)
+        return None if column is None else column.get(row)
+
+    def row(self, i):
+        """Rebuild row i as a record dict (missing fields left out)."""
+        record = {}
+        for name, column in self.columns.items():
+            value = column.get(i)
+            if value is not None:
+                record[name] = value
+        return record
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.row(i)
+
+    # -- reordering ----------------------------------------------------------
+
+    def sort(self, name, reverse=False):
+        """Reorder rows by one column, stably; missing values rank lowest."""
+        column = self.columns[name]
+        data = column.data
+        if column.kind == "dict":
+            # Sort strings by value, not by dictionary code
+            strings = column.strings
+            rank = {code: r for r, code in enumerate(
+                sorted(range(len(strings)), key=strings.__getitem__))}
+            rank[-1] = -1
+            key = lambda i: rank[data[i]]
+        elif data.typecode == "d":
+            key = lambda i: float("-inf") if data[i] != data[i] else data[i]
+        else:
+            key = data.__getitem__
+        self.reorder(sorted(range(self.count), key=key, reverse=reverse))
+
+    def reorder(self, order):
+        """Permute rows: row i of the result is old row order[i]."""
+        for column in self.columns.values():
+            old = column.data
+            column.data = array(old.typecode, [old[i] for i in order])
+        self._grid = None
+
+    # -- key index -----------------------------------------------------------
+    #
+    # A dense int32 grid of row numbers, [area code * stride + occ code], -1
+    # for empty cells. Area and occupation dictionaries are small next to the
+    # row count (a full grid has one cell per row), so this is ~4 bytes a row
+    # where a dict of tuple keys costs ~100. Capacities double as new codes
+    # appear, so appends stay amortized O(1).
+
+    def _reindex(self, stride=0):
+        area_col, occ_col = (self.columns.get(k) for k in KEY_FIELDS)
+        n_areas = len(area_col.strings) if area_col else 0
+        n_occs = len(occ_col.strings) if occ_col else 0
+        self._stride = max(stride, _capacity(n_occs))
+        self._areas = _capacity(n_areas)
+        self._grid = array("i", [-1]) * (self._areas * self._stride)
+        if area_col and occ_col:
+            grid, stride = self._grid, self._stride
+            for row, (area, occ) in enumerate(zip(area_col.data, occ_col.data)):
+                if area >= 0 and occ >= 0:
+                    grid[area * stride + occ] = row
+
+    def _index_row(self, row):
+        area = self.columns[KEY_FIELDS[0]].data[row] if KEY_FIELDS[0] in self.columns else -1
+        occ = self.columns[KEY_FIELDS[1]].data[row] if KEY_FIELDS[1] in self.columns else -1
+        if area < 0 or occ < 0:
+            return
+        if occ >= self._stride:
+            self._reindex(_capacity(occ + 1))   # new stride: lay the grid out again
+            return
+        if area >= self._areas:
+            grow = _capacity(area + 1) - self._areas
+            self._grid.extend(array("i", [-1]) * (grow * self._stride))
+            self._areas += grow
+        self._grid[area * self._stride + occ] = row
+
+    # -- serialization -------------------------------------------------------
+
+    def save(self, path):
+        """Write the table as a columnar store (see salary_store.py)."""
+        return write_columns(path, self.columns, self.count)
+
+    @classmethod
+    def load(cls, path):
+        """Read a columnar store back into a table."""
+        table = cls()
+        with SalaryStore(path) as store:
+            table.count = len(store)
+            for name in store.fields:
+                meta = store.column_info(name)
+                values = store.column(name)
+                column = Column("dict" if meta["type"] == "dict" else "num")
+                column.nulls = meta["nulls"]
+                column.data = array(COLUMN_TYPES[meta["type"]][0], values)
+                if meta["type"] == "dict":
+                    column.strings = list(meta["values"])
+                    column.codes = {s: i for i, s in enumerate(column.strings)}
+                table.columns[name] = column
+                del values  # release the view so the mapping can close
+        return table
@@ -0,0 +1,215 @@
+"""
+What-if scenarios over the generated salary grid.
+
+A scenario overrides CA_WAGE_FACTOR and/or the col_factor of some metros and
+asks what the data would look like. Rather than rerunning
+generate_full_data.py per factor set, ScenarioEngine draws the per-record
+randomness once (hash seed mode, so every record's draws are independent of
+the factors), derives the baseline grid once, and for each scenario
+re-derives only the metro columns its overrides touch.
+
+Scenario files are a JSON list:
+
+    [
+      {"name": "ca-0.90", "ca_wage_factor": 0.90},
+      {"name": "west-coast", "col_factor": {"seattle": 1.35, "san-jose": 1.50}}
+    ]
+
+    python3 scenarios.py scenarios.json                 # summaries + diffs
+    python3 scenarios.py scenarios.json --full          # also full salary data per scenario
+
+Diffs (<out>/<name>.diff.json) list every changed record as
+[occ_slug, area_code, base median, new median, base mean, new mean];
+percentiles follow the median. --full writes each scenario as a complete
+salary_data.json, identical to generate_full_data.py --seed-mode hash run
+with the same factors. Requires numpy.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import generate_full_data as gfd
+from salary_io import write_records
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios")
+
+COUNTRIES = ("US", "CA")
+
+# A scenario name is one file name component: "ca-0.90", not "../x" or "a/b"
+SCENARIO_NAME = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9._-]*")
+
+
+class ScenarioEngine:
+    """Cached draws and baseline grids, with per-scenario column updates."""
+
+    def __init__(self, occupations=None, us_metros=None, ca_metros=None,
+                 ca_wage_factor=None):
+        self.occupations = occupations or gfd.OCCUPATIONS
+        self.metros = {"US": us_metros or gfd.US_METROS, "CA": ca_metros or gfd.CA_METROS}
+        self.ca_wage_factor = gfd.CA_WAGE_FACTOR if ca_wage_factor is None else ca_wage_factor
+        self.nat_median = np.array([o[3] for o in self.occupations], dtype=np.float64)
+
+        self.draws = {}
+        self.col_factor = {}
+        self.emp_mult = {}
+        self.baseline = {}
+        self.metro_column = {}
+        for country in COUNTRIES:
+            metros = self.metros[country]
+            self.draws[country] = gfd.grid_draws(self.occupations, metros, seed_mode="hash")
+            self.col_factor[country] = np.array([m[5] for m in metros], dtype=np.float64)
+            self.emp_mult[country] = np.array([m[6] for m in metros], dtype=np.float64)
+            self.baseline[country] = gfd.derive_grid(
+                self._base_median(country, self.ca_wage_factor), self.col_factor[country],
+                self.emp_mult[country], self.draws[country])
+            for j, m in enumerate(metros):
+                self.metro_column[m[0]] = (country, j)
+
+    def _base_median(self, country, ca_wage_factor):
+        return self.nat_median if country == "US" else self.nat_median * ca_wage_factor
+
+    def apply(self, scenario):
+        """
+        Grids for one scenario: {country: grid dict}, sharing the baseline
+        arrays for columns the overrides don't touch.
+        """
+        ca_factor = scenario.get("ca_wage_factor", self.ca_wage_factor)
+        overrides = {"US": {}, "CA": {}}
+        for slug, factor in scenario.get("col_factor", {}).items():
+            if slug not in self.metro_column:
+                raise ValueError(f"scenario {scenario.get('name')!r}: unknown metro {slug!r}")
+            country, j = self.metro_column[slug]
+            overrides[country][j] = factor
+
+        grids = {}
+        for country in COUNTRIES:
+            base = self.baseline[country]
+            if country == "CA" and ca_factor != self.ca_wage_factor:
+                cols = np.arange(len(self.metros[country]))      # every CA column moves
+            else:
+                cols = np.array(sorted(overrides[country]), dtype=np.intp)
+            if not len(cols):
+                grids[country] = base
+                continue
+
+            col_factor = self.col_factor[country][cols].copy()
+            for k, j in enumerate(cols.tolist()):
+                col_factor[k] = overrides[country].get(j, col_factor[k])
+            draws = tuple(d[:, cols] for d in self.draws[country])
+            updated = gfd.derive_grid(self._base_median(country, ca_factor), col_factor,
+                                      self.emp_mult[country][cols], draws)
+            grid = {}
+            for field, values in base.items():
+                grid[field] = values.copy()
+                grid[field][:, cols] = updated[field]
+            grids[country] = grid
+        return grids
+
+    def diff(self, grids):
+        """Changed records as [occ_slug, area_code, base median, new median, base mean, new mean]."""
+        rows = []
+        for country in COUNTRIES:
+            base, new = self.baseline[country], grids[country]
+            if new is base:
+                continue
+            changed = (base["median_annual"] != new["median_annual"]) | \
+                      (base["mean_annual"] != new["mean_annual"])
+            metros = self.metros[country]
+            for i, j in zip(*np.nonzero(changed)):
+                rows.append([
+                    self.occupations[i][0], metros[j][1],
+                    int(base["median_annual"][i, j]), int(new["median_annual"][i, j]),
+                    int(base["mean_annual"][i, j]), int(new["mean_annual"][i, j]),
+                ])
+        return rows
+
+    def summary(self, grids):
+        """Per-country record count and average median, baseline vs scenario."""
+        out = {}
+        for country in COUNTRIES:
+            base = self.baseline[country]["median_annual"]
+            new = grids[country]["median_annual"]
+            out[country] = {
+                "records": int(base.size),
+                "changed": int((base != new).sum()),
+                "avg_median_base": round(float(base.mean())),
+                "avg_median": round(float(new.mean())),
+                "avg_median_change_pct": round(float((new.mean() / base.mean() - 1) * 100), 2),
+            }
+        return out
+
+    def iter_records(self, grids):
+        """Every record of a scenario, US then Canada, like generate_full_data.py."""
+        for country in COUNTRIES:
+            yield from gfd.iter_grid_records(grids[country], self.occupations,
+                                             self.metros[country], country)
+
+
+def load_scenarios(path):
+    with open(path) as f:
+        scenarios = json.load(f)
+    names = [s.get("name") for s in scenarios]
+    if None in names or len(set(names)) != len(names):
+        raise ValueError(f"{path}: every scenario needs a unique name")
+    for name in names:
+        # Names become file names in the output directory
+        if not isinstance(name, str) or not SCENARIO_NAME.fullmatch(name) or name == "summary":
+            raise ValueError(f"{path}: scenario name {name!r} must be letters, digits, '.', '_' or '-', "
+                             f"not starting with '.' (and not 'summary')")
+    return scenarios
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate factor what-if scenarios against the baseline grid.")
+    parser.add_argument("scenarios", help="JSON list of scenarios")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="output directory (default: data/scenarios)")
+    parser.add_argument("--full", action="store_true",
+                        help="also write a full salary_data.json per scenario")
+    args = parser.parse_args(argv)
+
+    scenarios = load_scenarios(args.scenarios)
+
+    print("=" * 60)
+    print("  SalaryLens — Scenarios")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    engine = ScenarioEngine()
+    print(f"\n  Baseline grid: {time.perf_counter() - start:.2f} s")
+    os.makedirs(args.out, exist_ok=True)
+
+    start = time.perf_counter()
+    summaries = {}
+    for scenario in scenarios:
+        name = scenario["name"]
+        grids = engine.apply(scenario)
+        summaries[name] = engine.summary(grids)
+        with open(os.path.join(args.out, f"{name}.diff.json"), "w") as f:
+            json.dump({"scenario": scenario, "summary": summaries[name], "changes": engine.diff(grids)},
+                      f, separators=(",", ":"))
+        if args.full:
+            write_records(engine.iter_records(grids), os.path.join(args.out, f"{name}.json"),
+                          key=gfd.record_sort_key)
+    elapsed = time.perf_counter() - start
+
+    with open(os.path.join(args.out, "summary.json"), "w") as f:
+        json.dump(summaries, f, indent=2)
+
+    print(f"  Scenarios:     {len(scenarios)} in {elapsed:.2f} s\n")
+    for name, summary in summaries.items():
+        us, ca = summary["US"], summary["CA"]
+        print(f"  {name:<24} US {us['changed']:>6,} changed {us['avg_median_change_pct']:>+7.2f}%"
+              f"   CA {ca['changed']:>6,} changed {ca['avg_median_change_pct']:>+7.2f}%")
+    print(f"\n  Output: {args.out}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
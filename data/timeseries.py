@@ -0,0 +1,366 @@
+"""
+Multi-year salary time series, stored one columnar partition per year.
+
+generate_full_data.py writes a single snapshot. This script generates (or
+ingests) N years of records for every (occupation, metro) and writes each
+year as a salary store (see salary_store.py) under one directory:
+
+    timeseries/
+      manifest.json          years, row counts, where each year came from
+      year=2015.bin
+      ...
+      year=2024.bin
+
+Every partition has the same row layout — US then Canada, occupation-major
+over the registry grid — so year-over-year growth is a vectorized pass over
+aligned arrays: each partition carries employment_yoy_pct, median_yoy_pct
+and mean_yoy_pct (null for the first year, a missing cell, or a gap year).
+
+Generated history: the base year is the hash-mode snapshot itself
+(identical to generate_full_data.py --seed-mode hash). Earlier years deflate
+each occupation's national median and employment by per-(occupation, year)
+growth draws and redraw each record's ±3% median jitter, all from stable
+hashes, so any year regenerates the same way on its own.
+
+Ingested years: --ingest 2023=path/to/salary_data.json (any format
+read_records() accepts, e.g. a salary_data.json kept from that year's
+build_from_api.py pull) replaces that year's generated partition; records are placed by
+(occ_slug, area_code) and cells without a record are left null.
+
+Only one year's arrays (plus the previous year's, for YoY) are held at a
+time, so memory is flat in the number of years.
+
+    python3 timeseries.py                          # 10 years ending 2024
+    python3 timeseries.py --years 5 --base-year 2024
+    python3 timeseries.py --ingest 2023=../next-app/src/lib/salary_data.json
+
+    with SalaryStore("timeseries/year=2024.bin") as store:
+        record = store.row(store.find("software-developers", "new-york"))
+
+Requires numpy.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from array import array
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import generate_full_data as gfd
+from salary_io import city_slug, read_records
+from salary_store import COLUMN_TYPES, Column, SalaryStore, write_columns
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "timeseries")
+MANIFEST = "manifest.json"
+TIMESERIES_VERSION = 1
+
+BASE_YEAR = 2024
+YEARS = 10
+
+# Annual growth per occupation, drawn uniformly from these ranges
+WAGE_GROWTH = (0.01, 0.06)
+EMPLOYMENT_GROWTH = (-0.03, 0.05)
+
+NUMERIC_FIELDS = ("employment", "mean_annual", "median_annual",
+                  "pct10_annual", "pct25_annual", "pct75_annual", "pct90_annual")
+YOY_FIELDS = {"employment": "employment_yoy_pct",
+              "median_annual": "median_yoy_pct",
+              "mean_annual": "mean_yoy_pct"}
+
+_NULL = COLUMN_TYPES["i8"][1]
+
+
+PARTITION_NAME = re.compile(r"year=\d+\.bin")
+
+
+def partition_path(out_dir, year):
+    return os.path.join(out_dir, f"year={year}.bin")
+
+
+def year_seed(year, base_year=BASE_YEAR):
+    """Record-draw seed for a year; the base year uses the snapshot's SEED."""
+    return gfd.SEED + year - base_year
+
+
+# =============================================================================
+# GRID LAYOUT
+# =============================================================================
+
+def _dict_column(values, index):
+    """Dictionary column for values[index[i]] per row, from a per-item value list."""
+    column = Column("dict")
+    lut = np.empty(len(values), dtype=np.int32)
+    for k, value in enumerate(values):
+        code = column.codes.get(value)
+        if code is None:
+            code = column.codes[value] = len(column.strings)
+            column.strings.append(value)
+        lut[k] = code
+    column.data = array("i", lut[index].tobytes())
+    return column
+
+
+def _num_column(values):
+    """Number column from an int64 (null = INT64_MIN) or float64 (null = NaN) array."""
+    column = Column("num")
+    if values.dtype.kind == "f":
+        column.nulls = bool(np.isnan(values).any())
+        column.data = array("d", values.tobytes())
+        return column
+    present = values[values != _NULL]
+    column.nulls = present.size < values.size
+    if not present.size or (present.min() > COLUMN_TYPES["i4"][1] and present.max() < 1 << 31):
+        values = np.where(values == _NULL, COLUMN_TYPES["i4"][1], values).astype(np.int32)
+        column.data = array("i", values.tobytes())
+    else:
+        column.data = array("q", values.tobytes())
+    return column
+
+
+class GridLayout:
+    """
+    The row layout shared by every partition: for each country, every
+    occupation × metro cell, occupation-major. Dimension columns are built once
+    and reused for each year.
+    """
+
+    def __init__(self, occupations=None, us_metros=None, ca_metros=None):
+        self.occupations = occupations or gfd.OCCUPATIONS
+        self.countries = [("US", "USD", us_metros or gfd.US_METROS),
+                          ("CA", "CAD", ca_metros or gfd.CA_METROS)]
+        metros = [m for _, _, ms in self.countries for m in ms]
+        n_occ = len(self.occupations)
+
+        occ_index, metro_index, self.offsets = [], [], []
+        start = metro_start = 0
+        for _, _, ms in self.countries:
+            self.offsets.append(start)
+            occ_index.append(np.repeat(np.arange(n_occ), len(ms)))
+            metro_index.append(np.tile(np.arange(len(ms)) + metro_start, n_occ))
+            start += n_occ * len(ms)
+            metro_start += len(ms)
+        self.rows = start
+        occ_index = np.concatenate(occ_index)
+        metro_index = np.concatenate(metro_index)
+        country_of = [c for c, _, ms in self.countries for _ in ms]
+        currency_of = [cur for _, cur, ms in self.countries for _ in ms]
+
+        self.dimensions = {
+            "area_code": _dict_column([m[1] for m in metros], metro_index),
+            "area_name": _dict_column([m[2] for m in metros], metro_index),
+            "city_short": _dict_column([m[3] for m in metros], metro_index),
+            "state": _dict_column([m[4] for m in metros], metro_index),
+            "country": _dict_column(country_of, metro_index),
+            "currency": _dict_column(currency_of, metro_index),
+            "occ_code": _dict_column([o[1] for o in self.occupations], occ_index),
+            "occ_name": _dict_column([o[2] for o in self.occupations], occ_index),
+            "occ_slug": _dict_column([o[0] for o in self.occupations], occ_index),
+            "city_slug": _dict_column([city_slug(m[3]) for m in metros], metro_index),
+        }
+        self._row_of = None
+
+    def row_of(self, occ_slug, area_code):
+        """Row number of a cell, or None."""
+        if self._row_of is None:
+            occ = self.dimensions["occ_slug"]
+            area = self.dimensions["area_code"]
+            self._row_of = {(occ.strings[o], area.strings[a]): i
+                            for i, (o, a) in enumerate(zip(occ.data, area.data))}
+        return self._row_of.get((occ_slug, area_code))
+
+
+# =============================================================================
+# YEARS
+# =============================================================================
+
+def growth_rates(occupations, year, bounds=WAGE_GROWTH, kind="wage"):
+    """Growth from year - 1 to year for each occupation, drawn within bounds."""
+    u = gfd.hash_uniforms([o[0] for o in occupations], [f"{kind}:{year}"], 1)[0, :, 0]
+    lo, hi = bounds
+    return lo + (hi - lo) * u
+
+
+def generate_year(layout, year, base_year=BASE_YEAR):
+    """{field: int64 array over the layout's rows} for one generated year."""
+    occupations = layout.occupations
+    nat_median = np.array([o[3] for o in occupations], dtype=np.float64)
+    emp_index = np.ones(len(occupations))
+    for y in range(year + 1, base_year + 1):
+        nat_median = nat_median / (1 + growth_rates(occupations, y))
+        emp_index = emp_index / (1 + growth_rates(occupations, y, EMPLOYMENT_GROWTH, "employment"))
+
+    parts = {f: [] for f in NUMERIC_FIELDS}
+    for country, _, metros in layout.countries:
+        # Each record keeps its base-year mean ratio and employment level; only
+        # the ±3% median jitter is redrawn per year
+        jitter, mean_ratio, base_emp = gfd.grid_draws(occupations, metros, seed_mode="hash")
+        if year != base_year:
+            jitter = gfd.grid_draws(occupations, metros, seed_mode="hash",
+                                    seed=year_seed(year, base_year))[0]
+            base_emp = base_emp * emp_index[:, None]
+        base_median = nat_median if country == "US" else nat_median * gfd.CA_WAGE_FACTOR
+        grid = gfd.derive_grid(base_median,
+                               np.array([m[5] for m in metros], dtype=np.float64),
+                               np.array([m[6] for m in metros], dtype=np.float64),
+                               (jitter, mean_ratio, base_emp))
+        for f in NUMERIC_FIELDS:
+            parts[f].append(grid[f].ravel())
+    return {f: np.concatenate(v) for f, v in parts.items()}
+
+
+def ingest_year(layout, path):
+    """{field: int64 array} from a salary data file; returns (values, placed, skipped)."""
+    values = {f: np.full(layout.rows, _NULL, dtype=np.int64) for f in NUMERIC_FIELDS}
+    placed = skipped = 0
+    for record in read_records(path):
+        row = layout.row_of(record.get("occ_slug"), record.get("area_code"))
+        if row is None:
+            skipped += 1
+            continue
+        for f in NUMERIC_FIELDS:
+            if record.get(f) is not None:
+                values[f][row] = record[f]
+        placed += 1
+    return values, placed, skipped
+
+
+def yoy_pct(current, previous):
+    """Percent change per row, NaN where either side is missing or the base is 0."""
+    valid = (current != _NULL) & (previous != _NULL) & (previous != 0)
+    out = np.full(current.shape, np.nan)
+    np.divide(current - previous, previous, out=out, where=valid)
+    return np.round(out * 100, 2)
+
+
+def write_partition(layout, path, year, values, previous):
+    """Write one year's store; previous is last year's values (or None)."""
+    columns = {"year": _num_column(np.full(layout.rows, year, dtype=np.int64))}
+    columns.update(layout.dimensions)
+    for f in NUMERIC_FIELDS:
+        columns[f] = _num_column(values[f])
+    for f, name in YOY_FIELDS.items():
+        pct = yoy_pct(values[f], previous[f]) if previous is not None else np.full(layout.rows, np.nan)
+        columns[name] = _num_column(pct)
+    return write_columns(path, columns, layout.rows)
+
+
+def build(out_dir, years=YEARS, base_year=BASE_YEAR, ingest=None, report=None):
+    """
+    Write every partition and the manifest, then remove partitions of years
+    no longer in it (left by an earlier, longer run). ingest maps year ->
+    data file; report(year, source, seconds) is called after each partition.
+    """
+    ingest = ingest or {}
+    os.makedirs(out_dir, exist_ok=True)
+    layout = GridLayout()
+    all_years = sorted(set(range(base_year - years + 1, base_year + 1)) | set(ingest))
+
+    manifest = {"version": TIMESERIES_VERSION, "base_year": base_year, "rows": layout.rows,
+                "years": []}
+    previous, previous_year = None, None
+    for year in all_years:
+        start = time.perf_counter()
+        if year in ingest:
+            values, placed, skipped = ingest_year(layout, ingest[year])
+            source = {"ingested": ingest[year], "placed": placed, "skipped": skipped}
+        else:
+            values, source = generate_year(layout, year, base_year), {"generated": True}
+        prior = previous if previous_year == year - 1 else None
+        path = write_partition(layout, partition_path(out_dir, year), year, values, prior)
+        manifest["years"].append({"year": year, "file": os.path.basename(path), **source})
+        previous, previous_year = values, year
+        if report:
+            report(year, source, time.perf_counter() - start)
+
+    tmp_path = os.path.join(out_dir, MANIFEST + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST))
+
+    kept = {entry["file"] for entry in manifest["years"]}
+    for name in os.listdir(out_dir):
+        if PARTITION_NAME.fullmatch(name) and name not in kept:
+            os.remove(os.path.join(out_dir, name))
+    return manifest
+
+
+# =============================================================================
+# READING
+# =============================================================================
+
+def load_manifest(out_dir=OUTPUT_DIR):
+    with open(os.path.join(out_dir, MANIFEST)) as f:
+        return json.load(f)
+
+
+def series(occ_slug, city, out_dir=OUTPUT_DIR):
+    """[(year, record)] for one occupation in one city (by city slug), oldest first."""
+    result = []
+    for entry in load_manifest(out_dir)["years"]:
+        with SalaryStore(os.path.join(out_dir, entry["file"])) as store:
+            row = store.find(occ_slug, city)
+            if row is not None:
+                result.append((entry["year"], store.row(row)))
+    return result
+
+
+def parse_ingest(value):
+    """argparse type for --ingest: "YEAR=PATH" -> (year, path)."""
+    year, sep, path = value.partition("=")
+    if not sep or not year.isdigit() or not path:
+        raise argparse.ArgumentTypeError(f"expected YEAR=PATH, got {value!r}")
+    return int(year), path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a year-partitioned salary time series.")
+    parser.add_argument("--years", type=int, default=YEARS, help=f"years to generate (default: {YEARS})")
+    parser.add_argument("--base-year", type=int, default=BASE_YEAR,
+                        help=f"latest year, equal to the hash-mode snapshot (default: {BASE_YEAR})")
+    parser.add_argument("--ingest", action="append", type=parse_ingest, metavar="YEAR=PATH",
+                        help="use a salary data file for one year instead of generating it")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="output directory (default: data/timeseries)")
+    args = parser.parse_args(argv)
+    if args.years < 1:
+        parser.error(f"--years must be at least 1, got {args.years}")
+    ingest = dict(args.ingest or [])
+
+    print("=" * 60)
+    print("  SalaryLens — Time Series")
+    print("=" * 60)
+    print(f"\n  Years:   {args.base_year - args.years + 1}-{args.base_year}"
+          + (f" (+ ingested {', '.join(map(str, sorted(ingest)))})" if ingest else ""))
+    print(f"  Output:  {args.out}\n")
+
+    peaks = []
+
+    def report(year, source, seconds):
+        size = os.path.getsize(partition_path(args.out, year)) / (1024 * 1024)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()   # per-year peak: should stay flat as years are added
+        peak = peaks[-1] / (1024 * 1024)
+        how = f"ingested ({source['placed']:,} placed, {source['skipped']:,} skipped)" \
+            if "ingested" in source else "generated"
+        print(f"  {year}  {seconds * 1000:>7.0f} ms  {size:>6.2f} MB  peak {peak:>6.1f} MB  {how}")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    manifest = build(args.out, args.years, args.base_year, ingest, report)
+    elapsed = time.perf_counter() - start
+    peak = max(peaks + [tracemalloc.get_traced_memory()[1]])
+    tracemalloc.stop()
+
+    total_rows = manifest["rows"] * len(manifest["years"])
+    print(f"\n  ✓ {len(manifest['years'])} partitions, {total_rows:,} records in {elapsed:.2f} s")
+    print(f"  ✓ Peak traced memory {peak / (1024 * 1024):.1f} MB")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
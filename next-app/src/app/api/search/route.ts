@@ -1,10 +1,11 @@
 import { NextRequest, NextResponse } from "next/server";
 import {
-  getAllSalaryRecords,
-  getUniqueOccupations,
-  getUniqueCities,
+  getSalaryByOccupationAndCity,
+  getTopSalariesFor,
   formatSalary,
+  type SalaryRecord,
 } from "@/lib/data";
+import { searchDocs, searchPairs, searchTokens } from "@/lib/search";
 
 interface SearchResult {
   label: string;
@@ -16,57 +17,60 @@ interface SearchResult {
 export async function GET(request: NextRequest) {
   const query = request.nextUrl.searchParams.get("q")?.toLowerCase() || "";
 
-  if (query.length < 2) {
+  if (query.trim().length < 2) {
     return NextResponse.json([]);
   }
 
-  const results: SearchResult[] = [];
+  const tokens = searchTokens(query);
   const limit = 8;
+  const hits = searchDocs(tokens, limit);
 
-  // Search jobs first (highest priority)
-  const occupations = getUniqueOccupations();
-  for (const occ of occupations) {
-    if (results.length >= limit) break;
-    if (occ.name.toLowerCase().includes(query)) {
-      results.push({
-        label: occ.name,
-        sublabel: "View salary across all cities",
-        href: `/jobs/${occ.slug}`,
-        type: "job",
-      });
-    }
-  }
+  // Jobs first (highest priority), then cities
+  const results: SearchResult[] = hits.map((hit) =>
+    hit.type === "job"
+      ? {
+          label: hit.label,
+          sublabel: "View salary across all cities",
+          href: `/jobs/${hit.slug}`,
+          type: "job",
+        }
+      : {
+          label: hit.label,
+          sublabel: "View all salaries in this city",
+          href: `/cities/${hit.slug}`,
+          type: "city",
+        }
+  );
 
-  // Search cities
-  const cities = getUniqueCities();
-  for (const city of cities) {
-    if (results.length >= limit) break;
-    const cityText = `${city.name}, ${city.state}`.toLowerCase();
-    if (cityText.includes(query) || city.name.toLowerCase().includes(query)) {
-      results.push({
-        label: `${city.name}, ${city.state}`,
-        sublabel: "View all salaries in this city",
-        href: `/cities/${city.slug}`,
-        type: "city",
-      });
+  const salaryResult = (r: SalaryRecord): SearchResult => ({
+    label: `${r.occ_name} in ${r.city_short}`,
+    sublabel: `Median: ${formatSalary(r.median_annual, r.currency)}`,
+    href: `/salaries/${r.occ_slug}-in-${r.city_slug}`,
+    type: "salary",
+  });
+
+  // Salary pages (job + city combos), unless the query names a city ("new york")
+  if (results.length < limit && !hits.some((hit) => hit.type === "city")) {
+    for (const [job, city] of searchPairs(tokens)) {
+      if (results.length >= limit) break;
+      const r = getSalaryByOccupationAndCity(job.slug, city.slug);
+      if (r) results.push(salaryResult(r));
     }
   }
 
-  // Search salary pages (job + city combos)
+  // Salary pages of the jobs and cities the whole query matched ("software",
+  // "toronto"), in data order like the old scan
   if (results.length < limit) {
-    const records = getAllSalaryRecords();
-    for (const r of records) {
+    const seen = new Set(results.map((r) => r.href));
+    const top = getTopSalariesFor(
+      hits.filter((hit) => hit.type === "job").map((hit) => hit.slug),
+      hits.filter((hit) => hit.type === "city").map((hit) => hit.slug),
+      limit
+    );
+    for (const r of top) {
       if (results.length >= limit) break;
-      const text = `${r.occ_name} in ${r.city_short}`.toLowerCase();
-      if (text.includes(query)) {
-        const citySlug = r.city_short.toLowerCase().replace(/\s+/g, "-");
-        results.push({
-          label: `${r.occ_name} in ${r.city_short}`,
-          sublabel: `Median: ${formatSalary(r.median_annual, r.currency)}`,
-          href: `/salaries/${r.occ_slug}-in-${citySlug}`,
-          type: "salary",
-        });
-      }
+      const result = salaryResult(r);
+      if (!seen.has(result.href)) results.push(result);
     }
   }
 
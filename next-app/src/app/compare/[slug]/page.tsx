@@ -3,11 +3,11 @@ import Link from "next/link";
 import { Metadata } from "next";
 import {
   parseComparisonSlug,
-  getSalariesByCity,
   getUniqueCities,
   formatSalary,
   formatNumber,
 } from "@/lib/data";
+import { getCityComparison } from "@/lib/comparisons";
 
 export const dynamic = "force-dynamic";
 
@@ -41,41 +41,18 @@ export default async function ComparePage({ params }: PageProps) {
   const cityBInfo = cities.find((c) => c.slug === parsed.cityB);
   if (!cityAInfo || !cityBInfo) notFound();
 
-  const recordsA = getSalariesByCity(parsed.cityA);
-  const recordsB = getSalariesByCity(parsed.cityB);
+  // Precomputed by data/build_comparisons.py
+  const comparison = getCityComparison(parsed.cityA, parsed.cityB);
+  if (!comparison) notFound();
 
-  if (recordsA.length === 0 || recordsB.length === 0) notFound();
+  const { rows: comparisons, summary } = comparison;
+  const avgA = summary.avg_a;
+  const avgB = summary.avg_b;
+  const winsA = summary.wins_a;
+  const winsB = summary.wins_b;
 
-  // Find common occupations
-  const occMapA = new Map(recordsA.map((r) => [r.occ_slug, r]));
-  const occMapB = new Map(recordsB.map((r) => [r.occ_slug, r]));
-
-  const commonOccs = [...occMapA.keys()].filter((k) => occMapB.has(k));
-
-  const comparisons = commonOccs
-    .map((occSlug) => ({
-      occSlug,
-      occName: occMapA.get(occSlug)!.occ_name,
-      a: occMapA.get(occSlug)!,
-      b: occMapB.get(occSlug)!,
-    }))
-    .sort((x, y) => y.a.median_annual - x.a.median_annual);
-
-  // Summary stats
-  const avgA =
-    comparisons.length > 0
-      ? Math.round(comparisons.reduce((s, c) => s + c.a.median_annual, 0) / comparisons.length)
-      : 0;
-  const avgB =
-    comparisons.length > 0
-      ? Math.round(comparisons.reduce((s, c) => s + c.b.median_annual, 0) / comparisons.length)
-      : 0;
-
-  const winsA = comparisons.filter((c) => c.a.median_annual > c.b.median_annual).length;
-  const winsB = comparisons.filter((c) => c.b.median_annual > c.a.median_annual).length;
-
-  const currencyA = recordsA[0].currency;
-  const currencyB = recordsB[0].currency;
+  const currencyA = comparison.cityA.currency;
+  const currencyB = comparison.cityB.currency;
 
   return (
     <div className="max-w-4xl mx-auto px-4 py-8">
@@ -147,10 +124,10 @@ export default async function ComparePage({ params }: PageProps) {
               </thead>
               <tbody>
                 {comparisons.map((c) => {
-                  const diff = c.a.median_annual - c.b.median_annual;
+                  const diff = c.medianA - c.medianB;
                   const diffPct =
-                    c.b.median_annual > 0
-                      ? Math.round((diff / c.b.median_annual) * 100)
+                    c.medianB > 0
+                      ? Math.round((diff / c.medianB) * 100)
                       : 0;
                   return (
                     <tr key={c.occSlug} className="border-b border-gray-100 hover:bg-gray-50">
@@ -163,10 +140,10 @@ export default async function ComparePage({ params }: PageProps) {
                         </Link>
                       </td>
                       <td className="text-right py-3 font-medium">
-                        {formatSalary(c.a.median_annual, c.a.currency)}
+                        {formatSalary(c.medianA, currencyA)}
                       </td>
                       <td className="text-right py-3 font-medium">
-                        {formatSalary(c.b.median_annual, c.b.currency)}
+                        {formatSalary(c.medianB, currencyB)}
                       </td>
                       <td
                         className={`text-right py-3 font-medium ${
@@ -201,14 +178,14 @@ export default async function ComparePage({ params }: PageProps) {
           className="flex-1 bg-white rounded-lg border border-gray-200 p-4 hover:shadow-md transition-shadow text-center"
         >
           <p className="font-semibold text-black">All Jobs in {cityAInfo.name}</p>
-          <p className="text-sm text-black">{recordsA.length} occupations</p>
+          <p className="text-sm text-black">{comparison.cityA.records} occupations</p>
         </Link>
         <Link
           href={`/cities/${parsed.cityB}`}
           className="flex-1 bg-white rounded-lg border border-gray-200 p-4 hover:shadow-md transition-shadow text-center"
         >
           <p className="font-semibold text-black">All Jobs in {cityBInfo.name}</p>
-          <p className="text-sm text-black">{recordsB.length} occupations</p>
+          <p className="text-sm text-black">{comparison.cityB.records} occupations</p>
         </Link>
       </div>
     </div>
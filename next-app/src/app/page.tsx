@@ -56,8 +56,7 @@ export default function Home() {
         <h2 className="text-2xl font-bold mb-6">Highest Paying Roles</h2>
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-4">
           {topPaying.map((record) => {
-            const citySlug = record.city_short.toLowerCase().replace(/\s+/g, "-");
-            const slug = `${record.occ_slug}-in-${citySlug}`;
+            const slug = `${record.occ_slug}-in-${record.city_slug}`;
             return (
               <Link
                 key={slug}
@@ -34,8 +34,7 @@ export default async function SalaryPage({ params }: PageProps) {
   if (!record) notFound();
 
   const occContent = getOccupationContent(record.occ_slug);
-  const citySlugForContent = record.city_short.toLowerCase().replace(/\s+/g, "-");
-  const cityContentData = getCityContent(citySlugForContent);
+  const cityContentData = getCityContent(record.city_slug);
 
   // Get same occupation in other cities for comparison
   const otherCities = getSalariesByOccupation(record.occ_slug)
@@ -218,12 +217,11 @@ export default async function SalaryPage({ params }: PageProps) {
                 {otherCities.map((city) => {
                   const diff = city.median_annual - record.median_annual;
                   const diffPct = Math.round((diff / record.median_annual) * 100);
-                  const citySlug = city.city_short.toLowerCase().replace(/\s+/g, "-");
                   return (
                     <tr key={city.area_code} className="border-b border-gray-100">
                       <td className="py-3">
                         <Link
-                          href={`/salaries/${city.occ_slug}-in-${citySlug}`}
+                          href={`/salaries/${city.occ_slug}-in-${city.city_slug}`}
                           className="text-blue-600 hover:underline"
                         >
                           {city.city_short}, {city.state}
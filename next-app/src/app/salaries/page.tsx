@@ -49,10 +49,7 @@ export default function SalariesPage() {
             </thead>
             <tbody>
               {topPaying.map((r) => {
-                const citySlug = r.city_short
-                  .toLowerCase()
-                  .replace(/\s+/g, "-");
-                const slug = `${r.occ_slug}-in-${citySlug}`;
+                const slug = `${r.occ_slug}-in-${r.city_slug}`;
                 return (
                   <tr
                     key={slug}
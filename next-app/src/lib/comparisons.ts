@@ -0,0 +1,97 @@
+import fs from "fs";
+import path from "path";
+
+// Prebuilt by data/build_comparisons.py — one artifact per city pair, in
+// getComparisonSlugs() order, plus index.json with the occupation table
+const COMPARISON_DIR = path.join(process.cwd(), "src", "lib", "comparisons");
+
+export interface ComparisonCity {
+  slug: string;
+  name: string;
+  state: string;
+  currency: string;
+  records: number;
+}
+
+export interface ComparisonSummary {
+  occupations: number;
+  wins_a: number;
+  wins_b: number;
+  ties: number;
+  avg_a: number;
+  avg_b: number;
+}
+
+export interface ComparisonRow {
+  occSlug: string;
+  occName: string;
+  medianA: number;
+  medianB: number;
+}
+
+export interface CityComparison {
+  cityA: ComparisonCity;
+  cityB: ComparisonCity;
+  summary: ComparisonSummary;
+  rows: ComparisonRow[];
+}
+
+interface ComparisonArtifact {
+  city_a: ComparisonCity;
+  city_b: ComparisonCity;
+  summary: ComparisonSummary;
+  rows: [number, number, number][];
+  // Indexes into rows in city B's order, for the reversed pair
+  rows_b: number[];
+}
+
+let occupations: [string, string][] | null = null;
+
+function readJson<T>(file: string): T | undefined {
+  try {
+    return JSON.parse(fs.readFileSync(path.join(COMPARISON_DIR, file), "utf8")) as T;
+  } catch {
+    return undefined;
+  }
+}
+
+function occupationTable(): [string, string][] {
+  if (!occupations) {
+    occupations = readJson<{ occupations: [string, string][] }>("index.json")?.occupations ?? [];
+  }
+  return occupations;
+}
+
+// Shared occupations of two cities by city A median (descending, ties in city
+// A's data order), with the summary stats; the reverse of a prebuilt pair is
+// flipped and read in its city B order. cityA and cityB must be known city
+// slugs (see parseComparisonSlug).
+export function getCityComparison(cityA: string, cityB: string): CityComparison | undefined {
+  const occs = occupationTable();
+  const toRow = ([occ, a, b]: [number, number, number], flip: boolean): ComparisonRow => ({
+    occSlug: occs[occ][0],
+    occName: occs[occ][1],
+    medianA: flip ? b : a,
+    medianB: flip ? a : b,
+  });
+
+  const artifact = readJson<ComparisonArtifact>(`${cityA}-vs-${cityB}.json`);
+  if (artifact) {
+    return {
+      cityA: artifact.city_a,
+      cityB: artifact.city_b,
+      summary: artifact.summary,
+      rows: artifact.rows.map((row) => toRow(row, false)),
+    };
+  }
+
+  const reverse = readJson<ComparisonArtifact>(`${cityB}-vs-${cityA}.json`);
+  if (!reverse) return undefined;
+  const s = reverse.summary;
+  return {
+    cityA: reverse.city_b,
+    cityB: reverse.city_a,
+    summary: { ...s, wins_a: s.wins_b, wins_b: s.wins_a, avg_a: s.avg_b, avg_b: s.avg_a },
+    rows: reverse.rows_b.map((k) => toRow(reverse.rows[k], true)),
+  };
+}
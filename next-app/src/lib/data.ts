@@ -1,4 +1,5 @@
 import salaryData from "./salary_data.json";
+import salaryIndexData from "./salary_index.json";
 import occupationContentData from "./occupation_content.json";
 import cityContentData from "./city_content.json";
 
@@ -12,6 +13,7 @@ export interface SalaryRecord {
   occ_code: string;
   occ_name: string;
   occ_slug: string;
+  city_slug: string;
   employment: number;
   mean_annual: number;
   median_annual: number;
@@ -40,37 +42,55 @@ export interface CityContent {
   cost_of_living_detail: string;
 }
 
+// Record positions emitted by the Python pipeline alongside salary_data.json
+interface SalaryIndex {
+  count: number;
+  slugs: Record<string, number>;
+  occupations: Record<string, number[]>;
+  cities: Record<string, number[]>;
+}
+
 const data: SalaryRecord[] = salaryData as SalaryRecord[];
+const index: SalaryIndex = salaryIndexData as SalaryIndex;
 const occContent: Record<string, OccupationContent> = occupationContentData as Record<string, OccupationContent>;
 const ctyContent: Record<string, CityContent> = cityContentData as Record<string, CityContent>;
 
+// Positions are only meaningful for the data file the index was written with
+if (index.count !== data.length) {
+  throw new Error(
+    `salary_index.json describes ${index.count} records but salary_data.json has ${data.length}; ` +
+      "regenerate both with the same run (python3 data/generate_full_data.py)"
+  );
+}
+
+function lookup<T>(map: Record<string, T>, key: string): T | undefined {
+  // Own keys only, so slugs like "constructor" don't hit Object.prototype
+  return Object.prototype.hasOwnProperty.call(map, key) ? map[key] : undefined;
+}
+
+function recordsAt(positions: number[] | undefined): SalaryRecord[] {
+  return positions ? positions.map((i) => data[i]) : [];
+}
+
 export function getAllSalaryRecords(): SalaryRecord[] {
   return data;
 }
 
 export function getSalaryBySlug(slug: string): SalaryRecord | undefined {
   // slug format: "software-developers-in-new-york"
-  return data.find((r) => {
-    const citySlug = r.city_short.toLowerCase().replace(/\s+/g, "-");
-    return `${r.occ_slug}-in-${citySlug}` === slug;
-  });
+  const position = lookup(index.slugs, slug);
+  return position === undefined ? undefined : data[position];
 }
 
 export function getSalaryByOccupationAndCity(
   occSlug: string,
   citySlug: string
 ): SalaryRecord | undefined {
-  return data.find((r) => {
-    const cSlug = r.city_short.toLowerCase().replace(/\s+/g, "-");
-    return r.occ_slug === occSlug && cSlug === citySlug;
-  });
+  return getSalaryBySlug(`${occSlug}-in-${citySlug}`);
 }
 
 export function getAllSlugs(): string[] {
-  return data.map((r) => {
-    const citySlug = r.city_short.toLowerCase().replace(/\s+/g, "-");
-    return `${r.occ_slug}-in-${citySlug}`;
-  });
+  return data.map((r) => `${r.occ_slug}-in-${r.city_slug}`);
 }
 
 export function getUniqueOccupations(): { slug: string; name: string }[] {
@@ -89,24 +109,39 @@ export function getUniqueCities(): { slug: string; name: string; state: string }
   const seen = new Set<string>();
   const result: { slug: string; name: string; state: string }[] = [];
   for (const r of data) {
-    const slug = r.city_short.toLowerCase().replace(/\s+/g, "-");
-    if (!seen.has(slug)) {
-      seen.add(slug);
-      result.push({ slug, name: r.city_short, state: r.state });
+    if (!seen.has(r.city_slug)) {
+      seen.add(r.city_slug);
+      result.push({ slug: r.city_slug, name: r.city_short, state: r.state });
     }
   }
   return result.sort((a, b) => a.name.localeCompare(b.name));
 }
 
 export function getSalariesByOccupation(occSlug: string): SalaryRecord[] {
-  return data.filter((r) => r.occ_slug === occSlug);
+  return recordsAt(lookup(index.occupations, occSlug));
 }
 
 export function getSalariesByCity(citySlug: string): SalaryRecord[] {
-  return data.filter((r) => {
-    const slug = r.city_short.toLowerCase().replace(/\s+/g, "-");
-    return slug === citySlug;
-  });
+  return recordsAt(lookup(index.cities, citySlug));
+}
+
+// Records of any of the occupations or cities, in data order, at most limit
+export function getTopSalariesFor(
+  occSlugs: string[],
+  citySlugs: string[],
+  limit: number
+): SalaryRecord[] {
+  const positions = new Set<number>();
+  for (const slug of occSlugs) {
+    for (const i of lookup(index.occupations, slug) ?? []) positions.add(i);
+  }
+  for (const slug of citySlugs) {
+    for (const i of lookup(index.cities, slug) ?? []) positions.add(i);
+  }
+  return [...positions]
+    .sort((a, b) => a - b)
+    .slice(0, limit)
+    .map((i) => data[i]);
 }
 
 export function getTopPayingRecords(limit: number = 6): SalaryRecord[] {
@@ -0,0 +1,151 @@
+import searchIndexData from "./search_index.json";
+
+// Prebuilt by data/build_search_index.py — see that file for the layout
+interface SearchIndexData {
+  docs: [DocType, string, string, number][];
+  vocab: string[];
+  postings: number[][];
+  trigrams: Record<string, number[]>;
+  aliases: Record<string, number[]>;
+}
+
+type DocType = "job" | "city";
+
+export interface SearchHit {
+  type: DocType;
+  slug: string;
+  label: string;
+}
+
+const DOC_TYPES: DocType[] = ["job", "city"];
+const STOPWORDS = new Set(["in", "the", "and", "of", "for", "a"]);
+
+const index = searchIndexData as unknown as SearchIndexData;
+const labels = index.docs.map((d) => normalize(d[2]).join(" "));
+
+function normalize(text: string): string[] {
+  return text.toLowerCase().split(/[^a-z0-9]+/).filter(Boolean);
+}
+
+function trigrams(text: string): string[] {
+  const out: string[] = [];
+  for (let i = 0; i + 3 <= text.length; i++) out.push(text.slice(i, i + 3));
+  return out;
+}
+
+function own<T>(map: Record<string, T>, key: string): T | undefined {
+  return Object.prototype.hasOwnProperty.call(map, key) ? map[key] : undefined;
+}
+
+function lowerBound(sorted: string[], key: string): number {
+  let lo = 0;
+  let hi = sorted.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (sorted[mid] < key) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+// Doc id -> score for one token: alias 2, exact term 1, prefix 0, plus
+// substring matches (0) through the trigram postings when nothing else
+// matched or substring is set
+function matchToken(token: string, substring = false): Map<number, number> {
+  const matches = new Map<number, number>();
+  for (let i = lowerBound(index.vocab, token); i < index.vocab.length; i++) {
+    const term = index.vocab[i];
+    if (!term.startsWith(token)) break;
+    const score = term === token ? 1 : 0;
+    for (const id of index.postings[i]) {
+      matches.set(id, Math.max(matches.get(id) ?? 0, score));
+    }
+  }
+  for (const id of own(index.aliases, token) ?? []) matches.set(id, 2);
+  if ((matches.size > 0 && !substring) || token.length < 3) return matches;
+
+  let candidates: Set<number> | null = null;
+  for (const tri of trigrams(token)) {
+    const ids = own(index.trigrams, tri);
+    if (!ids) return matches;
+    candidates = candidates
+      ? new Set(ids.filter((id) => candidates!.has(id)))
+      : new Set(ids);
+  }
+  for (const id of candidates ?? []) {
+    if (labels[id].includes(token) && !matches.has(id)) matches.set(id, 0);
+  }
+  return matches;
+}
+
+function scoreAll(
+  tokens: string[],
+  type: DocType | undefined,
+  minScore: number,
+  substring: boolean
+): Map<number, number> {
+  let scores: Map<number, number> | null = null;
+  for (const token of tokens) {
+    const matches = matchToken(token, substring);
+    const next = new Map<number, number>();
+    if (scores === null) {
+      for (const [id, s] of matches) {
+        if (s >= minScore && (!type || index.docs[id][0] === type)) next.set(id, s);
+      }
+    } else {
+      for (const [id, s] of scores) {
+        const m = matches.get(id);
+        if (m !== undefined && m >= minScore) next.set(id, s + m);
+      }
+    }
+    if (next.size === 0) return next;
+    scores = next;
+  }
+  return scores ?? new Map();
+}
+
+// Docs matching every token with at least minScore each, ranked by type,
+// total score, then rank; if none do, retried with substring matches for
+// every token ("ware dev" -> Software Developers)
+function matchAll(tokens: string[], type?: DocType, minScore = 0): number[] {
+  let scores = scoreAll(tokens, type, minScore, false);
+  if (scores.size === 0 && minScore === 0) scores = scoreAll(tokens, type, minScore, true);
+  return [...scores.keys()].sort(
+    (a, b) =>
+      DOC_TYPES.indexOf(index.docs[a][0]) - DOC_TYPES.indexOf(index.docs[b][0]) ||
+      scores.get(b)! - scores.get(a)! ||
+      a - b
+  );
+}
+
+export function searchTokens(query: string): string[] {
+  return normalize(query).filter((t) => !STOPWORDS.has(t));
+}
+
+export function searchDocs(tokens: string[], limit: number): SearchHit[] {
+  return matchAll(tokens)
+    .slice(0, limit)
+    .map((id) => ({ type: index.docs[id][0], slug: index.docs[id][1], label: index.docs[id][2] }));
+}
+
+// Job + city pairs from splitting the query ("nurse toronto"), best first.
+// The job part must match exactly or through an alias ("new" is only a
+// prefix of "news", so "new york" gives no pairs); callers skip this when the
+// whole query matched a city.
+export function* searchPairs(tokens: string[]): Generator<[SearchHit, SearchHit]> {
+  for (let split = 1; split < tokens.length; split++) {
+    const jobs = matchAll(tokens.slice(0, split), "job", 1);
+    if (jobs.length === 0) continue;
+    const cities = matchAll(tokens.slice(split), "city");
+    for (const job of jobs) {
+      for (const city of cities) {
+        const j = index.docs[job];
+        const c = index.docs[city];
+        yield [
+          { type: j[0], slug: j[1], label: j[2] },
+          { type: c[0], slug: c[1], label: c[2] },
+        ];
+      }
+    }
+  }
+}